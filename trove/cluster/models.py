@@ -29,9 +29,6 @@ from trove.common.notification import (
     DBaaSClusterGrow, DBaaSClusterShrink,
     DBaaSClusterResetStatus, DBaaSClusterRestart)
 from trove.common.notification import DBaaSClusterUpgrade
-from trove.common.notification import DBaaSInstanceAttachConfiguration
-from trove.common.notification import DBaaSInstanceDetachConfiguration
-from trove.common.notification import EndNotification
 from trove.common.notification import StartNotification
 from trove.common import remote
 from trove.common import server_group as srv_grp
@@ -41,7 +38,6 @@ from trove.configuration import models as config_models
 from trove.datastore import models as datastore_models
 from trove.db import models as dbmodels
 from trove.instance import models as inst_models
-from trove.instance.tasks import InstanceTasks
 from trove.taskmanager import api as task_api
 
 
@@ -415,61 +411,23 @@ class Cluster(object):
 
     def rolling_configuration_update(self, configuration_id,
                                      apply_on_all=True):
-        cluster_notification = self.context.notification
-        request_info = cluster_notification.serialize(self.context)
+        """Attach a configuration group to all the nodes of the cluster.
+        The configuration is persisted and applied on the nodes by the
+        task manager.
+        """
         self.validate_cluster_available()
+        # Fail in the API if the configuration does not exist or is not for
+        # this datastore version.
+        config_models.Configuration.find(
+            self.context, configuration_id, self.datastore_version.id)
         self.db_info.update(task_status=ClusterTasks.UPDATING_CLUSTER)
         try:
-            configuration = config_models.Configuration.find(
-                self.context, configuration_id, self.datastore_version.id)
-            instances = [inst_models.Instance.load(self.context, instance.id)
-                         for instance in self.instances]
-
-            LOG.debug("Persisting changes on cluster nodes.")
-            # Allow re-applying the same configuration (e.g. on configuration
-            # updates).
-            for instance in instances:
-                if not (instance.configuration and
-                        instance.configuration.id != configuration_id):
-                    self.context.notification = (
-                        DBaaSInstanceAttachConfiguration(self.context,
-                                                         **request_info))
-                    with StartNotification(self.context,
-                                           instance_id=instance.id,
-                                           configuration_id=configuration_id):
-                        with EndNotification(self.context):
-                            instance.save_configuration(configuration)
-                else:
-                    LOG.debug(
-                        "Node '%s' already has the configuration '%s' "
-                        "attached." % (instance.id, configuration_id))
-
-            # Configuration has been persisted to all instances.
-            # The cluster is in a consistent state with all nodes
-            # requiring restart.
-            # We therefore assign the configuration group ID now.
-            # The configuration can be safely detached at this point.
-            self.update_db(configuration_id=configuration_id)
-
-            LOG.debug("Applying runtime configuration changes.")
-            if instances[0].apply_configuration(configuration):
-                LOG.debug(
-                    "Runtime changes have been applied successfully to the "
-                    "first node.")
-                remaining_nodes = instances[1:]
-                if apply_on_all:
-                    LOG.debug(
-                        "Applying the changes to the remaining nodes.")
-                    for instance in remaining_nodes:
-                        instance.apply_configuration(configuration)
-                else:
-                    LOG.debug(
-                        "Releasing restart-required task on the remaining "
-                        "nodes.")
-                    for instance in remaining_nodes:
-                        instance.update_db(task_status=InstanceTasks.NONE)
-        finally:
-            self.update_db(task_status=ClusterTasks.NONE)
+            task_api.load(self.context, self.ds_version.manager
+                          ).update_cluster_configuration(
+                              self.id, configuration_id, apply_on_all)
+        except Exception:
+            self.db_info.update(task_status=ClusterTasks.NONE)
+            raise
 
         return self.__class__(self.context, self.db_info,
                               self.ds, self.ds_version)
@@ -479,54 +437,18 @@ class Cluster(object):
             _("Action 'configuration_detach' not supported"))
 
     def rolling_configuration_remove(self, apply_on_all=True):
-        cluster_notification = self.context.notification
-        request_info = cluster_notification.serialize(self.context)
+        """Detach the configuration group from all the nodes of the cluster.
+        The configuration is removed from the nodes by the task manager.
+        """
         self.validate_cluster_available()
         self.db_info.update(task_status=ClusterTasks.UPDATING_CLUSTER)
         try:
-            instances = [inst_models.Instance.load(self.context, instance.id)
-                         for instance in self.instances]
-
-            LOG.debug("Removing changes from cluster nodes.")
-            for instance in instances:
-                if instance.configuration:
-                    self.context.notification = (
-                        DBaaSInstanceDetachConfiguration(self.context,
-                                                         **request_info))
-                    with StartNotification(self.context,
-                                           instance_id=instance.id):
-                        with EndNotification(self.context):
-                            instance.delete_configuration()
-                else:
-                    LOG.debug(
-                        "Node '%s' has no configuration attached."
-                        % instance.id)
-
-            # The cluster is in a consistent state with all nodes
-            # requiring restart.
-            # New configuration can be safely attached at this point.
-            configuration_id = self.configuration_id
-            self.update_db(configuration_id=None)
-
-            LOG.debug("Applying runtime configuration changes.")
-            if instances[0].reset_configuration(configuration_id):
-                LOG.debug(
-                    "Runtime changes have been applied successfully to the "
-                    "first node.")
-                remaining_nodes = instances[1:]
-                if apply_on_all:
-                    LOG.debug(
-                        "Applying the changes to the remaining nodes.")
-                    for instance in remaining_nodes:
-                        instance.reset_configuration(configuration_id)
-                else:
-                    LOG.debug(
-                        "Releasing restart-required task on the remaining "
-                        "nodes.")
-                    for instance in remaining_nodes:
-                        instance.update_db(task_status=InstanceTasks.NONE)
-        finally:
-            self.update_db(task_status=ClusterTasks.NONE)
+            task_api.load(self.context, self.ds_version.manager
+                          ).remove_cluster_configuration(
+                              self.id, apply_on_all)
+        except Exception:
+            self.db_info.update(task_status=ClusterTasks.NONE)
+            raise
 
         return self.__class__(self.context, self.db_info,
                               self.ds, self.ds_version)
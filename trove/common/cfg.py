@@ -119,6 +119,18 @@ common_opts = [
                help='Service type to use when searching catalog.'),
     cfg.StrOpt('swift_endpoint_type', default='publicURL',
                help='Service endpoint type to use when searching catalog.'),
+    cfg.IntOpt('swift_listing_page_size', default=10000,
+               help='Maximum number of objects requested per Swift '
+                    'container listing.'),
+    cfg.BoolOpt('swift_use_bulk_delete', default=True,
+                help='Use the Swift bulk delete middleware (if available) '
+                     'when deleting many objects.'),
+    cfg.IntOpt('swift_bulk_delete_batch_size', default=1000,
+               help='Maximum number of objects deleted per Swift bulk '
+                    'delete request.'),
+    cfg.IntOpt('swift_delete_workers', default=10,
+               help='Maximum number of concurrent connections used when '
+                    'deleting many Swift objects.'),
     cfg.URIOpt('glance_url', help='URL ending in ``AUTH_``.'),
     cfg.StrOpt('glance_service_type', default='image',
                help='Service type to use when searching catalog.'),
@@ -170,6 +182,11 @@ common_opts = [
                     'occurs.'),
     cfg.StrOpt('dns_domain_id', default="",
                help='Domain ID used for adding DNS entries.'),
+    cfg.IntOpt('dns_record_cache_ttl', default=60,
+               help='Time (in seconds) the DNS records and domains listed '
+                    'from Designate are kept in memory. Records created or '
+                    'deleted by the same process are seen at once. Set to 0 '
+                    'to list them for every lookup.'),
     cfg.IntOpt('users_page_size', default=20,
                help='Page size for listing users.'),
     cfg.IntOpt('databases_page_size', default=20,
@@ -182,6 +199,10 @@ common_opts = [
                help='Page size for listing backups.'),
     cfg.IntOpt('configurations_page_size', default=20,
                help='Page size for listing configurations.'),
+    cfg.IntOpt('configuration_parameters_cache_ttl', default=60,
+               help='Time (in seconds) that the configuration parameter '
+                    'rules of a datastore version are cached for. Set to '
+                    '0 to disable caching.'),
     cfg.IntOpt('modules_page_size', default=20,
                help='Page size for listing modules.'),
     cfg.IntOpt('agent_call_low_timeout', default=15,
@@ -197,6 +218,11 @@ common_opts = [
     # The guest_id opt definition must match the one in cmd/guest.py
     cfg.StrOpt('guest_id', default=None, help="ID of the Guest Instance."),
     cfg.StrOpt('guest_name', default=None, help="Name of the Guest Instance."),
+    cfg.BoolOpt('guest_privileged_helper', default=False,
+                help='Run the file operations that the Guest Agent performs '
+                     'as root through a single helper process started with '
+                     'sudo, instead of starting a sudo process for every '
+                     'operation.'),
     cfg.IntOpt('state_change_wait_time', default=60 * 10,
                help='Maximum time (in seconds) to wait for a state change.'),
     cfg.IntOpt('state_change_poll_time', default=3,
@@ -219,6 +245,16 @@ common_opts = [
                help='Maximum time (in seconds) to wait for a volume format.'),
     cfg.StrOpt('mount_options', default='defaults,noatime',
                help='Options to use when mounting a volume.'),
+    cfg.IntOpt('volume_migration_workers', default=4,
+               help='Number of rsync processes used to copy existing data '
+                    'onto a newly attached volume. Each top-level '
+                    'directory is copied by a single process; 1 copies '
+                    'everything with one process.'),
+    cfg.BoolOpt('volume_online_resize', default=False,
+                help='Try to grow volumes while they are attached and the '
+                     'database is running. Requires a Cinder backend that '
+                     'can extend in-use volumes; if the extend is refused '
+                     'the volume is detached and resized offline.'),
     cfg.IntOpt('max_instances_per_tenant',
                default=10,
                help='Default maximum number of instances per tenant.',
@@ -381,10 +417,22 @@ common_opts = [
     cfg.StrOpt('remote_glance_client',
                default='trove.common.glance_remote.glance_client',
                help='Client to send Glance calls to.'),
+    cfg.IntOpt('remote_client_cache_ttl', default=300,
+               help='Time (in seconds) that the Nova, Cinder, Swift, Heat, '
+                    'Neutron and Glance clients built for an auth token are '
+                    'kept, so that the requests carrying the token reuse '
+                    'their HTTP connections. Set to 0 to build a client for '
+                    'every call.'),
+    cfg.IntOpt('remote_client_cache_size', default=1000, min=1,
+               help='Maximum number of cached remote clients. The least '
+                    'recently used clients are evicted first.'),
     cfg.StrOpt('exists_notification_transformer',
                help='Transformer for exists notifications.'),
     cfg.IntOpt('exists_notification_interval', default=3600,
                help='Seconds to wait between pushing events.'),
+    cfg.IntOpt('exists_notification_batch_size', default=1000, min=1,
+               help='Number of instances read from the database, and of '
+                    'exists notifications sent, at a time.'),
     cfg.IntOpt('quota_notification_interval',
                help='Seconds to wait between pushing events.'),
     cfg.DictOpt('notification_service_id',
@@ -494,6 +542,12 @@ common_opts = [
     cfg.IntOpt('module_reapply_min_batch_delay', default=2,
                help='The minimum delay (in seconds) between subsequent '
                     'module batch reapply executions.'),
+    cfg.IntOpt('cluster_configuration_batch_size', default=10, min=1,
+               help='The maximum number of cluster nodes to save or apply '
+                    'a configuration group on at the same time.'),
+    cfg.IntOpt('host_update_workers', default=10,
+               help='The maximum number of guests on a host that the '
+                    'management API updates at the same time.'),
     cfg.StrOpt('guest_log_container_name',
                default='database_logs',
                help='Name of container that stores guest log components.'),
@@ -501,6 +555,14 @@ common_opts = [
                help='Maximum size of a chunk saved in guest log container.'),
     cfg.IntOpt('guest_log_expiry', default=2592000,
                help='Expiry (in seconds) of objects in guest log container.'),
+    cfg.IntOpt('guest_log_publish_workers', default=4,
+               help='Maximum number of guest log components uploaded to '
+                    'the guest log container concurrently.'),
+    cfg.IntOpt('guest_log_follow_interval', default=0,
+               help='Interval (in seconds) at which a published guest log '
+                    'is followed and incrementally published in the '
+                    'background. If 0, publishing a log pushes all pending '
+                    'data in a single call.'),
     cfg.BoolOpt('enable_secure_rpc_messaging', default=True,
                 help='Should RPC messaging traffic be secured by encryption.'),
     cfg.StrOpt('taskmanager_rpc_encr_key',
@@ -1008,6 +1070,9 @@ oracle_opts = [
                 help='Incremental Backup Runner based on the default '
                 'strategy. For strategies that do not implement an '
                 'incremental, the runner will use the default full backup.'),
+    cfg.IntOpt('backup_channels', default=4, min=1,
+               help='Number of RMAN disk channels used in parallel to '
+                    'create and restore backups.'),
     cfg.StrOpt('oracle_base',
                default='/u01/app/oracle',
                help='Default $ORACLE_BASE directory'),
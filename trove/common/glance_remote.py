@@ -19,6 +19,7 @@ from keystoneauth1 import session as ka_session
 from oslo_utils.importutils import import_class
 
 from trove.common import cfg
+from trove.common.remote import cached_client
 from trove.common.remote import get_endpoint
 from trove.common.remote import normalize_url
 
@@ -28,6 +29,10 @@ CONF = cfg.CONF
 
 
 def glance_client(context, region_name=None):
+    return cached_client(_glance_client, context, region_name)
+
+
+def _glance_client(context, region_name=None):
 
     # We should allow glance to get the endpoint from the service
     # catalog, but to do so we would need to be able to specify
@@ -14,6 +14,11 @@
 #    under the License.
 
 
+# The status of a module that a guest was asked to apply without its
+# contents, but doesn't have the contents of.
+MODULE_CONTENTS_REQUIRED = 'CONTENTS_REQUIRED'
+
+
 class ServiceStatus(object):
     """Represents the status of the app and in some rare cases the agent.
 
@@ -72,6 +77,12 @@ class ServiceStatus(object):
             raise ValueError(msg % desc)
         return ServiceStatus._lookup[status_codes[0]]
 
+    @staticmethod
+    def from_api_status(api_status):
+        """Return all the statuses reported as api_status by the API."""
+        return [status for status in ServiceStatus._lookup.values()
+                if status.api_status == api_status]
+
     @staticmethod
     def is_valid_code(code):
         return code in ServiceStatus._lookup
@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import time
+
 from oslo_utils.importutils import import_class
 
 from trove.common import cfg
@@ -31,6 +34,10 @@ CONF = cfg.CONF
 PROXY_AUTH_URL = CONF.trove_auth_url
 USE_SNET = CONF.backup_use_snet
 
+# Clients keyed by (factory, region, auth token, tenant), the least
+# recently used first.
+_clients = collections.OrderedDict()
+
 
 def normalize_url(url):
     """Adds trailing slash if necessary."""
@@ -74,6 +81,36 @@ def get_endpoint(service_catalog, service_type=None,
     return urls[0]
 
 
+def cached_client(create, context, region_name=None):
+    """Return the client built by 'create(context, region_name)' for the
+    token of a request context.
+
+    Building a client resolves its endpoint and opens a new HTTP session,
+    so the clients are kept for 'remote_client_cache_ttl' seconds and
+    shared by the requests carrying the same auth token, reusing their
+    keep-alive connections.  At most 'remote_client_cache_size' clients
+    are kept, the least recently used ones are evicted first.
+    """
+    ttl = CONF.remote_client_cache_ttl
+    if ttl <= 0 or not context.auth_token:
+        return create(context, region_name)
+
+    key = (create, region_name or CONF.os_region_name,
+           context.auth_token, context.tenant)
+    now = time.time()
+    cached = _clients.pop(key, None)
+    if cached and now - cached[0] < ttl:
+        _clients[key] = cached
+        return cached[1]
+
+    client = create(context, region_name)
+    _clients[key] = (now, client)
+    while _clients and (len(_clients) > CONF.remote_client_cache_size or
+                        now - next(iter(_clients.values()))[0] >= ttl):
+        _clients.popitem(last=False)
+    return client
+
+
 def dns_client(context):
     from trove.dns.manager import DnsManager
     return DnsManager()
@@ -89,6 +126,10 @@ def guest_client(context, id, manager=None):
 
 
 def nova_client(context, region_name=None):
+    return cached_client(_nova_client, context, region_name)
+
+
+def _nova_client(context, region_name=None):
     if CONF.nova_compute_url:
         url = '%(nova_url)s%(tenant)s' % {
             'nova_url': normalize_url(CONF.nova_compute_url),
@@ -112,12 +153,20 @@ def create_admin_nova_client(context):
     Creates client that uses trove admin credentials
     :return: a client for nova for the trove admin
     """
-    client = create_nova_client(context)
+    if create_nova_client is nova_client:
+        # Do not drop the token of a client shared with other requests.
+        client = _nova_client(context)
+    else:
+        client = create_nova_client(context)
     client.client.auth_token = None
     return client
 
 
 def cinder_client(context, region_name=None):
+    return cached_client(_cinder_client, context, region_name)
+
+
+def _cinder_client(context, region_name=None):
     if CONF.cinder_url:
         url = '%(cinder_url)s%(tenant)s' % {
             'cinder_url': normalize_url(CONF.cinder_url),
@@ -137,6 +186,10 @@ def cinder_client(context, region_name=None):
 
 
 def heat_client(context, region_name=None):
+    return cached_client(_heat_client, context, region_name)
+
+
+def _heat_client(context, region_name=None):
     if CONF.heat_url:
         url = '%(heat_url)s%(tenant)s' % {
             'heat_url': normalize_url(CONF.heat_url),
@@ -154,6 +207,8 @@ def heat_client(context, region_name=None):
 
 
 def swift_client(context, region_name=None):
+    # Not cached: a swiftclient Connection is not safe to share between
+    # green threads, and the callers keep their own connections.
     if CONF.swift_url:
         # swift_url has a different format so doesn't need to be normalized
         url = '%(swift_url)s%(tenant)s' % {'swift_url': CONF.swift_url,
@@ -172,6 +227,10 @@ def swift_client(context, region_name=None):
 
 
 def neutron_client(context, region_name=None):
+    return cached_client(_neutron_client, context, region_name)
+
+
+def _neutron_client(context, region_name=None):
     from neutronclient.v2_0 import client as NeutronClient
     if CONF.neutron_url:
         # neutron endpoint url / publicURL does not include tenant segment
@@ -188,6 +247,10 @@ def neutron_client(context, region_name=None):
 
 
 def glance_client(context, region_name=None):
+    return cached_client(_glance_client, context, region_name)
+
+
+def _glance_client(context, region_name=None):
     if CONF.glance_url:
         url = '%(url)s%(tenant)s' % {
             'url': normalize_url(CONF.glance_url),
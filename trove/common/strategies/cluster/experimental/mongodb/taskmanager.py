@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from eventlet import greenpool
 from eventlet.timeout import Timeout
 from oslo_log import log as logging
 
@@ -106,7 +107,7 @@ class MongoDbClusterTasks(task_models.ClusterTasks):
                                            config_server_ips):
                 return
 
-            if not self._create_shard(query_routers[0], members):
+            if not self._create_shards(query_routers[0], members):
                 return
 
             # call to start checking status
@@ -193,6 +194,7 @@ class MongoDbClusterTasks(task_models.ClusterTasks):
                 query_router_id = self._get_running_query_router_id()
                 if not query_router_id:
                     return
+                members = []
                 for shard_id in shard_ids:
                     LOG.debug('growing cluster by adding shard %s on query '
                               'router %s' % (shard_id, query_router_id))
@@ -202,12 +204,12 @@ class MongoDbClusterTasks(task_models.ClusterTasks):
                         member_ids, cluster_id, shard_id
                     ):
                         return
-                    members = [Instance.load(context, member_id)
-                               for member_id in member_ids]
-                    query_router = Instance.load(context, query_router_id)
-                    if not self._create_shard(query_router, members):
-                        return
-                    instances.extend(members)
+                    members.extend(Instance.load(context, member_id)
+                                   for member_id in member_ids)
+                query_router = Instance.load(context, query_router_id)
+                if not self._create_shards(query_router, members):
+                    return
+                instances.extend(members)
             if new_query_routers:
                 query_router_ids = [db_instance.id for db_instance
                                     in new_query_routers]
@@ -333,6 +335,23 @@ class MongoDbClusterTasks(task_models.ClusterTasks):
             return False
         return True
 
+    def _create_shards(self, query_router, members):
+        """Create a shard out of each group of the given members that have
+        the same shard id. Most of the time is spent waiting for the
+        replica sets to come up, so the shards are created concurrently.
+        """
+        shards = {}
+        for member in members:
+            shards.setdefault(member.shard_id, []).append(member)
+        if len(shards) == 1:
+            return self._create_shard(query_router, members)
+        pool = greenpool.GreenPool(len(shards))
+        results = pool.imap(
+            lambda shard_members: self._create_shard(query_router,
+                                                     shard_members),
+            shards.values())
+        return all(list(results))
+
     def _get_running_query_router_id(self):
         """Get a query router in this cluster that is in the RUNNING state."""
         for instance_id in [db_instance.id for db_instance in self.db_instances
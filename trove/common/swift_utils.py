@@ -0,0 +1,188 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+# Helpers for operating on many Swift objects at once
+
+from eventlet import greenpool
+from eventlet import pools
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from six.moves.urllib.parse import quote
+from swiftclient.client import ClientException
+
+from trove.common import cfg
+from trove.common.i18n import _
+from trove.common import remote
+
+
+LOG = logging.getLogger(__name__)
+CONF = cfg.CONF
+
+# Cache of the bulk delete limit advertised by each Swift endpoint
+# (0 if the bulk middleware is not available).
+_bulk_delete_limits = {}
+
+
+def iter_container(client, container, prefix=None):
+    """Yield the listing of every object in the container.
+
+    Swift returns at most 10,000 objects per listing, so keep asking
+    for the next page until an empty one comes back.
+    """
+    marker = None
+    while True:
+        objects = client.get_container(
+            container, prefix=prefix, marker=marker,
+            limit=CONF.swift_listing_page_size)[1]
+        if not objects:
+            break
+        for obj in objects:
+            yield obj
+        marker = objects[-1]['name']
+
+
+def list_object_names(client, container, prefix=None):
+    return [obj['name'] for obj in iter_container(client, container, prefix)]
+
+
+def delete_objects(context, container, object_names, client=None,
+                   progress_callback=None):
+    """Delete the named objects from the container.
+
+    Uses the Swift bulk delete middleware if it's available, otherwise
+    deletes the objects one by one.  Either way the requests are spread
+    over a pool of at most 'swift_delete_workers' connections.  Objects
+    that are already gone are ignored.  If any delete fails, the first
+    error is raised once all the others have been attempted.
+
+    :param context:            Context used to create additional clients.
+    :param container:          The container to delete the objects from.
+    :param object_names:       The names of the objects to delete.
+    :param client:             An existing client to reuse, if any.
+    :param progress_callback:  Called with (deleted, total) as batches of
+                               objects are deleted.
+    """
+    object_names = list(object_names)
+    total = len(object_names)
+    if not total:
+        return
+
+    client = client or remote.create_swift_client(context)
+    bulk_limit = _get_bulk_delete_limit(client)
+    if bulk_limit:
+        batch_size = min(bulk_limit, CONF.swift_bulk_delete_batch_size)
+        delete_batch = _bulk_delete
+    else:
+        batch_size = 1
+        delete_batch = _delete_each
+    batches = [object_names[index:index + batch_size]
+               for index in range(0, total, batch_size)]
+
+    workers = max(min(CONF.swift_delete_workers, len(batches)), 1)
+    clients = [client]
+    client_pool = pools.Pool(
+        max_size=workers,
+        create=lambda: (clients.pop() if clients
+                        else remote.create_swift_client(context)))
+    progress = {'deleted': 0, 'errors': []}
+
+    def _delete(batch):
+        # spawn_n drops the exceptions of the workers, so every failure,
+        # not only the ones Swift answered with, is recorded here.
+        try:
+            with client_pool.item() as conn:
+                delete_batch(conn, container, batch)
+        except Exception as ex:
+            progress['errors'].append(ex)
+            return
+        progress['deleted'] += len(batch)
+        LOG.debug("Deleted %(deleted)d of %(total)d objects from "
+                  "container '%(cont)s'." %
+                  {'deleted': progress['deleted'], 'total': total,
+                   'cont': container})
+        if progress_callback:
+            progress_callback(progress['deleted'], total)
+
+    LOG.debug("Deleting %(total)d objects from container '%(cont)s' "
+              "(bulk=%(bulk)s, workers=%(workers)d)." %
+              {'total': total, 'cont': container, 'bulk': bool(bulk_limit),
+               'workers': workers})
+    pool = greenpool.GreenPool(workers)
+    for batch in batches:
+        pool.spawn_n(_delete, batch)
+    pool.waitall()
+
+    if progress['errors']:
+        LOG.error(_("Failed to delete %(failed)d of %(total)d batches of "
+                    "objects from container '%(cont)s'.") %
+                  {'failed': len(progress['errors']), 'total': len(batches),
+                   'cont': container})
+        raise progress['errors'][0]
+
+
+def _get_bulk_delete_limit(client):
+    if not CONF.swift_use_bulk_delete:
+        return 0
+    url = client.url
+    if url not in _bulk_delete_limits:
+        try:
+            capabilities = client.get_capabilities()
+            bulk_delete = capabilities.get('bulk_delete')
+            limit = bulk_delete.get('max_deletes_per_request', 10000) if (
+                bulk_delete is not None) else 0
+        except ClientException:
+            # Older Swift without /info - assume no bulk middleware
+            limit = 0
+        LOG.debug("Swift bulk delete limit for %(url)s is %(limit)s." %
+                  {'url': url, 'limit': limit})
+        _bulk_delete_limits[url] = limit
+    return _bulk_delete_limits[url]
+
+
+def _delete_each(client, container, object_names):
+    for object_name in object_names:
+        try:
+            client.delete_object(container, object_name)
+        except ClientException as ex:
+            if ex.http_status != 404:
+                raise
+
+
+def _bulk_delete(client, container, object_names):
+    data = ''.join(
+        quote(('/%s/%s' % (container, name)).encode('utf-8')) + '\n'
+        for name in object_names).encode('utf-8')
+    headers = {'Accept': 'application/json', 'Content-Type': 'text/plain'}
+    body = client.post_account(headers, query_string='bulk-delete',
+                               data=data)[1]
+    if not body:
+        raise ClientException(
+            _("No content received from bulk delete. Is the bulk "
+              "operations middleware enabled?"))
+    result = jsonutils.loads(body)
+    errors = result.get('Errors')
+    if errors:
+        name, status = errors[0]
+        raise ClientException(
+            _("Bulk delete of '%(name)s' failed: %(status)s (%(count)d "
+              "errors in batch).") %
+            {'name': name, 'status': status, 'count': len(errors)},
+            http_status=int(status.split()[0]))
+    status = result.get('Response Status', '200 OK')
+    if not status.startswith('2'):
+        raise ClientException(
+            _("Bulk delete failed: %s") % status,
+            http_status=int(status.split()[0]))
@@ -14,6 +14,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
 import jinja2
 from oslo_config import cfg as oslo_config
 from oslo_log import log as logging
@@ -48,6 +50,46 @@ SERVICE_PARSERS = {
     'oracle': configurations.OracleConfParser,
 }
 
+# Server ids rendered in place of the real one when caching templates, so
+# that the same rendered template can be reused for every instance of a
+# datastore version and flavor.  Both are outside the range of
+# SingleInstanceConfigTemplate._calculate_unique_id.
+SERVER_ID_PLACEHOLDERS = (2 ** 31 + 271828, 2 ** 31 + 314159)
+MAX_CACHED_RENDERS = 512
+
+# Templates resolved for each template kind and datastore version
+_templates = {}
+# Rendered templates (and parsed default configs) with a placeholder
+# server id, or None if the server id can't simply be substituted, along
+# with the template they were rendered from.
+_rendered = {}
+
+
+def _flavor_key(flavor):
+    """Return the flavor details as a cache key, or None if the flavor
+    has no dict of details to build one from.
+    """
+    if not hasattr(flavor, 'items'):
+        flavor = getattr(flavor, 'to_dict', lambda: None)()
+        if flavor is None:
+            return None
+    return repr(sorted(flavor.items()))
+
+
+def _substitute_text(text, old_id, new_id):
+    return text.replace(str(old_id), str(new_id))
+
+
+def _substitute_items(items, old_id, new_id):
+    substituted = []
+    for key, value in items:
+        if value == old_id:
+            value = new_id
+        elif value == str(old_id):
+            value = str(new_id)
+        substituted.append((key, copy.deepcopy(value)))
+    return substituted
+
 
 class SingleInstanceConfigTemplate(object):
     """This class selects a single configuration file by database type for
@@ -80,14 +122,63 @@ class SingleInstanceConfigTemplate(object):
         }
         self.instance_id = instance_id
 
+    def _template_key(self):
+        return (self.template_name, self.datastore_dict['name'],
+                self.datastore_dict['version'],
+                self.datastore_dict['manager'])
+
     def get_template(self):
-        patterns = ['{name}/{version}/{template_name}',
-                    '{name}/{template_name}',
-                    '{manager}/{template_name}']
-        context = self.datastore_dict.copy()
-        context['template_name'] = self.template_name
-        names = [name.format(**context) for name in patterns]
-        return ENV.select_template(names)
+        key = self._template_key()
+        template = _templates.get(key)
+        # A template file that was edited is selected again, which
+        # reloads it.
+        if template is None or not template.is_up_to_date:
+            patterns = ['{name}/{version}/{template_name}',
+                        '{name}/{template_name}',
+                        '{manager}/{template_name}']
+            context = self.datastore_dict.copy()
+            context['template_name'] = self.template_name
+            names = [pattern.format(**context) for pattern in patterns]
+            template = ENV.select_template(names)
+            _templates[key] = template
+        return template
+
+    def _render_template(self, server_id, **kwargs):
+        return self.get_template().render(
+            flavor=self.flavor_dict,
+            datastore=self.datastore_dict,
+            server_id=server_id, **kwargs)
+
+    def _render_cached(self, kind, build, substitute):
+        """Return build(server_id) for this instance.
+
+        The result is built once per template, datastore version and
+        flavor with a placeholder server id, and the real server id is
+        substituted into a copy of it.  It is built again once the
+        template file changes.  If the template uses the server id in a
+        way that substitution can't reproduce, the result is built on
+        every call instead.
+        """
+        server_id = self._calculate_unique_id()
+        flavor_key = _flavor_key(self.flavor_dict)
+        if flavor_key is None:
+            return build(server_id)
+        key = (kind,) + self._template_key() + (flavor_key,)
+        template = self.get_template()
+        first_id, second_id = SERVER_ID_PLACEHOLDERS
+        cached = _rendered.get(key)
+        if cached is None or cached[0] is not template:
+            value = build(first_id)
+            if substitute(value, first_id, second_id) != build(second_id):
+                LOG.debug("Not caching %s for %s." % (kind, key))
+                value = None
+            if len(_rendered) >= MAX_CACHED_RENDERS:
+                _rendered.clear()
+            cached = _rendered[key] = (template, value)
+        value = cached[1]
+        if value is None:
+            return build(server_id)
+        return substitute(value, first_id, server_id)
 
     def render(self, **kwargs):
         """Renders the jinja template
@@ -95,12 +186,12 @@ class SingleInstanceConfigTemplate(object):
         :returns: str -- The rendered configuration file
 
         """
-        template = self.get_template()
-        server_id = self._calculate_unique_id()
-        self.config_contents = template.render(
-            flavor=self.flavor_dict,
-            datastore=self.datastore_dict,
-            server_id=server_id, **kwargs)
+        if kwargs:
+            self.config_contents = self._render_template(
+                self._calculate_unique_id(), **kwargs)
+        else:
+            self.config_contents = self._render_cached(
+                'render', self._render_template, _substitute_text)
         return self.config_contents
 
     def render_dict(self):
@@ -108,12 +199,15 @@ class SingleInstanceConfigTemplate(object):
         Renders the default configuration template file as a dictionary
         to apply the default configuration dynamically.
         """
-        config = self.render()
         cfg_parser = SERVICE_PARSERS.get(self.datastore_version.manager)
         if not cfg_parser:
             raise exception.NoConfigParserFound(
                 datastore_manager=self.datastore_version.manager)
-        return cfg_parser(config).parse()
+        return self._render_cached(
+            'render_dict',
+            lambda server_id: list(cfg_parser(
+                self._render_template(server_id)).parse()),
+            _substitute_items)
 
     def _calculate_unique_id(self):
         """
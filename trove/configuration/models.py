@@ -15,6 +15,7 @@
 
 from datetime import datetime
 import json
+import time
 
 from oslo_log import log as logging
 
@@ -140,10 +141,14 @@ class Configuration(object):
             raise ModelNotFoundError(msg)
 
     @staticmethod
-    def find_parameter_details(name, detail_list):
-        for item in detail_list:
-            if item.name == name:
-                return item
+    def find_parameter_details(name, rules):
+        """Find the rule for the parameter in the name-indexed rules
+        returned by DatastoreConfigurationParameters.load_rules.  As
+        before the rules were indexed, the name must match exactly.
+        """
+        rule = rules.get(name.lower())
+        if rule and rule.name == name:
+            return rule
         return None
 
     @staticmethod
@@ -154,12 +159,11 @@ class Configuration(object):
         config_items = DBConfigurationParameter.find_all(
             configuration_id=id, deleted=False).all()
 
-        detail_list = DatastoreConfigurationParameters.load_parameters(
-            datastore_v.id)
+        rules = DatastoreConfigurationParameters.load_rules(datastore_v.id)
 
         for item in config_items:
             rule = Configuration.find_parameter_details(
-                str(item.configuration_key), detail_list)
+                str(item.configuration_key), rules)
             if not rule:
                 continue
             if rule.data_type == 'boolean':
@@ -188,13 +192,13 @@ class Configuration(object):
         config_items = Configuration.load_items(self.context,
                                                 id=self.configuration_id)
         LOG.debug("config_items: %s" % config_items)
-        detail_list = DatastoreConfigurationParameters.load_parameters(
+        rules = DatastoreConfigurationParameters.load_rules(
             datastore_v.id, show_deleted=True)
 
         for i in config_items:
             LOG.debug("config item: %s" % i)
             details = Configuration.find_parameter_details(
-                i.configuration_key, detail_list)
+                i.configuration_key, rules)
             LOG.debug("parameter details: %s" % details)
             if not details:
                 raise exception.NotFound(uuid=i.configuration_key)
@@ -272,6 +276,10 @@ class DBDatastoreConfigurationParameters(dbmodels.DatabaseModelBase):
 
 class DatastoreConfigurationParameters(object):
 
+    # Name-indexed rules keyed by (datastore_version_id, show_deleted),
+    # along with the time they were loaded.
+    _rules_cache = {}
+
     def __init__(self, db_info):
         self.db_info = db_info
 
@@ -297,6 +305,7 @@ class DatastoreConfigurationParameters(object):
                 param.min_size = kwargs.get('min_size')
                 param.deleted = 0
                 param.save()
+                DatastoreConfigurationParameters.invalidate_rules(ds_v_id)
                 return param
             else:
                 raise exception.ConfigurationParameterAlreadyExists(
@@ -306,6 +315,7 @@ class DatastoreConfigurationParameters(object):
             pass
         config_param = DBDatastoreConfigurationParameters.create(
             **kwargs)
+        DatastoreConfigurationParameters.invalidate_rules(ds_v_id)
         return config_param
 
     @staticmethod
@@ -315,6 +325,7 @@ class DatastoreConfigurationParameters(object):
         config_param.deleted = True
         config_param.deleted_at = datetime.utcnow()
         config_param.save()
+        DatastoreConfigurationParameters.invalidate_rules(version_id)
 
     @classmethod
     def load_parameters(cls, datastore_version_id, show_deleted=False):
@@ -331,6 +342,32 @@ class DatastoreConfigurationParameters(object):
         except exception.NotFound:
             raise exception.NotFound(uuid=datastore_version_id)
 
+    @classmethod
+    def load_rules(cls, datastore_version_id, show_deleted=False):
+        """Load the parameter rules of a datastore version into a dict
+        keyed by lower case parameter name.  The rules are cached for
+        'configuration_parameters_cache_ttl' seconds, or until a parameter
+        of the datastore version is changed.
+        """
+        key = (datastore_version_id, show_deleted)
+        ttl = CONF.configuration_parameters_cache_ttl
+        cached = cls._rules_cache.get(key)
+        if cached and time.time() - cached[0] < ttl:
+            return cached[1]
+
+        rules = {}
+        for rule in cls.load_parameters(datastore_version_id,
+                                        show_deleted=show_deleted):
+            rules[rule.name.lower()] = rule
+        if ttl > 0:
+            cls._rules_cache[key] = (time.time(), rules)
+        return rules
+
+    @classmethod
+    def invalidate_rules(cls, datastore_version_id):
+        for show_deleted in (False, True):
+            cls._rules_cache.pop((datastore_version_id, show_deleted), None)
+
     @classmethod
     def load_parameter(cls, config_id, show_deleted=False):
         try:
@@ -394,6 +431,7 @@ def create_or_update_datastore_configuration_parameter(name,
             deleted=False,
         )
         get_db_api().save(config)
+    DatastoreConfigurationParameters.invalidate_rules(datastore_version.id)
 
 
 def load_datastore_configuration_parameters(datastore,
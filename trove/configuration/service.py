@@ -124,7 +124,7 @@ class ConfigurationsController(wsgi.Controller):
                 ConfigurationsController._validate_configuration(
                     body['configuration']['values'],
                     datastore_version,
-                    models.DatastoreConfigurationParameters.load_parameters(
+                    models.DatastoreConfigurationParameters.load_rules(
                         datastore_version.id))
 
                 for k, v in values.items():
@@ -259,7 +259,7 @@ class ConfigurationsController(wsgi.Controller):
             ConfigurationsController._validate_configuration(
                 configuration['values'],
                 ds_version,
-                models.DatastoreConfigurationParameters.load_parameters(
+                models.DatastoreConfigurationParameters.load_rules(
                     ds_version.id))
             for k, v in configuration['values'].items():
                 items.append(DBConfigurationParameter(
@@ -270,14 +270,12 @@ class ConfigurationsController(wsgi.Controller):
         return items
 
     @staticmethod
-    def _validate_configuration(values, datastore_version, config_rules):
+    def _validate_configuration(values, datastore_version, rules_lookup):
+        """Validate the values against the rules of the datastore version,
+        as returned by DatastoreConfigurationParameters.load_rules.
+        """
         LOG.info(_("Validating configuration values"))
 
-        # create rules dictionary based on parameter name
-        rules_lookup = {}
-        for item in config_rules:
-            rules_lookup[item.name.lower()] = item
-
         # checking if there are any rules for the datastore
         if not rules_lookup:
             output = {"version": datastore_version.name,
@@ -19,6 +19,7 @@ Dns Driver that uses Designate DNSaaS.
 
 import base64
 import hashlib
+import time
 
 from designateclient.v1 import Client
 from designateclient.v1.records import Record
@@ -48,6 +49,11 @@ DNS_DOMAIN_NAME = CONF.dns_domain_name
 
 LOG = logging.getLogger(__name__)
 
+# The records of each zone and the list of domains, shared by all the
+# drivers (one is created for every DNS operation).
+_record_indexes = {}
+_domains = {}
+
 
 class DesignateObjectConverter(object):
 
@@ -60,6 +66,23 @@ class DesignateObjectConverter(object):
                                priority=record.priority, dns_zone=dns_zone)
 
 
+class RecordIndex(object):
+    """The records of a zone indexed by name and by content."""
+
+    def __init__(self, records):
+        self.created = time.time()
+        self.cached = False
+        self.by_name = {}
+        self.by_content = {}
+        for record in records:
+            self.by_name.setdefault(record.name, []).append(record)
+            self.by_content.setdefault(record.data, []).append(record)
+
+    @property
+    def expired(self):
+        return time.time() - self.created >= CONF.dns_record_cache_ttl
+
+
 def create_designate_client():
     """Creates a Designate DNSaaS client."""
     client = Client(auth_url=DNS_AUTH_URL,
@@ -96,32 +119,42 @@ class DesignateDriver(driver.DnsDriver):
                         ttl=entry.ttl,
                         priority=entry.priority)
         client.records.create(dns_zone.id, record)
+        _record_indexes.pop(dns_zone.id, None)
 
     def delete_entry(self, name, type, dns_zone=None):
         """Deletes an entry with the given name and type from a dns zone."""
         dns_zone = dns_zone or self.default_dns_zone
-        records = self._get_records(dns_zone)
-        matching_record = [rec for rec in records
-                           if rec.name == name + '.' and rec.type == type]
+        matching_record = self._find_records(
+            dns_zone, 'by_name', name + '.', lambda rec: rec.type == type)
         if not matching_record:
             raise exception.DnsRecordNotFound(name)
         LOG.debug("Deleting DNS entry %s." % name)
-        self.dns_client.records.delete(dns_zone.id, matching_record[0].id)
+        try:
+            self.dns_client.records.delete(dns_zone.id, matching_record[0].id)
+        finally:
+            _record_indexes.pop(dns_zone.id, None)
 
     def get_entries_by_content(self, content, dns_zone=None):
         """Retrieves all entries in a DNS zone with matching content field."""
-        records = self._get_records(dns_zone)
+        records = self._find_records(dns_zone, 'by_content', content)
         return [self.converter.record_to_entry(record, dns_zone)
-                for record in records if record.data == content]
+                for record in records]
 
     def get_entries_by_name(self, name, dns_zone):
-        records = self._get_records(dns_zone)
+        records = self._find_records(dns_zone, 'by_name', name)
         return [self.converter.record_to_entry(record, dns_zone)
-                for record in records if record.name == name]
+                for record in records]
 
     def get_dns_zones(self, name=None):
         """Returns all dns zones (optionally filtered by the name argument."""
-        domains = self.dns_client.domains.list()
+        cached = _domains.get('domains')
+        if (cached and
+                time.time() - cached[0] < CONF.dns_record_cache_ttl):
+            domains = cached[1]
+        else:
+            domains = self.dns_client.domains.list()
+            if CONF.dns_record_cache_ttl > 0:
+                _domains['domains'] = (time.time(), domains)
         return [self.converter.domain_to_zone(domain)
                 for domain in domains if not name or domain.name == name]
 
@@ -139,6 +172,40 @@ class DesignateDriver(driver.DnsDriver):
             raise TypeError(_('DNS domain is must be specified'))
         return self.dns_client.records.list(dns_zone.id)
 
+    def _get_record_index(self, dns_zone):
+        """Return the index of the records of the zone.
+
+        The Designate API cannot filter records, so the index is kept for
+        'dns_record_cache_ttl' seconds, or until an entry is created or
+        deleted by this process.
+        """
+        dns_zone = dns_zone or self.default_dns_zone
+        if not dns_zone:
+            raise TypeError(_('DNS domain is must be specified'))
+        index = _record_indexes.get(dns_zone.id)
+        if index is None or index.expired:
+            index = RecordIndex(self._get_records(dns_zone))
+            if CONF.dns_record_cache_ttl > 0:
+                _record_indexes[dns_zone.id] = index
+        else:
+            index.cached = True
+        return index
+
+    def _find_records(self, dns_zone, index_name, key, match=None):
+        def _find(index):
+            records = getattr(index, index_name).get(key, [])
+            return [record for record in records
+                    if not match or match(record)]
+
+        index = self._get_record_index(dns_zone)
+        records = _find(index)
+        if not records and index.cached:
+            # The record may have been created since the index was built.
+            dns_zone = dns_zone or self.default_dns_zone
+            _record_indexes.pop(dns_zone.id, None)
+            records = _find(self._get_record_index(dns_zone))
+        return records
+
 
 class DesignateInstanceEntryFactory(driver.DnsInstanceEntryFactory):
     """Defines how instance DNS entries are created for instances."""
@@ -119,6 +119,7 @@ class ConfigurationsParameterController(wsgi.Controller):
         param.max_size = max_size
         param.min_size = min_size
         param.save()
+        ds_config_params.invalidate_rules(version_id)
         return wsgi.Result(
             views.MgmtConfigurationParameterView(param).data(),
             200)
@@ -17,18 +17,22 @@
 Model classes that extend the instances functionality for MySQL instances.
 """
 
+from eventlet import greenpool
 from novaclient import exceptions as nova_exceptions
 from oslo_log import log as logging
 
+from trove.common import cfg
 from trove.common import exception
 from trove.common.i18n import _
 from trove.common.remote import create_guest_client
 from trove.common.remote import create_nova_client
+from trove.datastore import models as datastore_models
 from trove.instance.models import DBInstance
 from trove.instance.models import InstanceServiceStatus
 from trove.instance.models import SimpleInstance
 
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
@@ -61,14 +65,46 @@ class DetailedHost(object):
         for instance in self.instances:
             instance['server_id'] = instance['uuid']
             del instance['uuid']
+
+        # Load the instances and their statuses with one query each.
+        server_ids = [instance['server_id'] for instance in self.instances]
+        db_infos = {}
+        if server_ids:
+            for db_info in DBInstance.find_by_filter(filters=[
+                    DBInstance.compute_instance_id.in_(server_ids)]):
+                known = db_infos.get(db_info.compute_instance_id)
+                if known is None or (known.deleted and not db_info.deleted):
+                    db_infos[db_info.compute_instance_id] = db_info
+        statuses = {}
+        if db_infos:
+            instance_ids = [db_info.id for db_info in db_infos.values()]
+            for status in InstanceServiceStatus.find_by_filter(filters=[
+                    InstanceServiceStatus.instance_id.in_(instance_ids)]):
+                statuses[status.instance_id] = status
+
+        datastores = {}
+        for instance in self.instances:
+            db_info = db_infos.get(instance['server_id'])
             try:
-                db_info = DBInstance.find_by(
-                    compute_instance_id=instance['server_id'])
+                if db_info is None:
+                    raise exception.ModelNotFoundError(
+                        _("DBInstance Not Found"))
                 instance['id'] = db_info.id
                 instance['tenant_id'] = db_info.tenant_id
-                status = InstanceServiceStatus.find_by(
-                    instance_id=db_info.id)
-                instance_info = SimpleInstance(None, db_info, status)
+                if db_info.id not in statuses:
+                    raise exception.ModelNotFoundError(
+                        _("InstanceServiceStatus Not Found"))
+                version_id = db_info.datastore_version_id
+                if version_id not in datastores:
+                    ds_version = (datastore_models.DatastoreVersion.
+                                  load_by_uuid(version_id))
+                    datastores[version_id] = (
+                        ds_version, datastore_models.Datastore.load(
+                            ds_version.datastore_id))
+                ds_version, ds = datastores[version_id]
+                instance_info = SimpleInstance(
+                    None, db_info, statuses[db_info.id],
+                    ds_version=ds_version, ds=ds)
                 instance['status'] = instance_info.status
             except exception.TroveError as re:
                 LOG.error(re)
@@ -79,15 +115,20 @@ class DetailedHost(object):
     def update_all(self, context):
         num_i = len(self.instances)
         LOG.debug("Host %s has %s instances to update." % (self.name, num_i))
-        failed_instances = []
-        for instance in self.instances:
+
+        def _update(instance):
             client = create_guest_client(context, instance['id'])
             try:
                 client.update_guest()
             except exception.TroveError as re:
                 LOG.error(re)
                 LOG.error(_("Unable to update instance: %s.") % instance['id'])
-                failed_instances.append(instance['id'])
+                return instance['id']
+
+        pool = greenpool.GreenPool(CONF.host_update_workers)
+        failed_instances = [instance_id for instance_id
+                            in pool.imap(_update, self.instances)
+                            if instance_id is not None]
         if len(failed_instances) > 0:
             msg = _("Failed to update instances: %s.") % failed_instances
             raise exception.UpdateGuestError(msg)
@@ -13,17 +13,22 @@
 #    under the License.
 import datetime
 
+from eventlet import greenpool
+from eventlet import greenthread
+from novaclient import exceptions as nova_exceptions
 from oslo_log import log as logging
 
 from trove.common import cfg
-from trove.common import exception
 from trove.common.i18n import _
+from trove.common.instance import ServiceStatus
 from trove.common import remote
 from trove.common import utils
+from trove.datastore import models as datastore_models
 from trove.extensions.common import models as common_models
 from trove.instance import models as imodels
 from trove.instance import models as instance_models
 from trove.instance.models import load_instance, InstanceServiceStatus
+from trove.instance.tasks import InstanceTasks
 from trove import rpc
 
 LOG = logging.getLogger(__name__)
@@ -32,6 +37,11 @@ CONF = cfg.CONF
 
 def load_mgmt_instances(context, deleted=None, client=None,
                         include_clustered=None):
+    """Load the instances for the management API, with their servers.
+
+    The instances are streamed from the database with their service
+    statuses, so an iterator over them is returned.
+    """
     if not client:
         client = remote.create_nova_client(context, CONF.os_region_name)
     try:
@@ -45,11 +55,125 @@ def load_mgmt_instances(context, deleted=None, client=None,
         args['deleted'] = deleted
     if not include_clustered:
         args['cluster_id'] = None
-    db_infos = instance_models.DBInstance.find_all(**args)
 
-    instances = MgmtInstances.load_status_from_existing(context, db_infos,
-                                                        mgmt_servers)
-    return instances
+    return MgmtInstances.load_all(context, mgmt_servers or [], **args)
+
+
+def _find_instances_with_status(**conditions):
+    """Stream the instances matching the conditions, each with its service
+    status, from one joined query read in batches of
+    'exists_notification_batch_size' rows.
+
+    There is a small window of opportunity during which the db resource for
+    an instance exists, but no InstanceServiceStatus for it has yet been
+    created. Such instances are left out: they are too new and will get
+    picked up the next time.
+    """
+    # The join is made on the SQLAlchemy query itself, as joining a
+    # find_all query would drop its conditions.
+    conditions.setdefault('deleted', False)
+    query = instance_models.DBInstance.query().filter_by(
+        **conditions).join(
+        InstanceServiceStatus,
+        InstanceServiceStatus.instance_id == instance_models.DBInstance.id)
+    return query.add_entity(InstanceServiceStatus).yield_per(
+        CONF.exists_notification_batch_size)
+
+
+def _load_datastore(datastores, version_id):
+    """Load the datastore version and datastore of an instance, once for
+    all the instances of the version (the loaded ones are kept in the
+    datastores dict).
+    """
+    if version_id not in datastores:
+        ds_version = datastore_models.DatastoreVersion.load_by_uuid(
+            version_id)
+        datastores[version_id] = (
+            ds_version,
+            datastore_models.Datastore.load(ds_version.datastore_id))
+    return datastores[version_id]
+
+
+def _set_server_status(db_info, server):
+    if InstanceTasks.BUILDING == db_info.task_status:
+        db_info.server_status = "BUILD"
+        db_info.addresses = {}
+    elif server is not None:
+        db_info.server_status = server.status
+        db_info.addresses = server.addresses
+    else:
+        db_info.server_status = "SHUTDOWN"  # Fake it...
+        db_info.addresses = {}
+
+
+def load_mgmt_instances_page(context, limit=None, marker=None, deleted=None,
+                             include_clustered=False, tenant_id=None,
+                             datastore=None, status=None, host=None,
+                             client=None):
+    """Load a page of the instances for the management API.
+
+    The filters are applied by the database query, joining the datastore
+    versions for the datastore and the service statuses for the status.
+    Nova is only asked for the servers on the host or on the page.
+    :returns:           The page of instances and the next marker.
+    """
+    if not client:
+        client = remote.create_nova_client(context, CONF.os_region_name)
+    conditions = {}
+    filters = []
+    if deleted is not None:
+        conditions['deleted'] = deleted
+    if not include_clustered:
+        conditions['cluster_id'] = None
+    if tenant_id:
+        conditions['tenant_id'] = tenant_id
+    if datastore:
+        ds = datastore_models.Datastore.load(datastore)
+        filters.extend([
+            instance_models.DBInstance.datastore_version_id ==
+            datastore_models.DBDatastoreVersion.id,
+            datastore_models.DBDatastoreVersion.datastore_id == ds.id])
+    if status:
+        codes = [service_status.code for service_status
+                 in ServiceStatus.from_api_status(status.upper())]
+        filters.extend([
+            instance_models.DBInstance.id == InstanceServiceStatus.instance_id,
+            InstanceServiceStatus.status_id.in_(codes)])
+    servers = None
+    if host:
+        servers = client.servers.list(
+            search_opts={'all_tenants': 1, 'host': host})
+        filters.append(instance_models.DBInstance.compute_instance_id.in_(
+            [server.id for server in servers]))
+
+    query = instance_models.DBInstance.find_by_filter(filters=filters,
+                                                      **conditions)
+    limit = utils.pagination_limit(limit, CONF.instances_page_size)
+    data_view = instance_models.DBInstance.find_by_pagination(
+        'instances', query, 'foo', limit=limit, marker=marker)
+    db_infos = data_view.collection
+    if servers is None:
+        servers = _get_servers(client, db_infos)
+    return (MgmtInstances.load_page(context, db_infos, servers),
+            data_view.next_page_marker)
+
+
+def _get_servers(client, db_infos):
+    """Get the servers of the given instances concurrently."""
+    def _get_server(server_id):
+        try:
+            try:
+                return client.rdservers.get(server_id)
+            except AttributeError:
+                return client.servers.get(server_id)
+        except nova_exceptions.NotFound:
+            return None
+
+    server_ids = [db_info.compute_instance_id for db_info in db_infos
+                  if db_info.compute_instance_id]
+    pool = greenpool.GreenPool(CONF.instances_page_size)
+    return [server for server in pool.imap(_get_server, server_ids)
+            if server is not None]
 
 
 def load_mgmt_instance(cls, context, id, include_deleted):
@@ -80,9 +204,9 @@ def load_mgmt_instance(cls, context, id, include_deleted):
 
 
 class SimpleMgmtInstance(imodels.BaseInstance):
-    def __init__(self, context, db_info, server, datastore_status):
+    def __init__(self, context, db_info, server, datastore_status, **kwargs):
         super(SimpleMgmtInstance, self).__init__(context, db_info, server,
-                                                 datastore_status)
+                                                 datastore_status, **kwargs)
 
     @property
     def status(self):
@@ -146,40 +270,70 @@ class MgmtInstance(imodels.Instance):
 
 class MgmtInstances(imodels.Instances):
     @staticmethod
-    def load_status_from_existing(context, db_infos, servers):
-        def load_instance(context, db, status, server=None):
-            return SimpleMgmtInstance(context, db, server, status)
+    def load_all(context, servers, **conditions):
+        """Load the instances matching the conditions, streamed from the
+        database with their service statuses by one joined query.
+        """
+        if context is None:
+            raise TypeError("Argument context not defined.")
+        servers = dict((server.id, server) for server in servers)
+        datastores = {}
+        for db_info, service_status in _find_instances_with_status(
+                **conditions):
+            server = servers.get(db_info.compute_instance_id)
+            _set_server_status(db_info, server)
+            if not service_status.status:
+                LOG.error(_("Server status could not be read for "
+                            "instance id(%s).") % db_info.id)
+                continue
+            ds_version, ds = _load_datastore(
+                datastores, db_info.datastore_version_id)
+            yield SimpleMgmtInstance(context, db_info, server, service_status,
+                                     ds_version=ds_version, ds=ds)
 
+    @staticmethod
+    def load_page(context, db_infos, servers):
+        """Load the given instances, with the statuses of all of them
+        loaded by a single query.
+        """
         if context is None:
             raise TypeError("Argument context not defined.")
-        find_server = imodels.create_server_list_matcher(servers)
-        instances = imodels.Instances._load_servers_status(load_instance,
-                                                           context,
-                                                           db_infos,
-                                                           find_server)
-        _load_servers(instances, find_server)
+        servers = dict((server.id, server) for server in servers)
+        statuses = {}
+        if db_infos:
+            for service_status in InstanceServiceStatus.find_by_filter(
+                    filters=[InstanceServiceStatus.instance_id.in_(
+                        [db_info.id for db_info in db_infos])]):
+                statuses[service_status.instance_id] = service_status
+        datastores = {}
+        instances = []
+        for db_info in db_infos:
+            server = servers.get(db_info.compute_instance_id)
+            _set_server_status(db_info, server)
+            service_status = statuses.get(db_info.id)
+            if not service_status or not service_status.status:
+                LOG.error(_("Server status could not be read for "
+                            "instance id(%s).") % db_info.id)
+                continue
+            ds_version, ds = _load_datastore(
+                datastores, db_info.datastore_version_id)
+            instances.append(SimpleMgmtInstance(
+                context, db_info, server, service_status,
+                ds_version=ds_version, ds=ds))
         return instances
 
 
-def _load_servers(instances, find_server):
-    for instance in instances:
-        db = instance.db_info
-        instance.server = None
-        try:
-            server = find_server(db.id, db.compute_instance_id)
-            instance.server = server
-        except Exception as ex:
-            LOG.exception(ex)
-    return instances
-
-
 def publish_exist_events(transformer, admin_context):
     notifier = rpc.get_notifier("taskmanager")
     notifications = transformer()
     # clear out admin_context.auth_token so it does not get logged
     admin_context.auth_token = None
-    for notification in notifications:
+    batch_size = CONF.exists_notification_batch_size
+    for index, notification in enumerate(notifications, 1):
         notifier.info(admin_context, "trove.instance.exists", notification)
+        if index % batch_size == 0:
+            # Let the other tasks of the task manager run between batches.
+            greenthread.sleep(0)
 
 
 class NotificationTransformer(object):
@@ -228,21 +382,13 @@ class NotificationTransformer(object):
     def __call__(self):
         audit_start, audit_end = NotificationTransformer._get_audit_period()
         messages = []
-        db_infos = instance_models.DBInstance.find_all(deleted=False)
-        for db_info in db_infos:
-            try:
-                service_status = InstanceServiceStatus.find_by(
-                    instance_id=db_info.id)
-            except exception.ModelNotFoundError:
-                # There is a small window of opportunity during when the db
-                # resource for an instance exists, but no InstanceServiceStatus
-                # for it has yet been created. We skip sending the notification
-                # message for all such instances. These instance are too new
-                # and will get picked up the next round of notifications.
-                LOG.debug("InstanceServiceStatus not found for %s. "
-                          "Will wait to send notification." % db_info.id)
-                continue
-            instance = SimpleMgmtInstance(None, db_info, None, service_status)
+        datastores = {}
+        for db_info, service_status in _find_instances_with_status(
+                deleted=False):
+            ds_version, ds = _load_datastore(
+                datastores, db_info.datastore_version_id)
+            instance = SimpleMgmtInstance(None, db_info, None, service_status,
+                                          ds_version=ds_version, ds=ds)
             message = self.transform_instance(instance, audit_start, audit_end)
             messages.append(message)
         return messages
@@ -255,6 +401,18 @@ class NovaNotificationTransformer(NotificationTransformer):
         self.nova_client = remote.create_admin_nova_client(self.context)
         self._flavor_cache = {}
 
+    def _load_flavors(self):
+        """Load the names of all the flavors with a single request.  The
+        flavors missing from the list are still looked up one at a time.
+        """
+        try:
+            flavors = self.nova_client.flavors.list(is_public=None)
+        except nova_exceptions.ClientException as e:
+            LOG.warning(_("Could not list the flavors: %s"), e)
+            return
+        for flavor in flavors:
+            self._flavor_cache[flavor.id] = flavor.name
+
     def _lookup_flavor(self, flavor_id):
         if flavor_id in self._flavor_cache:
             LOG.debug("Flavor cache hit for %s" % flavor_id)
@@ -267,6 +425,7 @@ class NovaNotificationTransformer(NotificationTransformer):
 
     def __call__(self):
         audit_start, audit_end = NotificationTransformer._get_audit_period()
+        self._load_flavors()
         instances = load_mgmt_instances(self.context, deleted=False,
                                         client=self.nova_client)
         messages = []
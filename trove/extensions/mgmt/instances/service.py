@@ -24,6 +24,7 @@ from trove.common import exception
 from trove.common.i18n import _
 from trove.common import notification
 from trove.common.notification import StartNotification
+from trove.common import pagination
 from trove.common import wsgi
 from trove.extensions.common import models as common_models
 from trove.extensions.mgmt.instances import models
@@ -62,14 +63,21 @@ class MgmtInstanceController(InstanceController):
         clustered_q = req.GET.get('include_clustered', '').lower()
         include_clustered = clustered_q == 'true'
         try:
-            instances = models.load_mgmt_instances(
-                context, deleted=deleted, include_clustered=include_clustered)
+            instances, marker = models.load_mgmt_instances_page(
+                context, limit=context.limit, marker=context.marker,
+                deleted=deleted, include_clustered=include_clustered,
+                tenant_id=req.GET.get('tenant'),
+                datastore=req.GET.get('datastore'),
+                status=req.GET.get('status'),
+                host=req.GET.get('host'))
         except nova_exceptions.ClientException as e:
             LOG.exception(e)
             return wsgi.Result(str(e), 403)
 
-        view_cls = views.MgmtInstancesView
-        return wsgi.Result(view_cls(instances, req=req).data(), 200)
+        view = views.MgmtInstancesView(instances, req=req)
+        paged = pagination.SimplePaginatedDataView(req.url, 'instances', view,
+                                                   marker)
+        return wsgi.Result(paged.data(), 200)
 
     @admin_context
     def show(self, req, tenant_id, id):
@@ -459,14 +459,19 @@ class API(object):
         self._call("unmount_volume", AGENT_LOW_TIMEOUT, version=version,
                    device_path=device_path, mount_point=mount_point)
 
-    def resize_fs(self, device_path=None, mount_point=None):
-        """Resize the filesystem."""
+    def resize_fs(self, device_path=None, mount_point=None, online=False):
+        """Resize the filesystem, growing it while mounted if online."""
         LOG.debug("Resize device %(device)s on instance %(id)s." % {
             'device': device_path, 'id': self.id})
         version = self.API_BASE_VERSION
+        kwargs = {}
+        if online:
+            # Only sent when set, so older guests can still resize offline
+            kwargs['online'] = online
 
         self._call("resize_fs", AGENT_HIGH_TIMEOUT, version=version,
-                   device_path=device_path, mount_point=mount_point)
+                   device_path=device_path, mount_point=mount_point,
+                   **kwargs)
 
     def update_overrides(self, overrides, remove=False):
         """Update the overrides."""
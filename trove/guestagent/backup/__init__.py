@@ -33,7 +33,7 @@ def backup(context, backup_info):
     return AGENT.execute_backup(context, backup_info)
 
 
-def restore(context, backup_info, restore_location):
+def restore(context, backup_info, restore_location, **kwargs):
     """
     Main entry point for restoring a backup based on the given backup id.  This
     will transfer backup data to this instance an will carry out the
@@ -41,5 +41,12 @@ def restore(context, backup_info, restore_location):
 
     :param context:     the context token which contains the users details
     :param backup_id:   the id of the persisted backup object
+    :param kwargs:      additional options for the restore runner
     """
-    return AGENT.execute_restore(context, backup_info, restore_location)
+    return AGENT.execute_restore(context, backup_info, restore_location,
+                                 **kwargs)
+
+
+def get_restore_runner(backup_type):
+    """Returns the RestoreRunner class used to restore the backup type."""
+    return AGENT._get_restore_runner(backup_type)
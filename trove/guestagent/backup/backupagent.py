@@ -157,7 +157,8 @@ class BackupAgent(object):
         self.stream_backup_to_storage(context, backup_info, runner, storage,
                                       parent_metadata, extra_opts)
 
-    def execute_restore(self, context, backup_info, restore_location):
+    def execute_restore(self, context, backup_info, restore_location,
+                        **kwargs):
 
         try:
             LOG.debug("Getting Restore Runner %(type)s.", backup_info)
@@ -171,7 +172,7 @@ class BackupAgent(object):
             runner = restore_runner(storage, location=backup_info['location'],
                                     checksum=backup_info['checksum'],
                                     restore_location=restore_location,
-                                    backup_id=backup_info['id'])
+                                    backup_id=backup_info['id'], **kwargs)
             backup_info['restore_location'] = restore_location
             LOG.debug("Restoring instance from backup %(id)s to "
                       "%(restore_location)s.", backup_info)
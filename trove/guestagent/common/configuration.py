@@ -14,6 +14,8 @@
 #    under the License.
 
 import abc
+import copy
+import errno
 import os
 import re
 import six
@@ -23,6 +25,96 @@ from trove.guestagent.common import operating_system
 from trove.guestagent.common.operating_system import FileMode
 
 
+class ParsedFileCache(object):
+    """Keeps the parsed contents of configuration files and the listings of
+    revision directories, so that an override change only reads and
+    writes its own file.
+
+    A file is read again when its inode, modification time or size
+    changes, and a directory is listed again when it changes.  Files in
+    directories the agent cannot search are only modified through this
+    cache, which updates itself as it writes and removes them.
+    """
+
+    def __init__(self):
+        self._files = {}
+        self._listings = {}
+
+    @staticmethod
+    def _stamp(path):
+        """Return the (inode, mtime, size) of a path, None if it cannot be
+        checked without privileges, or False if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+            return stat.st_ino, stat.st_mtime, stat.st_size
+        except OSError as e:
+            if e.errno == errno.EACCES:
+                return None
+            return False
+
+    def read(self, path, codec, as_root=False):
+        stamp = self._stamp(path)
+        cached = self._files.get(path)
+        if cached and stamp is not False and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
+
+        options = operating_system.read_file(path, codec=codec,
+                                             as_root=as_root)
+        if stamp is not False:
+            self._files[path] = (stamp, copy.deepcopy(options))
+        return options
+
+    def write(self, path, options, codec, as_root=False):
+        contents = codec.serialize(options)
+        operating_system.write_file(path, contents, as_root=as_root)
+        # Keep the options as they would be read back from the file.
+        self._files[path] = (self._stamp(path), codec.deserialize(contents))
+        listing = self._listings.get(os.path.dirname(path))
+        if listing and path not in listing[1]:
+            listing[1].add(path)
+            self._update_listing_stamp(os.path.dirname(path))
+
+    def remove(self, path, as_root=False):
+        operating_system.remove(path, force=True, as_root=as_root)
+        self.invalidate(path)
+        listing = self._listings.get(os.path.dirname(path))
+        if listing and path in listing[1]:
+            listing[1].discard(path)
+            self._update_listing_stamp(os.path.dirname(path))
+
+    def invalidate(self, path):
+        """Forget the parsed contents of a file changed by other means."""
+        self._files.pop(path, None)
+
+    def list_files(self, directory, as_root=False):
+        """Return the paths of the files in a given directory (recursively).
+        """
+        stamp = self._stamp(directory)
+        cached = self._listings.get(directory)
+        if cached and stamp is not False and cached[0] == stamp:
+            return set(cached[1])
+
+        files = operating_system.list_files_in_directory(
+            directory, recursive=True, as_root=as_root)
+        if stamp is not False:
+            self._listings[directory] = (stamp, set(files))
+        return files
+
+    def _update_listing_stamp(self, directory):
+        stamp = self._stamp(directory)
+        self._listings[directory] = (stamp, self._listings[directory][1])
+
+    def clear(self):
+        self._files.clear()
+        self._listings.clear()
+
+
+# Shared by all the configuration managers of the agent, so that they see
+# each other's changes.
+_parsed_files = ParsedFileCache()
+
+
 class ConfigurationManager(object):
     """
     ConfigurationManager is responsible for management of
@@ -111,9 +203,8 @@ class ConfigurationManager(object):
         :returns:        Configuration file as a Python dict.
         """
 
-        base_options = operating_system.read_file(
-            self._base_config_path, codec=self._codec,
-            as_root=self._requires_root)
+        base_options = _parsed_files.read(
+            self._base_config_path, self._codec, as_root=self._requires_root)
 
         updates = self._override_strategy.parse_updates()
         guestagent_utils.update_dict(updates, base_options)
@@ -137,6 +228,7 @@ class ConfigurationManager(object):
 
             operating_system.write_file(
                 self._base_config_path, options, as_root=self._requires_root)
+            _parsed_files.invalidate(self._base_config_path)
             operating_system.chown(
                 self._base_config_path, self._owner, self._group,
                 as_root=self._requires_root)
@@ -351,13 +443,12 @@ class ImportOverrideStrategy(ConfigurationOverrideStrategy):
                 self._revision_ext)
         else:
             # Update the existing file.
-            current = operating_system.read_file(
-                revision_file, codec=self._codec, as_root=self._requires_root)
+            current = _parsed_files.read(
+                revision_file, self._codec, as_root=self._requires_root)
             options = guestagent_utils.update_dict(options, current)
 
-        operating_system.write_file(
-            revision_file, options, codec=self._codec,
-            as_root=self._requires_root)
+        _parsed_files.write(revision_file, options, self._codec,
+                            as_root=self._requires_root)
         operating_system.chown(
             revision_file, self._owner, self._group,
             as_root=self._requires_root)
@@ -384,21 +475,22 @@ class ImportOverrideStrategy(ConfigurationOverrideStrategy):
             removed = self._collect_revision_files(group_name)
 
         for path in removed:
-            operating_system.remove(path, force=True,
-                                    as_root=self._requires_root)
+            _parsed_files.remove(path, as_root=self._requires_root)
 
     def get(self, group_name, change_id):
         revision_file = self._find_revision_file(group_name, change_id)
 
-        return operating_system.read_file(revision_file,
-                                          codec=self._codec,
-                                          as_root=self._requires_root)
+        return _parsed_files.read(revision_file, self._codec,
+                                  as_root=self._requires_root)
 
     def parse_updates(self):
+        """Merge the revisions in the order they were applied.  Only the
+        revision files that changed since they were last parsed are read.
+        """
         parsed_options = {}
         for path in self._collect_revision_files():
-            options = operating_system.read_file(path, codec=self._codec,
-                                                 as_root=self._requires_root)
+            options = _parsed_files.read(path, self._codec,
+                                         as_root=self._requires_root)
             guestagent_utils.update_dict(options, parsed_options)
 
         return parsed_options
@@ -431,16 +523,17 @@ class ImportOverrideStrategy(ConfigurationOverrideStrategy):
         they were applied.
         """
         name_pattern = self._build_rev_name_pattern(group_name=group_name)
-        return sorted(operating_system.list_files_in_directory(
-            self._revision_dir, recursive=True, pattern=name_pattern,
-            as_root=self._requires_root))
+        return self._list_revision_files(name_pattern)
 
     def _find_revision_file(self, group_name, change_id):
         name_pattern = self._build_rev_name_pattern(group_name, change_id)
-        found = operating_system.list_files_in_directory(
-            self._revision_dir, recursive=True, pattern=name_pattern,
-            as_root=self._requires_root)
-        return next(iter(found), None)
+        return next(iter(self._list_revision_files(name_pattern)), None)
+
+    def _list_revision_files(self, name_pattern):
+        files = _parsed_files.list_files(self._revision_dir,
+                                         as_root=self._requires_root)
+        return sorted(path for path in files
+                      if re.match(name_pattern, os.path.basename(path)))
 
     def _build_rev_name_pattern(self, group_name='.+', change_id='.+'):
         return self.FILE_NAME_PATTERN % (group_name, change_id,
@@ -514,8 +607,8 @@ class OneFileOverrideStrategy(ConfigurationOverrideStrategy):
                 # The base revision file is no longer needed if there are no
                 # overrides. It will be regenerated based on the current
                 # configuration file on the first 'apply()'.
-                operating_system.remove(self._base_revision_file, force=True,
-                                        as_root=self._requires_root)
+                _parsed_files.remove(self._base_revision_file,
+                                     as_root=self._requires_root)
 
     def get(self, group_name, change_id):
         return self._import_strategy.get(group_name, change_id)
@@ -532,11 +625,10 @@ class OneFileOverrideStrategy(ConfigurationOverrideStrategy):
                 self._base_config_path, self._base_revision_file,
                 force=True, preserve=True, as_root=self._requires_root)
 
-        base_revision = operating_system.read_file(
-            self._base_revision_file, codec=self._codec,
+        base_revision = _parsed_files.read(
+            self._base_revision_file, self._codec,
             as_root=self._requires_root)
         changes = self._import_strategy.parse_updates()
         updated_revision = guestagent_utils.update_dict(changes, base_revision)
-        operating_system.write_file(
-            self._base_config_path, updated_revision, codec=self._codec,
-            as_root=self._requires_root)
+        _parsed_files.write(self._base_config_path, updated_revision,
+                            self._codec, as_root=self._requires_root)
@@ -38,6 +38,7 @@ from trove.common import exception
 from trove.common.i18n import _
 from trove.common.stream_codecs import IdentityCodec
 from trove.common import utils
+from trove.guestagent.common import privileged
 
 REDHAT = 'redhat'
 DEBIAN = 'debian'
@@ -105,6 +106,9 @@ def exists(path, is_directory=False, as_root=False):
     # Only check as root if we can't see it as the regular user, since
     # this is more expensive
     if not found and as_root:
+        helper = privileged.get_helper()
+        if helper:
+            return helper.exists(path, is_directory=is_directory)
         test_flag = '-d' if is_directory else '-f'
         cmd = 'test %s %s && echo 1 || echo 0' % (test_flag, path)
         stdout, _ = utils.execute_with_timeout(
@@ -127,6 +131,13 @@ def _read_file_as_root(path, codec, decode=True):
     :param decode:             Should the codec decode the data.
     :type decode:              boolean
     """
+    helper = privileged.get_helper()
+    if helper:
+        data = helper.read_file(path)
+        if decode:
+            return codec.deserialize(data)
+        return codec.serialize(data)
+
     with tempfile.NamedTemporaryFile() as fp:
         copy(path, fp.name, force=True, dereference=True, as_root=True)
         chmod(fp.name, FileMode.ADD_READ_ALL(), as_root=True)
@@ -187,6 +198,14 @@ def _write_file_as_root(path, data, codec, encode=True):
     :param encode:             Should the codec encode the data.
     :type encode:              boolean
     """
+    helper = privileged.get_helper()
+    if helper:
+        if encode:
+            helper.write_file(path, codec.serialize(data))
+        else:
+            helper.write_file(path, codec.deserialize(data))
+        return
+
     # The files gets removed automatically once the managing object goes
     # out of scope.
     with tempfile.NamedTemporaryFile('w', delete=False) as fp:
@@ -826,7 +845,8 @@ def _execute_shell_cmd(cmd, options, *args, **kwargs):
     """
 
     exec_args = {}
-    if kwargs.pop('as_root', False):
+    as_root = kwargs.pop('as_root', False)
+    if as_root:
         exec_args['run_as_root'] = True
         exec_args['root_helper'] = 'sudo'
 
@@ -838,7 +858,13 @@ def _execute_shell_cmd(cmd, options, *args, **kwargs):
 
     cmd_flags = _build_command_options(options)
     cmd_args = cmd_flags + list(args)
-    stdout, stderr = utils.execute_with_timeout(cmd, *cmd_args, **exec_args)
+    helper = privileged.get_helper() if as_root else None
+    if helper and cmd in privileged.COMMANDS:
+        stdout, stderr = helper.execute(
+            cmd, *cmd_args, timeout=exec_args.get('timeout', 30))
+    else:
+        stdout, stderr = utils.execute_with_timeout(cmd, *cmd_args,
+                                                    **exec_args)
     return stdout
 
 
@@ -0,0 +1,229 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""A long-lived privileged helper for the file operations of the guest.
+
+Running every 'as_root' file operation through its own 'sudo' process
+pays for a fork, an exec and a PAM session each time.  Instead, the helper
+is started once with 'sudo' and serves the operations of the guest agent
+over a pipe, one JSON request per line:
+
+    {"op": <operation>, "args": {<keyword arguments>}}
+
+Only the operations in OPERATIONS are served, and 'execute' only runs the
+file commands in COMMANDS, without a shell.  The pipe is private to the
+guest agent process that started the helper.
+"""
+
+import base64
+import json
+import os
+import subprocess
+import sys
+
+from eventlet.green import subprocess as green_subprocess
+from eventlet import semaphore
+from eventlet import Timeout
+from oslo_log import log as logging
+import six
+
+from trove.common import cfg
+from trove.common import exception
+from trove.common.i18n import _
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# The commands the helper runs on behalf of the guest agent.
+COMMANDS = frozenset(['chmod', 'chown', 'cp', 'df', 'find', 'mkdir', 'mv',
+                      'rm'])
+# The only options 'find' is run with, and how many values each takes.
+# Its actions (such as -exec or -delete) would run anything as root.
+FIND_OPTIONS = {'-noleaf': 0, '-maxdepth': 1, '-type': 1, '-regextype': 1,
+                '-regex': 1}
+
+
+def _encode(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _decode(text):
+    return base64.b64decode(text)
+
+
+def _check_find_args(args):
+    """Only allow 'find' to list a single path with the FIND_OPTIONS."""
+    if not args or args[0].startswith('-'):
+        raise ValueError(_("Invalid arguments: %s") % args)
+    index = 1
+    while index < len(args):
+        if args[index] not in FIND_OPTIONS:
+            raise ValueError(_("Option not allowed: %s") % args[index])
+        index += 1 + FIND_OPTIONS[args[index]]
+    if index != len(args):
+        raise ValueError(_("Invalid arguments: %s") % args)
+
+
+def _execute(cmd, args):
+    if cmd not in COMMANDS:
+        raise ValueError(_("Command not allowed: %s") % cmd)
+    if not all(isinstance(arg, six.string_types) for arg in args):
+        raise ValueError(_("Invalid arguments: %s") % args)
+    if cmd == 'find':
+        _check_find_args(args)
+    process = subprocess.Popen([cmd] + list(args), stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, close_fds=True)
+    stdout, stderr = process.communicate()
+    return {'exit_code': process.returncode,
+            'stdout': _encode(stdout), 'stderr': _encode(stderr)}
+
+
+def _exists(path, is_directory):
+    if is_directory:
+        return os.path.isdir(path)
+    return os.path.isfile(path)
+
+
+def _read(path):
+    with open(path, 'rb') as fp:
+        return _encode(fp.read())
+
+
+def _write(path, data):
+    with open(path, 'wb') as fp:
+        fp.write(_decode(data))
+
+
+OPERATIONS = {'execute': _execute,
+              'exists': _exists,
+              'read': _read,
+              'write': _write}
+
+
+def serve(requests, replies):
+    """Serve the requests read from a stream until it is closed."""
+    for line in iter(requests.readline, b''):
+        try:
+            request = json.loads(line)
+            operation = OPERATIONS[request['op']]
+            reply = {'result': operation(**request['args'])}
+        except Exception as e:
+            reply = {'error': '%s: %s' % (type(e).__name__, e)}
+        replies.write(json.dumps(reply).encode('ascii') + b'\n')
+        replies.flush()
+
+
+def main():
+    serve(getattr(sys.stdin, 'buffer', sys.stdin),
+          getattr(sys.stdout, 'buffer', sys.stdout))
+
+
+class PrivilegedHelper(object):
+    """The guest agent side of the privileged helper.
+
+    The helper is started on the first request, and started again if it
+    exits or a request times out.
+    """
+
+    def __init__(self, command=None):
+        self._command = command or ['sudo', '-n', sys.executable, '-m',
+                                    __name__]
+        self._process = None
+        self._lock = semaphore.Semaphore()
+
+    def _start(self):
+        LOG.debug("Starting the privileged helper: %s", self._command)
+        self._process = green_subprocess.Popen(
+            self._command, stdin=green_subprocess.PIPE,
+            stdout=green_subprocess.PIPE, close_fds=True)
+
+    def stop(self):
+        """Close the pipe, the helper exits after its current request."""
+        if self._process:
+            process, self._process = self._process, None
+            process.stdin.close()
+            process.stdout.close()
+
+    def call(self, op, timeout=30, **args):
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            try:
+                with Timeout(timeout):
+                    self._process.stdin.write(json.dumps(
+                        {'op': op, 'args': args}).encode('ascii') + b'\n')
+                    self._process.stdin.flush()
+                    line = self._process.stdout.readline()
+            except (Timeout, IOError):
+                # The replies would be out of step with the requests.
+                self.stop()
+                raise exception.ProcessExecutionError(
+                    cmd=op, description=_("The privileged helper did not "
+                                          "answer in %s seconds.") % timeout)
+            if not line:
+                self.stop()
+                raise exception.ProcessExecutionError(
+                    cmd=op, description=_("The privileged helper exited."))
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise exception.ProcessExecutionError(
+                cmd=op, description=reply['error'])
+        return reply['result']
+
+    def execute(self, cmd, *args, **kwargs):
+        """Run a file command as root, like utils.execute_with_timeout.
+
+        :raises:    :class:`ProcessExecutionError` if the command fails.
+        """
+        result = self.call('execute', timeout=kwargs.pop('timeout', 30),
+                           cmd=cmd, args=args)
+        stdout = _decode(result['stdout'])
+        stderr = _decode(result['stderr'])
+        if result['exit_code'] != 0:
+            raise exception.ProcessExecutionError(
+                exit_code=result['exit_code'], stdout=stdout, stderr=stderr,
+                cmd=' '.join((cmd,) + args))
+        return stdout, stderr
+
+    def exists(self, path, is_directory=False):
+        return self.call('exists', path=path, is_directory=is_directory)
+
+    def read_file(self, path):
+        return _decode(self.call('read', path=path))
+
+    def write_file(self, path, data):
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        self.call('write', path=path, data=_encode(data))
+
+
+_helper = None
+
+
+def get_helper():
+    """Return the privileged helper of this process, or None if the 'as_root'
+    operations run through 'sudo' ('guest_privileged_helper' is disabled).
+    """
+    global _helper
+    if not CONF.guest_privileged_helper:
+        return None
+    if _helper is None:
+        _helper = PrivilegedHelper()
+    return _helper
+
+
+if __name__ == '__main__':
+    main()
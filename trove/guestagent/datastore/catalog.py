@@ -0,0 +1,74 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+import abc
+import heapq
+
+import six
+
+
+def select_names(names, limit=None, marker=None, include_marker=False):
+    """Select the names following the marker from an unsorted iterable.
+
+    For datastores that can only list all the names at once.  Only the
+    names themselves are compared (no models are built), and only the
+    'limit' smallest of them are kept and sorted.
+
+    :returns:           Up to 'limit' sorted names (all if limit is None).
+    """
+    if marker is not None:
+        if include_marker:
+            names = (name for name in names if name >= marker)
+        else:
+            names = (name for name in names if name > marker)
+    if limit:
+        return heapq.nsmallest(limit, names)
+    return sorted(names)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Catalog(object):
+    """A catalog of the named objects (users or databases) of a datastore.
+
+    Implementations run the page and single name lookups as native queries,
+    so that listing a page or finding one user does not load (or sort) the
+    whole catalog.  Pages follow the same rules as
+    guestagent_utils.serialize_list: items are ordered by name and the
+    next marker is the name of the last item when more items remain.
+    """
+
+    @abc.abstractmethod
+    def find(self, name):
+        """Return the model of the item with a given name or None if it
+        does not exist.
+        """
+
+    @abc.abstractmethod
+    def _list(self, limit, marker, include_marker):
+        """Return the models of the items following the marker, sorted by
+        name.  At most 'limit' items are returned (all if limit is None).
+        """
+
+    def list(self, limit=None, marker=None, include_marker=False):
+        """Return a page of serialized items and the next marker."""
+        # Ask for one more item to find out whether there is a next page.
+        items = list(self._list(limit + 1 if limit else None, marker,
+                                include_marker))
+        next_marker = None
+        if limit and len(items) > limit:
+            items = items[:limit]
+            next_marker = items[-1].name
+        return [item.serialize() for item in items], next_marker
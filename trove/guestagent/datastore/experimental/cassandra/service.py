@@ -20,6 +20,7 @@ import stat
 from cassandra.auth import PlainTextAuthProvider
 from cassandra.cluster import Cluster
 from cassandra.cluster import NoHostAvailable
+from cassandra import InvalidRequest
 from cassandra import OperationTimedOut
 from cassandra.policies import ConstantReconnectionPolicy
 from oslo_log import log as logging
@@ -40,6 +41,7 @@ from trove.guestagent.common.configuration import OneFileOverrideStrategy
 from trove.guestagent.common import guestagent_utils
 from trove.guestagent.common import operating_system
 from trove.guestagent.common.operating_system import FileMode
+from trove.guestagent.datastore import catalog
 from trove.guestagent.datastore import service
 from trove.guestagent import pkg
 
@@ -899,8 +901,7 @@ class CassandraAdmin(object):
         Omit user names on the ignore list.
         Return a new Cassandra user instance or None if no match is found.
         """
-        return next((user for user in self._get_listed_users(client)
-                     if user.name == username), None)
+        return CassandraUserCatalog(self, client).find(username)
 
     def list_users(self, context, limit=None, marker=None,
                    include_marker=False):
@@ -908,18 +909,9 @@ class CassandraAdmin(object):
         List all non-superuser accounts. Omit names on the ignored list.
         Return an empty set if None.
         """
-        return guestagent_utils.serialize_list(
-            self._get_listed_users(self.client),
+        return CassandraUserCatalog(self, self.client).list(
             limit=limit, marker=marker, include_marker=include_marker)
 
-    def _get_listed_users(self, client):
-        """
-        Return a set of unique user instances.
-        Omit user names on the ignore list.
-        """
-        return self._get_users(
-            client, lambda user: user.name not in self.ignore_users)
-
     def _get_users(self, client, matcher=None):
         """
         :param matcher                Filter expression.
@@ -1161,8 +1153,7 @@ class CassandraAdmin(object):
 
     def list_databases(self, context, limit=None, marker=None,
                        include_marker=False):
-        return guestagent_utils.serialize_list(
-            self._get_available_keyspaces(self.client),
+        return CassandraKeyspaceCatalog(self, self.client).list(
             limit=limit, marker=marker, include_marker=include_marker)
 
     def _get_available_keyspaces(self, client):
@@ -1210,6 +1201,69 @@ class CassandraAdmin(object):
         return cfg.get_ignored_dbs()
 
 
+class CassandraUserCatalog(catalog.Catalog):
+    """The users of a Cassandra node.
+
+    The user names come from 'LIST USERS', which has no paging of its own,
+    but only the users on the requested page get their permissions loaded
+    (with 'LIST ALL PERMISSIONS OF').
+    """
+
+    # Larger pages are built from a single scan of the full ACL rather than
+    # with one permissions query per user.
+    ACL_SCAN_THRESHOLD = 100
+
+    def __init__(self, admin, client):
+        self._admin = admin
+        self._client = client
+
+    def find(self, name):
+        if name in self._admin.ignore_users:
+            return None
+        try:
+            acl = self._admin._get_acl(self._client, username=name)
+        except InvalidRequest:
+            # The user does not exist.
+            return None
+        return self._admin._build_user(name, acl)
+
+    def _list(self, limit, marker, include_marker):
+        ignore_users = self._admin.ignore_users
+        names = catalog.select_names(
+            (row.name for row in self._client.execute("LIST USERS;")
+             if row.name not in ignore_users),
+            limit=limit, marker=marker, include_marker=include_marker)
+        if len(names) > self.ACL_SCAN_THRESHOLD:
+            acl = self._admin._get_acl(self._client)
+            return [self._admin._build_user(name, acl) for name in names]
+        users = (self.find(name) for name in names)
+        return [user for user in users if user is not None]
+
+
+class CassandraKeyspaceCatalog(catalog.Catalog):
+    """The keyspaces of a Cassandra node, as known to the driver's cluster
+    metadata.
+    """
+
+    def __init__(self, admin, client):
+        self._admin = admin
+        self._client = client
+
+    def find(self, name):
+        if (name not in self._admin.ignore_dbs and
+                name in self._client.list_keyspaces()):
+            return models.CassandraSchema(name)
+        return None
+
+    def _list(self, limit, marker, include_marker):
+        ignore_dbs = self._admin.ignore_dbs
+        names = catalog.select_names(
+            (name for name in self._client.list_keyspaces()
+             if name not in ignore_dbs),
+            limit=limit, marker=marker, include_marker=include_marker)
+        return [models.CassandraSchema(name) for name in names]
+
+
 class CassandraConnection(object):
     """A wrapper to manage a Cassandra connection."""
 
@@ -13,7 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import os
+import re
 
 from oslo_log import log as logging
 from oslo_utils import encodeutils
@@ -37,6 +39,8 @@ LOG = logging.getLogger(__name__)
 MOUNT_POINT = CONF.db2.mount_point
 FAKE_CFG = os.path.join(MOUNT_POINT, "db2.cfg.fake")
 DB2_DEFAULT_CFG = os.path.join(MOUNT_POINT, "db2_default_dbm.cfg")
+# Names that can be put in a catalog query as they are.
+SQL_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_]+$')
 
 
 class DB2App(object):
@@ -443,37 +447,40 @@ class DB2Admin(object):
 
     def create_user(self, users):
         LOG.debug("Creating user(s) for accessing DB2 database(s).")
+        grants = collections.OrderedDict()
+        for item in users:
+            user = models.DatastoreUser.deserialize(item)
+            user.check_create()
+            try:
+                LOG.debug("Creating OS user: %s." % user.name)
+                utils.execute_with_timeout(
+                    system.CREATE_USER_COMMAND % {
+                        'login': user.name, 'login': user.name,
+                        'passwd': user.password}, shell=True)
+            except exception.ProcessExecutionError:
+                LOG.exception(_("Error creating user: %s.") % user.name)
+                continue
+
+            for database in user.databases:
+                mydb = models.DatastoreSchema.deserialize(database)
+                grants.setdefault(mydb.name, []).append(user.name)
+
+        if not grants:
+            return
+        # All the grants are done in one DB2 CLP session, connecting to
+        # each database once.
+        commands = []
+        for dbname, logins in grants.items():
+            LOG.debug("Granting users: %s access to database: %s."
+                      % (logins, dbname))
+            commands.append(system.CONNECT_DB % {'dbname': dbname})
+            commands.extend(system.GRANT_DB_ACCESS % {'login': login}
+                            for login in logins)
+            commands.append(system.CONNECT_RESET)
         try:
-            for item in users:
-                user = models.DatastoreUser.deserialize(item)
-                user.check_create()
-                try:
-                    LOG.debug("Creating OS user: %s." % user.name)
-                    utils.execute_with_timeout(
-                        system.CREATE_USER_COMMAND % {
-                            'login': user.name, 'login': user.name,
-                            'passwd': user.password}, shell=True)
-                except exception.ProcessExecutionError as pe:
-                    LOG.exception(_("Error creating user: %s.") % user.name)
-                    continue
-
-                for database in user.databases:
-                    mydb = models.DatastoreSchema.deserialize(database)
-                    try:
-                        LOG.debug("Granting user: %s access to database: %s."
-                                  % (user.name, mydb.name))
-                        run_command(system.GRANT_USER_ACCESS % {
-                            'dbname': mydb.name, 'login': user.name})
-                    except exception.ProcessExecutionError as pe:
-                        LOG.debug(
-                            "Error granting user: %s access to database: %s."
-                            % (user.name, mydb.name))
-                        LOG.debug(pe)
-                        pass
+            run_command("; ".join(commands))
         except exception.ProcessExecutionError as pe:
-            LOG.exception(_("An error occurred creating users: %s.") %
-                          pe.message)
-            pass
+            LOG.debug("Error granting users access to databases: %s." % pe)
 
     def delete_user(self, user):
         LOG.debug("Delete a given user.")
@@ -511,82 +518,75 @@ class DB2Admin(object):
                 raise exception.GuestError(original_message=_(
                     "Unable to delete user: %s.") % userName)
 
+    def _list_db_users(self, conditions=None, limit=None):
+        """Return the databases each user has access to, as a map of user
+        names to database names.
+
+        All the databases are queried in a single DB2 CLP session. The
+        conditions are added to the catalog query and at most limit users
+        are fetched from each database.
+        """
+        query = system.LIST_DB_USERS_QUERY % {
+            'conditions': ''.join(' and %s' % condition
+                                  for condition in conditions or []),
+            'fetch': (' fetch first %d rows only' % limit
+                      if limit else '')}
+        try:
+            out, err = run_command(system.LIST_ALL_DB_USERS %
+                                   {'query': query})
+        except exception.ProcessExecutionError:
+            LOG.debug("There was an error while listing the database users.")
+            return {}
+
+        user_dbs = collections.OrderedDict()
+        dbname = None
+        for line in out.splitlines():
+            fields = line.split()
+            if len(fields) == 2 and fields[0] == system.DB_USERS_HEADER:
+                dbname = fields[1]
+            elif dbname and len(fields) == 2 and fields[1] == 'Y':
+                user_dbs.setdefault(fields[0], []).append(dbname)
+        return user_dbs
+
+    @staticmethod
+    def _sql_names(names):
+        """Quote the names for a catalog query, or return None if any of
+        them cannot be safely passed to the DB2 CLP.
+        """
+        if not all(SQL_NAME_PATTERN.match(name) for name in names):
+            return None
+        return ', '.join("'%s'" % name for name in names)
+
     def list_users(self, limit=None, marker=None, include_marker=False):
         LOG.debug(
             "List all users for all the databases in a DB2 server instance.")
-        users = []
-        user_map = {}
-        next_marker = None
-        count = 0
+        # Filter and page in the catalog query where possible, one more
+        # user than requested is fetched to know if there is a next page.
+        # The rows are only limited when every filter is in the query,
+        # otherwise the users filtered out below could leave a short page.
+        conditions = []
+        ignored = self._sql_names(cfg.get_ignored_users())
+        all_in_sql = ignored is not None
+        if ignored:
+            conditions.append("grantee not in (%s)" % ignored)
+        if marker is not None:
+            if self._sql_names([marker]):
+                conditions.append("grantee %s '%s'" % (
+                    '>=' if include_marker else '>', marker))
+            else:
+                all_in_sql = False
+        fetch = limit + 1 if limit and all_in_sql else None
 
-        databases, marker = self.list_databases()
-        for database in databases:
-            db2_db = models.DatastoreSchema.deserialize(database)
-            out = None
-            try:
-                out, err = run_command(
-                    system.LIST_DB_USERS % {'dbname': db2_db.name})
-            except exception.ProcessExecutionError:
-                LOG.debug(
-                    "There was an error while listing users for database: %s."
-                    % db2_db.name)
+        users = []
+        for name, databases in self._list_db_users(
+                conditions, fetch).items():
+            if name in cfg.get_ignored_users():
                 continue
-
-            userlist = []
-            for item in out.split('\n'):
-                LOG.debug("item = %r" % item)
-                user = item.split() if item != "" else None
-                LOG.debug("user = %r" % (user))
-                if (user is not None
-                    and (user[0] not in cfg.get_ignored_users()
-                         and user[1] == 'Y')):
-                    userlist.append(user[0])
-            result = iter(userlist)
-
-            if marker is not None:
-                try:
-                    item = next(result)
-                    while item != marker:
-                        item = next(result)
-
-                    if item == marker:
-                        marker = None
-                except StopIteration:
-                    pass
-
-            try:
-                item = next(result)
-
-                while item:
-                    '''
-                    Check if the user has already been discovered. If so,
-                    add this database to the database list for this user.
-                    '''
-                    if item in user_map:
-                        db2user = user_map.get(item)
-                        db2user.databases = db2_db.name
-                        item = next(result)
-                        continue
-                    '''
-                     If this user was not previously discovered, then add
-                     this to the user's list.
-                    '''
-                    count = count + 1
-                    if (limit and count <= limit) or limit is None:
-                        db2_user = models.DatastoreUser(name=item,
-                                                        databases=db2_db.name)
-                        users.append(db2_user.serialize())
-                        user_map.update({item: db2_user})
-                        item = next(result)
-                    else:
-                        next_marker = None
-                        break
-            except StopIteration:
-                next_marker = None
-
-            if count == limit:
-                break
-        return users, next_marker
+            user = models.DatastoreUser(name=name)
+            user.databases = databases
+            users.append(user)
+        return guestagent_utils.serialize_list(
+            users, limit=limit, marker=marker, include_marker=include_marker)
 
     def get_user(self, username, hostname):
         LOG.debug("Get details of a given database user.")
@@ -598,26 +598,12 @@ class DB2Admin(object):
     def _get_user(self, username, hostname):
         LOG.debug("Get details of a given database user %s." % username)
         user = models.DatastoreUser(name=username)
-        databases, marker = self.list_databases()
-        out = None
-        for database in databases:
-            db2_db = models.DatastoreSchema.deserialize(database)
-            try:
-                out, err = run_command(
-                    system.LIST_DB_USERS % {'dbname': db2_db.name})
-            except exception.ProcessExecutionError:
-                LOG.debug(
-                    "Error while trying to get the users for database: %s." %
-                    db2_db.name)
-                continue
-
-            for item in out.split('\n'):
-                user_access = item.split() if item != "" else None
-                if (user_access is not None and
-                        user_access[0].lower() == username.lower() and
-                        user_access[1] == 'Y'):
-                    user.databases = db2_db.name
-                    break
+        conditions = []
+        if self._sql_names([username]):
+            conditions.append("lower(grantee) = '%s'" % username.lower())
+        for name, databases in self._list_db_users(conditions).items():
+            if name.lower() == username.lower():
+                user.databases = databases
         return user
 
     def list_access(self, username, hostname):
@@ -43,6 +43,11 @@ LIST_DB_COMMAND = (
 CREATE_USER_COMMAND = (
     'sudo useradd -m -d /home/%(login)s %(login)s;'
     'sudo echo %(login)s:%(passwd)s |sudo  chpasswd')
+CONNECT_DB = "db2 connect to %(dbname)s"
+CONNECT_RESET = "db2 connect reset"
+GRANT_DB_ACCESS = (
+    "db2 GRANT DBADM,CREATETAB,BINDADD,CONNECT,DATAACCESS "
+    "ON DATABASE TO USER %(login)s")
 GRANT_USER_ACCESS = (
     "db2 connect to %(dbname)s; "
     "db2 GRANT DBADM,CREATETAB,BINDADD,CONNECT,DATAACCESS "
@@ -56,6 +61,17 @@ LIST_DB_USERS = (
     "db2 +o  connect to %(dbname)s; "
     "db2 -x  select grantee, dataaccessauth from sysibm.sysdbauth; "
     "db2 connect reset")
+# Lists the users with data access to every database in one DB2 CLP
+# session; the rows of each database follow a DB_USERS_HEADER line.
+DB_USERS_HEADER = "DATABASE="
+LIST_DB_USERS_QUERY = (
+    "select grantee, dataaccessauth from sysibm.sysdbauth "
+    "where dataaccessauth = 'Y'%(conditions)s order by grantee%(fetch)s")
+LIST_ALL_DB_USERS = (
+    "for dbname in $(" + LIST_DB_COMMAND + "); do "
+    "echo \"" + DB_USERS_HEADER + " $dbname\"; "
+    "db2 +o connect to $dbname && db2 -x \"%(query)s\"; "
+    "db2 +o connect reset; done")
 OFFLINE_BACKUP_DB = "db2 backup database %(dbname)s to " + DB2_BACKUP_DIR
 RESTORE_OFFLINE_DB = (
     "db2 restore database %(dbname)s from " + DB2_BACKUP_DIR)
@@ -14,6 +14,7 @@
 #    under the License.
 
 import os
+import time
 
 from oslo_log import log as logging
 from oslo_utils import netutils
@@ -30,6 +31,7 @@ from trove.guestagent.common.configuration import ConfigurationManager
 from trove.guestagent.common.configuration import OneFileOverrideStrategy
 from trove.guestagent.common import guestagent_utils
 from trove.guestagent.common import operating_system
+from trove.guestagent.datastore import catalog
 from trove.guestagent.datastore.experimental.mongodb import system
 from trove.guestagent.datastore import service
 
@@ -42,6 +44,9 @@ MANAGER = CONF.datastore_manager if CONF.datastore_manager else 'mongodb'
 CNF_CLUSTER = 'clustering'
 
 MONGODB_PORT = CONF.mongodb.mongodb_port
+# Bounds (in seconds) of the interval between replica set status checks.
+RS_STATUS_MIN_INTERVAL = 0.5
+RS_STATUS_MAX_INTERVAL = 10
 CONFIGSVR_PORT = CONF.mongodb.configsvr_port
 
 
@@ -240,24 +245,18 @@ class MongoDBApp(object):
         """
         This method is used by a replica-set member instance.
         """
-        def check_initiate_status():
+        def check_initiate_status(status):
             """
             This method is used to verify replica-set status.
             """
-            status = MongoDBAdmin().get_repl_status()
+            return ((status["ok"] == 1) and
+                    (status["members"][0]["stateStr"] == "PRIMARY") and
+                    (status["myState"] == 1))
 
-            if((status["ok"] == 1) and
-               (status["members"][0]["stateStr"] == "PRIMARY") and
-               (status["myState"] == 1)):
-                return True
-            else:
-                return False
-
-        def check_rs_status():
+        def check_rs_status(status):
             """
             This method is used to verify replica-set status.
             """
-            status = MongoDBAdmin().get_repl_status()
             primary_count = 0
 
             if status["ok"] != 1:
@@ -274,16 +273,47 @@ class MongoDBApp(object):
 
             return primary_count == 1
 
-        MongoDBAdmin().rs_initiate()
-        # TODO(ramashri) see if hardcoded values can be removed
-        utils.poll_until(check_initiate_status, sleep_time=30,
-                         time_out=CONF.mongodb.add_members_timeout)
+        admin = MongoDBAdmin()
+        with MongoDBClient(admin._admin_user()) as client:
+            admin.rs_initiate(client=client)
+            self._wait_for_replica_set(admin, client, check_initiate_status)
+
+            # add replica-set members
+            admin.rs_add_members(members, client=client)
+            self._wait_for_replica_set(admin, client, check_rs_status)
 
-        # add replica-set members
-        MongoDBAdmin().rs_add_members(members)
-        # TODO(ramashri) see if hardcoded values can be removed
-        utils.poll_until(check_rs_status, sleep_time=10,
-                         time_out=CONF.mongodb.add_members_timeout)
+    def _wait_for_replica_set(self, admin, client, condition):
+        """Check the replica set status over the given client until
+        condition(status) is true.
+
+        The checks start RS_STATUS_MIN_INTERVAL apart, and the interval
+        doubles (up to RS_STATUS_MAX_INTERVAL) for as long as the state of
+        the members stays the same. It goes back to the minimum whenever a
+        member changes state, as the replica set is then likely to be close
+        to the state being waited for.
+        """
+        deadline = time.time() + CONF.mongodb.add_members_timeout
+        interval = RS_STATUS_MIN_INTERVAL
+        last_states = None
+        while True:
+            try:
+                status = admin.get_repl_status(client=client)
+                if condition(status):
+                    return status
+                states = sorted((member.get("name"), member.get("state"),
+                                 member.get("health"))
+                                for member in status.get("members", []))
+            except pymongo.errors.OperationFailure as e:
+                LOG.debug("Replica set status not available yet: %s" % e)
+                states = []
+            if states != last_states:
+                interval = RS_STATUS_MIN_INTERVAL
+                last_states = states
+            else:
+                interval = min(interval * 2, RS_STATUS_MAX_INTERVAL)
+            if time.time() + interval > deadline:
+                raise exception.PollTimeOut()
+            time.sleep(interval)
 
     def list_all_dbs(self):
         return MongoDBAdmin().list_database_names()
@@ -548,22 +578,10 @@ class MongoDBAdmin(object):
 
     def _get_user_record(self, name, client=None):
         """Get the user's record."""
-        user = models.MongoDBUser(name)
-        if user.is_ignored:
-            LOG.warning('Skipping retrieval of user with reserved '
-                        'name %(user)s' % {'user': user.name})
-            return None
         if client:
-            user_info = client.admin.system.users.find_one(
-                {'user': user.username, 'db': user.database.name})
-        else:
-            with MongoDBClient(self._admin_user()) as admin_client:
-                user_info = admin_client.admin.system.users.find_one(
-                    {'user': user.username, 'db': user.database.name})
-        if not user_info:
-            return None
-        user.mongo_roles = user_info['roles']
-        return user
+            return MongoDBUserCatalog(client).find(name)
+        with MongoDBClient(self._admin_user()) as admin_client:
+            return MongoDBUserCatalog(admin_client).find(name)
 
     def get_existing_user(self, name):
         """Check that a user exists."""
@@ -583,17 +601,9 @@ class MongoDBAdmin(object):
 
     def list_users(self, limit=None, marker=None, include_marker=False):
         """Get a list of all users."""
-        users = []
         with MongoDBClient(self._admin_user()) as admin_client:
-            for user_info in admin_client.admin.system.users.find():
-                user = models.MongoDBUser(name=user_info['_id'])
-                user.mongo_roles = user_info['roles']
-                if not user.is_ignored:
-                    users.append(user)
-        LOG.debug('users = ' + str(users))
-        return guestagent_utils.serialize_list(
-            users,
-            limit=limit, marker=marker, include_marker=include_marker)
+            return MongoDBUserCatalog(admin_client).list(
+                limit=limit, marker=marker, include_marker=include_marker)
 
     def change_passwords(self, users):
         with MongoDBClient(self._admin_user()) as admin_client:
@@ -696,44 +706,51 @@ class MongoDBAdmin(object):
 
     def list_databases(self, limit=None, marker=None, include_marker=False):
         """Lists the databases."""
-        databases = []
-        for db_name in self.list_database_names():
-            schema = models.MongoDBSchema(name=db_name)
-            if not schema.is_ignored():
-                databases.append(schema)
-        LOG.debug('databases = ' + str(databases))
-        return guestagent_utils.serialize_list(
-            databases,
-            limit=limit, marker=marker, include_marker=include_marker)
+        with MongoDBClient(self._admin_user()) as admin_client:
+            return MongoDBDatabaseCatalog(admin_client).list(
+                limit=limit, marker=marker, include_marker=include_marker)
 
     def add_shard(self, url):
         """Runs the addShard command."""
         with MongoDBClient(self._admin_user()) as admin_client:
             admin_client.admin.command({'addShard': url})
 
-    def get_repl_status(self):
+    def _get_repl_status_with_client(self, client):
+        status = client.admin.command('replSetGetStatus')
+        LOG.debug('Replica set status: %s' % status)
+        return status
+
+    def get_repl_status(self, client=None):
         """Runs the replSetGetStatus command."""
+        if client:
+            return self._get_repl_status_with_client(client)
         with MongoDBClient(self._admin_user()) as admin_client:
-            status = admin_client.admin.command('replSetGetStatus')
-            LOG.debug('Replica set status: %s' % status)
-            return status
+            return self._get_repl_status_with_client(admin_client)
 
-    def rs_initiate(self):
+    def rs_initiate(self, client=None):
         """Runs the replSetInitiate command."""
+        if client:
+            return client.admin.command('replSetInitiate')
         with MongoDBClient(self._admin_user()) as admin_client:
             return admin_client.admin.command('replSetInitiate')
 
-    def rs_add_members(self, members):
+    def _rs_add_members_with_client(self, members, client):
+        # get the current config, add the new members, then save it
+        config = client.admin.command('replSetGetConfig')['config']
+        config['version'] += 1
+        next_id = max([m['_id'] for m in config['members']]) + 1
+        for member in members:
+            config['members'].append({'_id': next_id, 'host': member})
+            next_id += 1
+        client.admin.command('replSetReconfig', config)
+
+    def rs_add_members(self, members, client=None):
         """Adds the given members to the replication set."""
-        with MongoDBClient(self._admin_user()) as admin_client:
-            # get the current config, add the new members, then save it
-            config = admin_client.admin.command('replSetGetConfig')['config']
-            config['version'] += 1
-            next_id = max([m['_id'] for m in config['members']]) + 1
-            for member in members:
-                config['members'].append({'_id': next_id, 'host': member})
-                next_id += 1
-            admin_client.admin.command('replSetReconfig', config)
+        if client:
+            self._rs_add_members_with_client(members, client)
+        else:
+            with MongoDBClient(self._admin_user()) as admin_client:
+                self._rs_add_members_with_client(members, admin_client)
 
     def db_stats(self, database, scale=1):
         """Gets the stats for the given database."""
@@ -747,6 +764,68 @@ class MongoDBAdmin(object):
             return [shard for shard in admin_client.config.shards.find()]
 
 
+class MongoDBUserCatalog(catalog.Catalog):
+    """The users in admin.system.users.
+
+    Pages are read with a range query on the '<database>.<username>' _id,
+    which is indexed, so only the users on the page are fetched.
+    """
+
+    def __init__(self, client):
+        self._users = client.admin.system.users
+
+    def find(self, name):
+        user = models.MongoDBUser(name)
+        if user.is_ignored:
+            LOG.warning('Skipping retrieval of user with reserved '
+                        'name %(user)s' % {'user': user.name})
+            return None
+        user_info = self._users.find_one(
+            {'user': user.username, 'db': user.database.name})
+        if not user_info:
+            return None
+        user.mongo_roles = user_info['roles']
+        return user
+
+    def _list(self, limit, marker, include_marker):
+        id_query = {'$nin': cfg.get_ignored_users()}
+        if marker is not None:
+            id_query['$gte' if include_marker else '$gt'] = marker
+        users = []
+        for user_info in self._users.find(
+                {'_id': id_query}, sort=[('_id', pymongo.ASCENDING)],
+                limit=limit or 0):
+            user = models.MongoDBUser(name=user_info['_id'])
+            user.mongo_roles = user_info['roles']
+            users.append(user)
+        return users
+
+
+class MongoDBDatabaseCatalog(catalog.Catalog):
+    """The databases of a MongoDB instance.
+
+    listDatabases has no paging of its own, only the schemas on the page
+    are built from the names it returns.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def find(self, name):
+        schema = models.MongoDBSchema(name)
+        if schema.is_ignored() or name not in self._client.database_names():
+            return None
+        return schema
+
+    def _list(self, limit, marker, include_marker):
+        ignored_dbs = cfg.get_ignored_dbs()
+        names = catalog.select_names(
+            (name for name in self._client.database_names()
+             if name not in ignored_dbs),
+            limit=limit, marker=marker, include_marker=include_marker)
+        return [models.MongoDBSchema(name=name) for name in names]
+
+
 class MongoDBClient(object):
     """A wrapper to manage a MongoDB connection."""
 
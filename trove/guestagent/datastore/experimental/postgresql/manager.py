@@ -24,13 +24,13 @@ from trove.common import exception
 from trove.common.i18n import _
 from trove.common import instance as trove_instance
 from trove.common.notification import EndNotification
-from trove.common import utils
 from trove.guestagent import backup
 from trove.guestagent.datastore.experimental.postgresql.service import (
     PgSqlAdmin)
 from trove.guestagent.datastore.experimental.postgresql.service import PgSqlApp
 from trove.guestagent.datastore import manager
 from trove.guestagent import guest_log
+from trove.guestagent.strategies.replication import progress
 from trove.guestagent import volume
 
 
@@ -298,12 +298,12 @@ class Manager(manager.Manager):
             raise RuntimeError(_("Attempting to wait for a txn on a server "
                                  "not in recovery mode!"))
 
-        def _wait_for_txn():
+        def _get_lag():
             lsn = self.app.pg_last_xlog_replay_location()
-            LOG.info(_("Last xlog location found: %s") % lsn)
-            return lsn >= txn
+            LOG.debug("Last xlog location found: %s" % lsn)
+            return progress.lsn_lag(lsn, txn)
         try:
-            utils.poll_until(_wait_for_txn, time_out=120)
+            progress.wait_for_catchup(_get_lag, unit='bytes', time_out=120)
         except exception.PollTimeOut:
             raise RuntimeError(_("Timeout occurred waiting for xlog "
                                  "offset to change to '%s'.") % txn)
@@ -19,11 +19,11 @@ from trove.common import exception
 from trove.common.i18n import _
 from trove.common import instance as rd_instance
 from trove.common.notification import EndNotification
-from trove.common import utils
 from trove.guestagent import backup
 from trove.guestagent.common import operating_system
 from trove.guestagent.datastore.experimental.redis import service
 from trove.guestagent.datastore import manager
+from trove.guestagent.strategies.replication import progress
 from trove.guestagent import volume
 
 
@@ -234,13 +234,13 @@ class Manager(manager.Manager):
     def wait_for_txn(self, context, txn):
         LOG.info(_("Waiting on repl offset '%s'.") % txn)
 
-        def _wait_for_txn():
+        def _get_lag():
             current_offset = self._get_repl_offset()
             LOG.debug("Current offset: %s." % current_offset)
-            return current_offset >= txn
+            return progress.offset_lag(current_offset, txn)
 
         try:
-            utils.poll_until(_wait_for_txn, time_out=120)
+            progress.wait_for_catchup(_get_lag, unit='bytes', time_out=120)
         except exception.PollTimeOut:
             raise RuntimeError(_("Timeout occurred waiting for Redis repl "
                                  "offset to change to '%s'.") % txn)
@@ -72,6 +72,8 @@ class VerticaApp(object):
     def __init__(self, status):
         self.state_change_wait_time = CONF.state_change_wait_time
         self.status = status
+        self._db_password = None
+        self._db_password_mtime = None
         revision_dir = \
             guestagent_utils.build_file_path(
                 os.path.join(MOUNT_POINT,
@@ -107,16 +109,19 @@ class VerticaApp(object):
 
     def _reset_config(self, config):
         try:
-            db_password = self._get_database_password()
-            for k, v in config.iteritems():
-                alter_db_cmd = system.ALTER_DB_RESET_CFG % (DB_NAME, str(k))
-                out, err = system.exec_vsql_command(db_password, alter_db_cmd)
+            # All the parameters are cleared by a single client.
+            statements = [system.ALTER_DB_RESET_CFG % (DB_NAME, str(k))
+                          for k in config]
+            if statements:
+                out, err = system.exec_vsql_command(
+                    self._get_database_password(), statements)
                 if err:
                     if err.is_warning():
                         LOG.warning(err)
                     else:
                         LOG.error(err)
-                        raise RuntimeError(_("Failed to remove config %s") % k)
+                        raise RuntimeError(_("Failed to remove config %s")
+                                           % ', '.join(map(str, config)))
 
         except Exception:
             LOG.exception(_("Vertica configuration remove failed."))
@@ -125,16 +130,19 @@ class VerticaApp(object):
 
     def _apply_config(self, config):
         try:
-            db_password = self._get_database_password()
-            for k, v in config.iteritems():
-                alter_db_cmd = system.ALTER_DB_CFG % (DB_NAME, str(k), str(v))
-                out, err = system.exec_vsql_command(db_password, alter_db_cmd)
+            # All the parameters are set by a single client.
+            statements = [system.ALTER_DB_CFG % (DB_NAME, str(k), str(v))
+                          for k, v in config.iteritems()]
+            if statements:
+                out, err = system.exec_vsql_command(
+                    self._get_database_password(), statements)
                 if err:
                     if err.is_warning():
                         LOG.warning(err)
                     else:
                         LOG.error(err)
-                        raise RuntimeError(_("Failed to apply config %s") % k)
+                        raise RuntimeError(_("Failed to apply config %s")
+                                           % ', '.join(map(str, config)))
 
         except Exception:
             LOG.exception(_("Vertica configuration apply failed"))
@@ -318,8 +326,10 @@ class VerticaApp(object):
     def add_udls(self):
         """Load the user defined load libraries into the database."""
         LOG.info(_("Adding configured user defined load libraries."))
-        password = self._get_database_password()
         loaded_udls = []
+        # The libraries and their sources are all created by a single
+        # client.
+        statements = []
         for lib in system.UDL_LIBS:
             func_name = lib['func_name']
             lib_name = lib['lib_name']
@@ -329,33 +339,24 @@ class VerticaApp(object):
             if os.path.isfile(path):
                 LOG.debug("Adding the %s library as %s." %
                           (func_name, lib_name))
-                out, err = system.exec_vsql_command(
-                    password,
-                    system.CREATE_LIBRARY % (lib_name, path)
-                )
-                if err:
-                    if err.is_warning():
-                        LOG.warning(err)
-                    else:
-                        LOG.error(err)
-                        raise RuntimeError(_("Failed to create library %s.")
-                                           % lib_name)
-                out, err = system.exec_vsql_command(
-                    password,
+                statements.extend([
+                    system.CREATE_LIBRARY % (lib_name, path),
                     system.CREATE_SOURCE % (func_name, language,
-                                            factory, lib_name)
-                )
-                if err:
-                    if err.is_warning():
-                        LOG.warning(err)
-                    else:
-                        LOG.error(err)
-                        raise RuntimeError(_("Failed to create source %s.")
-                                           % func_name)
+                                            factory, lib_name)])
                 loaded_udls.append(func_name)
             else:
                 LOG.warning(_("Skipping %(func)s as path %(path)s not "
                               "found.") % {"func": func_name, "path": path})
+        if statements:
+            out, err = system.exec_vsql_command(
+                self._get_database_password(), statements)
+            if err:
+                if err.is_warning():
+                    LOG.warning(err)
+                else:
+                    LOG.error(err)
+                    raise RuntimeError(_("Failed to create libraries %s.")
+                                       % ', '.join(loaded_udls))
         LOG.info(_("The following UDL functions are available for use: %s")
                  % loaded_udls)
 
@@ -396,8 +397,21 @@ class VerticaApp(object):
             raise RuntimeError
 
     def _get_database_password(self):
-        """Read the password from vertica.cnf file and return it."""
-        return self.read_config().get('credentials', 'dbadmin_password')
+        """Read the password from vertica.cnf file and return it.
+
+        The password is kept in memory until the file changes (it is
+        replaced when a cluster is installed).
+        """
+        try:
+            mtime = os.path.getmtime(system.VERTICA_CONF)
+        except OSError:
+            mtime = None
+        if (mtime is None or self._db_password is None or
+                mtime != self._db_password_mtime):
+            self._db_password = self.read_config().get(
+                'credentials', 'dbadmin_password')
+            self._db_password_mtime = mtime
+        return self._db_password
 
     def install_if_needed(self, packages):
         """Install Vertica package if needed."""
@@ -441,9 +455,12 @@ class VerticaApp(object):
     def _create_user(self, username, password, role=None):
         """Creates a user, granting and enabling the given role for it."""
         LOG.info(_("Creating user in Vertica database."))
+        # The user is created and granted its role by a single client.
+        statements = [system.CREATE_USER % (username, password)]
+        if role:
+            statements.append(system.GRANT_TO_USER % (role, username))
         out, err = system.exec_vsql_command(self._get_database_password(),
-                                            system.CREATE_USER %
-                                            (username, password))
+                                            statements)
         if err:
             if err.is_warning():
                 LOG.warning(err)
@@ -451,26 +468,13 @@ class VerticaApp(object):
                 LOG.error(err)
                 raise RuntimeError(_("Failed to create user %s.") % username)
         if role:
-            self._grant_role(username, role)
-
-    def _grant_role(self, username, role):
-        """Grants a role to the user on the schema."""
-        out, err = system.exec_vsql_command(self._get_database_password(),
-                                            system.GRANT_TO_USER
-                                            % (role, username))
-        if err:
-            if err.is_warning():
+            # Failing to make the role the default is not fatal, so it is
+            # run on its own.
+            out, err = system.exec_vsql_command(
+                self._get_database_password(),
+                system.ENABLE_FOR_USER % (username, role))
+            if err:
                 LOG.warning(err)
-            else:
-                LOG.error(err)
-                raise RuntimeError(_("Failed to grant role %(r)s to user "
-                                     "%(u)s.")
-                                   % {'r': role, 'u': username})
-        out, err = system.exec_vsql_command(self._get_database_password(),
-                                            system.ENABLE_FOR_USER
-                                            % (username, role))
-        if err:
-            LOG.warning(err)
 
     def enable_root(self, root_password=None):
         """Resets the root password."""
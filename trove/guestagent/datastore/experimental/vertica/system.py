@@ -13,6 +13,8 @@
 
 import re
 
+import six
+
 from trove.common import utils
 
 ALTER_DB_CFG = "ALTER DATABASE %s SET %s = %s"
@@ -95,7 +97,10 @@ class VSqlError(object):
         stderr looks like: "ERROR 3117: Division by zero"
         :param stderr:  string from executing statement via vsql
         """
-        parse = re.match("^(ERROR|WARNING) (\d+): (.+)$", stderr)
+        # A batch of statements may report several warnings before the
+        # error that stopped it.
+        parse = (re.search(r"^(ERROR) (\d+): (.+)$", stderr, re.M) or
+                 re.search(r"^(ERROR|WARNING) (\d+): (.+)$", stderr, re.M))
         if not parse:
             raise ValueError("VSql stderr %(msg)s not recognized."
                              % {'msg': stderr})
@@ -111,7 +116,13 @@ class VSqlError(object):
 
 
 def exec_vsql_command(dbadmin_password, command):
-    """Executes a VSQL command with the given dbadmin password."""
+    """Executes a VSQL command with the given dbadmin password.
+
+    The command may also be a list of statements, which are then run
+    by a single vsql client; the server stops at the first error.
+    """
+    if not isinstance(command, six.string_types):
+        command = "; ".join(command)
     out, err = shell_execute("/opt/vertica/bin/vsql -w \'%s\' -c \"%s\""
                              % (dbadmin_password, command),
                              VERTICA_ADMIN)
@@ -514,10 +514,11 @@ class Manager(periodic_task.PeriodicTasks):
         device = volume.VolumeDevice(device_path)
         device.unmount(mount_point)
 
-    def resize_fs(self, context, device_path=None, mount_point=None):
+    def resize_fs(self, context, device_path=None, mount_point=None,
+                  online=False):
         LOG.debug("Resizing the filesystem at %s." % mount_point)
         device = volume.VolumeDevice(device_path)
-        device.resize_fs(mount_point)
+        device.resize_fs(mount_point, online=online)
 
     ###############
     # Configuration
@@ -763,7 +764,17 @@ class Manager(periodic_task.PeriodicTasks):
                             auto_apply)
             if not name:
                 raise AttributeError(_("Module name not specified"))
-            if not contents:
+            if 'contents' not in module and id and module_type:
+                # The contents are only sent if we don't already have them
+                if not module_manager.ModuleManager.has_contents(
+                        module_type, id, md5):
+                    LOG.debug("Contents of module '%s' required." % name)
+                    results.append({
+                        'id': id, 'name': name, 'type': module_type,
+                        'md5': md5,
+                        'status': instance.MODULE_CONTENTS_REQUIRED})
+                    continue
+            elif not contents:
                 raise AttributeError(_("Module contents not specified"))
             driver = self.module_driver_manager.get_driver(module_type)
             if not driver:
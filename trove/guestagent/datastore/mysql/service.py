@@ -20,6 +20,7 @@ from oslo_log import log as logging
 
 from trove.common.i18n import _
 from trove.guestagent.datastore.mysql_common import service
+from trove.guestagent.strategies.replication import progress
 
 LOG = logging.getLogger(__name__)
 CONF = service.CONF
@@ -86,9 +87,9 @@ class MySqlApp(service.BaseMySqlApp):
 
     def wait_for_txn(self, txn):
         LOG.info(_("Waiting on txn '%s'.") % txn)
-        with self.local_sql_client(self.get_engine()) as client:
-            client.execute("SELECT WAIT_UNTIL_SQL_THREAD_AFTER_GTIDS('%s')"
-                           % txn)
+        progress.wait_for_catchup(
+            lambda: progress.gtid_lag(self._get_gtid_executed(), txn),
+            unit='transactions', time_out=CONF.agent_call_high_timeout)
 
 
 class MySqlRootAccess(service.BaseMySqlRootAccess):
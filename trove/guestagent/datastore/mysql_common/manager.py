@@ -184,10 +184,11 @@ class MySqlManager(manager.Manager):
     def disable_root(self, context):
         return self.mysql_admin().disable_root()
 
-    def _perform_restore(self, backup_info, context, restore_location, app):
+    def _perform_restore(self, backup_info, context, restore_location, app,
+                         **kwargs):
         LOG.info(_("Restoring database from backup %s.") % backup_info['id'])
         try:
-            backup.restore(context, backup_info, restore_location)
+            backup.restore(context, backup_info, restore_location, **kwargs)
         except Exception:
             LOG.exception(_("Error performing restore from backup %s.") %
                           backup_info['id'])
@@ -221,16 +222,25 @@ class MySqlManager(manager.Manager):
                                    recursive=False, as_root=True)
 
             LOG.debug("Mounted the volume at %s." % mount_point)
-            # We need to temporarily update the default my.cnf so that
-            # mysql will start after the volume is mounted. Later on it
-            # will be changed based on the config template
-            # (see MySqlApp.secure()) and restart.
+            # The data directory is kept in a system override, so it
+            # still applies once the config template is written
+            # (see MySqlApp.secure()).
             app.set_data_dir(mount_point + '/data')
-            app.start_mysql()
-        if backup_info:
+        # MySQL is only started once, by secure().  Restores that work on
+        # the data directory directly are done before that, the others
+        # need the server running.
+        restore_offline = backup_info and getattr(
+            backup.get_restore_runner(backup_info['type']),
+            'restores_offline', False)
+        if restore_offline:
             self._perform_restore(backup_info, context,
-                                  mount_point + "/data", app)
+                                  mount_point + "/data", app, start_db=False)
         app.secure(config_contents)
+        if backup_info and not restore_offline:
+            self._perform_restore(backup_info, context,
+                                  mount_point + "/data", app)
+            # The restore may have replaced the grant tables.
+            app.reset_admin_password(app.get_auth_password())
         enable_root_on_restore = (backup_info and
                                   self.mysql_admin().is_root_enabled())
         if enable_root_on_restore:
@@ -21,6 +21,7 @@ from collections import defaultdict
 import os
 import re
 import six
+import tempfile
 import uuid
 
 from oslo_log import log as logging
@@ -80,6 +81,7 @@ CNF_EXT = 'cnf'
 CNF_INCLUDE_DIR = '/etc/mysql/conf.d/'
 CNF_MASTER = 'master-replication'
 CNF_SLAVE = 'slave-replication'
+CNF_INIT = 'init-file'
 
 # Create a package impl
 packager = pkg.Package()
@@ -662,15 +664,20 @@ class BaseMySqlApp(object):
         self._local_sql_client = local_sql_client
         self._keep_alive_connection_cls = keep_alive_connection_cls
 
+    @staticmethod
+    def _build_admin_grant(password):
+        localhost = "localhost"
+        return sql_query.Grant(permissions='ALL', user=ADMIN_USER_NAME,
+                               host=localhost, grant_option=True,
+                               clear=password)
+
     def _create_admin_user(self, client, password):
         """
         Create a os_admin user with a random password
         with all privileges similar to the root user.
         """
         LOG.debug("Creating Trove admin user '%s'." % ADMIN_USER_NAME)
-        localhost = "localhost"
-        g = sql_query.Grant(permissions='ALL', user=ADMIN_USER_NAME,
-                            host=localhost, grant_option=True, clear=password)
+        g = self._build_admin_grant(password)
         t = text(str(g))
         client.execute(t)
         LOG.debug("Trove admin user '%s' created." % ADMIN_USER_NAME)
@@ -699,32 +706,46 @@ class BaseMySqlApp(object):
             packager.pkg_install(packages, pkg_opts, self.TIME_OUT)
             self._create_mysql_confd_dir()
             LOG.info(_("Finished installing MySQL server."))
-        self.start_mysql()
 
     def secure(self, config_contents):
+        """Apply the final configuration and start MySQL with the Trove
+        admin user in place.
+
+        The configuration is written with the server stopped and the admin
+        user is created from an init file as the server starts, so MySQL
+        is only started once.
+        """
         LOG.debug("Securing MySQL now.")
-        clear_expired_password()
         LOG.debug("Generating admin password.")
         admin_password = utils.generate_random_password()
-        engine = sqlalchemy.create_engine(
-            CONNECTION_STR_FORMAT % ('root', ''), echo=True)
-        with self.local_sql_client(engine, use_flush=False) as client:
-            self._create_admin_user(client, admin_password)
-
-        LOG.debug("Switching to the '%s' user now." % ADMIN_USER_NAME)
-        self.clear_engine_cache()
-        engine = sqlalchemy.create_engine(
-            CONNECTION_STR_FORMAT % (ADMIN_USER_NAME,
-                                     urllib.parse.quote(admin_password)),
-            echo=True)
-        with self.local_sql_client(engine) as client:
-            self._remove_anonymous_user(client)
-
         self.stop_db()
         self._reset_configuration(config_contents, admin_password)
-        self.start_mysql()
+        self._start_mysql_with_init_file([
+            str(self._build_admin_grant(admin_password)),
+            sql_query.REMOVE_ANON,
+            sql_query.FLUSH])
+        clear_expired_password()
         LOG.debug("MySQL secure complete.")
 
+    def _start_mysql_with_init_file(self, statements):
+        """Start MySQL, having the server run the given statements as it
+        starts up (before accepting any connections).
+        """
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.sql',
+                                         delete=False) as init_file:
+            init_file.write('\n'.join(statements) + '\n')
+        try:
+            operating_system.chown(init_file.name, MYSQL_OWNER, MYSQL_OWNER,
+                                   as_root=True)
+            self.configuration_manager.apply_system_override(
+                {MySQLConfParser.SERVER_CONF_SECTION:
+                    {'init_file': init_file.name}}, CNF_INIT)
+            self.start_mysql()
+        finally:
+            # The file is only read at startup.
+            self.configuration_manager.remove_system_override(CNF_INIT)
+            operating_system.remove(init_file.name, force=True, as_root=True)
+
     def _reset_configuration(self, configuration, admin_password=None):
         if not admin_password:
             # Take the current admin password from the base configuration file
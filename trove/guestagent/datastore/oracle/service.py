@@ -497,6 +497,7 @@ class OracleVMApp(service.OracleApp):
 
     def stop_db(self, do_not_start_on_reboot=False):
         LOG.debug("Stop the Oracle database.")
+        service.SESSION_POOL.clear()
         self.status.stop_db_service()
 
     def restart(self):
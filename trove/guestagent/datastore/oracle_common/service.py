@@ -50,6 +50,7 @@
 
 import os
 from os import path
+import time
 
 import cx_Oracle
 from oslo_log import log as logging
@@ -69,6 +70,11 @@ LOG = logging.getLogger(__name__)
 
 ORACLE_TIMEOUT = 1200
 
+# Idle sessions kept per connection key, and how long (in seconds) an idle
+# session is kept before it is logged off.
+MAX_IDLE_SESSIONS = 4
+SESSION_IDLE_TIMEOUT = 300
+
 
 def run_sys_command(command, user, timeout=ORACLE_TIMEOUT, shell=False):
     return utils.execute_with_timeout('su', '-', user, '-c', command,
@@ -164,8 +170,75 @@ class OracleConfig(object):
         self._set_option(self.tag_root_enabled, 'false')
 
 
+class OracleSessionPool(object):
+    """A guest-wide pool of logged on Oracle sessions.
+
+    Oracle logons are expensive, so the sessions opened by OracleClient
+    are kept and handed out again to later clients that connect with the
+    same credentials.  cx_Oracle.SessionPool can't be used because it
+    does not support SYSDBA logons, which all the admin sessions use.
+
+    A session is checked with a ping before it is reused, and the pool
+    must be cleared whenever the database is stopped.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE_SESSIONS,
+                 idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+
+    def acquire(self, key, connect):
+        """Return an idle session for key, or a new one from connect()."""
+        sessions = self._idle.get(key, [])
+        while sessions:
+            released, conn = sessions.pop()
+            if time.time() - released < self.idle_timeout:
+                try:
+                    conn.ping()
+                    return conn
+                except cx_Oracle.DatabaseError:
+                    LOG.debug("Discarding a stale Oracle session.")
+            self._close(conn)
+        return connect()
+
+    def release(self, key, conn):
+        """Return a session to the pool once its client is done with it."""
+        try:
+            conn.rollback()
+        except cx_Oracle.DatabaseError:
+            self._close(conn)
+            return
+        sessions = self._idle.setdefault(key, [])
+        if len(sessions) < self.max_idle:
+            sessions.append((time.time(), conn))
+        else:
+            self._close(conn)
+
+    def clear(self):
+        """Log off all the idle sessions."""
+        idle, self._idle = self._idle, {}
+        for sessions in idle.values():
+            for released, conn in sessions:
+                self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except cx_Oracle.DatabaseError:
+            pass
+
+
+SESSION_POOL = OracleSessionPool()
+
+
 class OracleClient(object):
-    """A wrapper to manage Oracle connections."""
+    """A wrapper to manage Oracle connections.
+
+    Sessions are taken from and returned to SESSION_POOL, except for
+    PRELIM_AUTH logons which are only used to start the database.
+    """
 
     def __init__(self, sid, oracle_home,
                  hostname, port, user_id, password, use_service, mode):
@@ -187,15 +260,28 @@ class OracleClient(object):
                                         self.port,
                                         service_name=self.sid)
             LOG.debug("Connecting to Oracle with DSN: %s" % ora_dsn)
-        self.conn = cx_Oracle.connect(user=self.user_id,
-                                      password=self.password,
-                                      dsn=ora_dsn,
-                                      mode=self.mode)
+
+        def _connect():
+            return cx_Oracle.connect(user=self.user_id,
+                                     password=self.password,
+                                     dsn=ora_dsn,
+                                     mode=self.mode)
+        self.pool_key = None
+        if not self.mode & cx_Oracle.PRELIM_AUTH:
+            self.pool_key = (self.oracle_home, self.sid, ora_dsn,
+                             self.user_id, self.password, self.mode)
+        if self.pool_key:
+            self.conn = SESSION_POOL.acquire(self.pool_key, _connect)
+        else:
+            self.conn = _connect()
         return self.conn
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         try:
-            self.conn.close()
+            if self.pool_key:
+                SESSION_POOL.release(self.pool_key, self.conn)
+            else:
+                self.conn.close()
         except cx_Oracle.DatabaseError as e:
             error, = e.args
             if error.code == 1012:
@@ -215,7 +301,15 @@ class OracleCursor(OracleClient):
 
     def __enter__(self):
         super(OracleCursor, self).__enter__()
-        return self.conn.cursor()
+        self.cur = self.conn.cursor()
+        return self.cur
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.cur.close()
+        except cx_Oracle.DatabaseError:
+            pass
+        super(OracleCursor, self).__exit__(exc_type, exc_val, exc_tb)
 
 
 class OracleAdmin(object):
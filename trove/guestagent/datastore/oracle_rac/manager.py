@@ -141,7 +141,8 @@ class Manager(manager.OracleManager):
         raise exception.DatastoreOperationNotSupported(
             operation='unmount_volume', datastore=self.manager)
 
-    def resize_fs(self, context, device_path=None, mount_point=None):
+    def resize_fs(self, context, device_path=None, mount_point=None,
+                  online=False):
         raise exception.DatastoreOperationNotSupported(
             operation='resize_fs', datastore=self.manager)
 
@@ -15,10 +15,15 @@
 from datetime import datetime
 import enum
 import hashlib
+import io
 import os
 from requests.exceptions import ConnectionError
+import threading
 
+from eventlet import greenpool
+from eventlet import pools
 from oslo_log import log as logging
+from oslo_service import loopingcall
 from swiftclient.client import ClientException
 
 from trove.common import cfg
@@ -26,6 +31,7 @@ from trove.common import exception
 from trove.common.i18n import _
 from trove.common.remote import create_swift_client
 from trove.common import stream_codecs
+from trove.common import swift_utils
 from trove.guestagent.common import operating_system
 from trove.guestagent.common.operating_system import FileMode
 
@@ -105,6 +111,9 @@ class GuestLog(object):
         self._file_readable = False
         self._container_name = None
         self._codec = stream_codecs.JsonCodec()
+        self._publish_lock = threading.Lock()
+        self._follower = None
+        self._follow_last_size = None
 
         self._set_status(self._type == LogType.USER,
                          LogStatus.Disabled, LogStatus.Enabled)
@@ -145,6 +154,12 @@ class GuestLog(object):
     @enabled.setter
     def enabled(self, enabled):
         self._enabled = enabled
+        if not enabled:
+            self.stop_follow()
+
+    @property
+    def following(self):
+        return self._follower is not None
 
     @property
     def status(self):
@@ -289,7 +304,7 @@ class GuestLog(object):
             return True
 
     def _update_log_header_digest(self, log_file):
-        with open(log_file, 'r') as log:
+        with open(log_file, 'rb') as log:
             self._header_digest = hashlib.md5(log.readline()).hexdigest()
 
     def _get_headers(self):
@@ -297,24 +312,73 @@ class GuestLog(object):
 
     def publish_log(self):
         if self.exposed:
-            if self._log_rotated():
-                LOG.debug("Log file rotation detected for '%s' - "
-                          "discarding old log" % self._name)
-                self._delete_log_components()
-            if os.path.isfile(self._file):
-                self._publish_to_container(self._file)
-            else:
-                raise RuntimeError(_(
-                    "Cannot publish log file '%s' as it does not exist.") %
-                    self._file)
+            if CONF.guest_log_follow_interval > 0:
+                # Publishing happens incrementally in the background, so
+                # just make sure we're following the log and report back.
+                self.follow(CONF.guest_log_follow_interval)
+                return self.show()
+            with self._publish_lock:
+                if self._log_rotated():
+                    LOG.debug("Log file rotation detected for '%s' - "
+                              "discarding old log" % self._name)
+                    self._delete_log_components()
+                if os.path.isfile(self._file):
+                    self._publish_to_container(self._file)
+                else:
+                    raise RuntimeError(_(
+                        "Cannot publish log file '%s' as it does not exist.") %
+                        self._file)
             return self.show()
         else:
             raise exception.LogAccessForbidden(
                 action='publish', log=self._name)
 
+    def follow(self, interval):
+        """Start publishing the log incrementally in the background,
+        every 'interval' seconds.  Does nothing if the log is already
+        being followed.
+        """
+        if self._follower is None:
+            LOG.debug("Following log '%s' every %ss" % (self._name, interval))
+            self._follow_last_size = None
+            self._follower = loopingcall.FixedIntervalLoopingCall(
+                self._follow_log)
+            self._follower.start(interval, initial_delay=0)
+
+    def stop_follow(self):
+        if self._follower is not None:
+            LOG.debug("No longer following log '%s'" % self._name)
+            self._follower.stop()
+            self._follower = None
+
+    def _follow_log(self):
+        """Publish whatever was appended to the log since the last run.
+        A trailing partial line is held back until the log stops growing,
+        so that lines are not split across components while the datastore
+        is still writing them.
+        """
+        try:
+            with self._publish_lock:
+                if not os.path.isfile(self._file):
+                    return
+                if self._log_rotated():
+                    LOG.debug("Log file rotation detected for '%s' - "
+                              "discarding old log" % self._name)
+                    self._delete_log_components()
+                size = os.path.getsize(self._file)
+                final = size == self._follow_last_size
+                self._follow_last_size = size
+                self._publish_to_container(
+                    self._file, final=final,
+                    limit=CONF.guest_log_limit * self._publish_workers())
+        except Exception:
+            LOG.exception(_("Error following log '%s'.") % self._name)
+
     def discard_log(self):
         if self.exposed:
-            self._delete_log_components()
+            self.stop_follow()
+            with self._publish_lock:
+                self._delete_log_components()
             return self.show()
         else:
             raise exception.LogAccessForbidden(
@@ -323,55 +387,127 @@ class GuestLog(object):
     def _delete_log_components(self):
         container_name = self.get_container_name(force=True)
         prefix = self._object_prefix()
-        swift_files = [swift_file['name']
-                       for swift_file in self.swift_client.get_container(
-                       container_name, prefix=prefix)[1]]
+        swift_files = swift_utils.list_object_names(
+            self.swift_client, container_name, prefix=prefix)
         swift_files.append(self._metafile_name())
-        for swift_file in swift_files:
-            self.swift_client.delete_object(container_name, swift_file)
+        swift_utils.delete_objects(self.context, container_name, swift_files,
+                                   client=self.swift_client)
         self._set_status(self._type == LogType.USER,
                          LogStatus.Disabled, LogStatus.Enabled)
         self._published_size = 0
 
-    def _publish_to_container(self, log_filename):
-        log_component, log_lines = '', 0
-        chunk_size = CONF.guest_log_limit
-        container_name = self.get_container_name(force=True)
+    def _publish_workers(self):
+        return max(CONF.guest_log_publish_workers, 1)
 
-        def _read_chunk(f):
-            while True:
-                current_chunk = f.read(chunk_size)
-                if not current_chunk:
-                    break
-                yield current_chunk
-
-        def _write_log_component():
-            object_headers.update({'x-object-meta-lines': str(log_lines)})
-            component_name = '%s%s' % (self._object_prefix(),
-                                       self._object_name())
-            self.swift_client.put_object(container_name,
-                                         component_name, log_component,
-                                         headers=object_headers)
-            self._published_size = (
-                self._published_size + len(log_component))
-            self._published_header_digest = self._header_digest
+    def _publish_to_container(self, log_filename, final=True, limit=None):
+        """Publish the log from the last published offset onwards.
 
-        self._refresh_details()
-        self._put_meta_details()
+        The log is read in binary mode and components are cut on line
+        boundaries, then uploaded concurrently by a bounded pool of
+        workers - so at most 'guest_log_publish_workers' components are
+        held in memory at any time.  If 'final' is False, a trailing
+        partial line is left for the next publish.  If 'limit' is given,
+        publishing stops once that many bytes have been read.
+        """
+        container_name = self.get_container_name(force=True)
         object_headers = self._get_headers()
-        with open(log_filename, 'r') as log:
+        workers = self._publish_workers()
+        worker_pool = greenpool.GreenPool(workers)
+        clients = [self.swift_client]
+        client_pool = pools.Pool(
+            max_size=workers,
+            create=lambda: (clients.pop() if clients
+                            else create_swift_client(self.context)))
+        components = []
+        failures = {}
+
+        def _write_log_component(index, component_name, data, lines):
+            headers = dict(object_headers)
+            headers.update({'x-object-meta-lines': str(lines)})
+            try:
+                with client_pool.item() as client:
+                    client.put_object(container_name, component_name, data,
+                                      headers=headers)
+            except Exception as ex:
+                LOG.exception(_("Could not publish component '%s'.") %
+                              component_name)
+                failures[index] = ex
+
+        self._refresh_details()
+        with io.open(log_filename, 'rb') as log:
             LOG.debug("seeking to %s", self._published_size)
             log.seek(self._published_size)
-            for chunk in _read_chunk(log):
-                for log_line in chunk.splitlines():
-                    if len(log_component) + len(log_line) > chunk_size:
-                        _write_log_component()
-                        log_component, log_lines = '', 0
-                    log_component = log_component + log_line + '\n'
-                    log_lines += 1
-        if log_lines > 0:
-            _write_log_component()
+            offset = self._published_size
+            for data, lines in self._read_log_components(
+                    log, CONF.guest_log_limit, final, limit):
+                component_name = '%s%s' % (self._object_prefix(),
+                                           self._object_name(offset))
+                worker_pool.spawn_n(_write_log_component, len(components),
+                                    component_name, data, lines)
+                components.append((component_name, len(data)))
+                offset += len(data)
+        worker_pool.waitall()
+
+        # Only the components before the first failure are usable, as the
+        # published size is an offset into the log.
+        for index, (component_name, size) in enumerate(components):
+            if index in failures:
+                break
+            self._published_size += size
+        if components:
+            self._published_header_digest = self._header_digest
         self._put_meta_details()
+        if failures:
+            first_failure = min(failures)
+            self._delete_unusable_components(container_name, [
+                name for index, (name, _size) in enumerate(components)
+                if index > first_failure and index not in failures])
+            raise failures[first_failure]
+
+    def _delete_unusable_components(self, container_name, component_names):
+        """Delete the components uploaded after a failed one.  The next
+        publish uploads them again from the published size, under new
+        names, so leaving them would duplicate their lines in the log.
+        """
+        if not component_names:
+            return
+        try:
+            swift_utils.delete_objects(self.context, container_name,
+                                       component_names,
+                                       client=self.swift_client)
+        except Exception:
+            LOG.exception(_("Could not delete the components published "
+                            "after a failed one."))
+
+    @staticmethod
+    def _read_log_components(log, chunk_size, final=True, limit=None):
+        """Read the binary stream 'log' and yield (data, lines) tuples,
+        each at most chunk_size bytes long and ending on a line boundary
+        (unless a single line is longer than chunk_size).  Data is read
+        into a single preallocated buffer to avoid repeated string
+        building.
+        """
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        filled, total, eof = 0, 0, False
+        while limit is None or total < limit:
+            count = log.readinto(view[filled:])
+            if not count:
+                eof = True
+                break
+            filled += count
+            total += count
+            if filled < chunk_size:
+                continue
+            end = buf.rfind(b'\n', 0, filled) + 1 or filled
+            yield bytes(buf[:end]), buf.count(b'\n', 0, end)
+            buf[:filled - end] = buf[end:filled]
+            filled -= end
+        if filled:
+            end = (filled if final and eof
+                   else buf.rfind(b'\n', 0, filled) + 1)
+            if end:
+                yield bytes(buf[:end]), buf.count(b'\n', 0, end)
 
     def _put_meta_details(self):
         metafile_name = self._metafile_name()
@@ -398,8 +534,11 @@ class GuestLog(object):
             'datastore': CONF.datastore_manager,
             'log': self._name}
 
-    def _object_name(self):
-        return 'log-%s' % str(datetime.utcnow()).replace(' ', 'T')
+    def _object_name(self, offset=0):
+        # Components may be uploaded out of order, so the offset is used
+        # to keep the names unique (and sorted) for the same timestamp.
+        return 'log-%s-%012d' % (str(datetime.utcnow()).replace(' ', 'T'),
+                                 offset)
 
     def _get_meta_details(self):
         LOG.debug("Getting meta details for '%s'" % self._name)
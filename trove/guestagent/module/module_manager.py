@@ -52,8 +52,12 @@ class ModuleManager(object):
         datastore = datastore or cls.MODULE_APPLY_TO_ALL
         ds_version = ds_version or cls.MODULE_APPLY_TO_ALL
         module_dir = cls.build_module_dir(module_type, module_id)
-        data_file = cls.write_module_contents(module_dir, contents, md5,
-                                              use_root=use_root)
+        if contents is None:
+            # Reuse the contents already on the guest (see has_contents)
+            data_file = cls.build_contents_filename(module_dir)
+        else:
+            data_file = cls.write_module_contents(module_dir, contents, md5,
+                                                  use_root=use_root)
         applied = True
         message = None
         now = cls.get_current_timestamp()
@@ -107,6 +111,25 @@ class ModuleManager(object):
                                     as_root=use_root)
         return contents_file
 
+    @classmethod
+    def has_contents(cls, module_type, module_id, md5):
+        """Check whether the contents with the given md5 were already
+        written for the module, so they don't need to be sent again.
+        """
+        if not md5:
+            return False
+        sub_dir = os.path.join(module_type, module_id)
+        module_dir = guestagent_utils.build_file_path(
+            cls.MODULE_BASE_DIR, sub_dir)
+        result_file = guestagent_utils.build_file_path(
+            module_dir, cls.MODULE_RESULT_FILENAME)
+        contents_file = cls.build_contents_filename(module_dir)
+        if not (operating_system.exists(result_file) and
+                operating_system.exists(contents_file)):
+            return False
+        result = cls.read_module_result(result_file, {'md5': None})
+        return result.get('md5') == md5
+
     @classmethod
     def build_contents_filename(cls, module_dir):
         contents_file = guestagent_utils.build_file_path(
@@ -64,8 +64,13 @@ LOG = logging.getLogger(__name__)
 
 
 class RmanBackup(base.BackupRunner):
-    """Implementation of Backup Strategy for RMAN."""
+    """Implementation of Backup Strategy for RMAN.
+
+    The backupsets are already compressed by RMAN, so the stream is not
+    gzipped again.
+    """
     __strategy_name__ = 'rmanbackup'
+    is_zipped = False
 
     def __init__(self, *args, **kwargs):
         self.app = service.OracleVMApp(service.OracleVMAppStatus())
@@ -98,6 +103,9 @@ class RmanBackup(base.BackupRunner):
                 as_root=True)
             cmds = [
                 "configure backup optimization on",
+                ("configure device type disk parallelism %d "
+                 "backup type to compressed backupset"
+                 % CONF.get(MANAGER).backup_channels),
                 ("configure channel device type disk format "
                  "'%s/%%I_%%u_%%s_%s.dat'" % (bkp_dir, self.backup_id)),
                 ("backup incremental level=%s as compressed backupset "
@@ -0,0 +1,165 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""Helpers for waiting on a replica to catch up with its master.
+
+Each datastore reports its position in the replication stream in its own
+format (a PostgreSQL xlog location, a Redis offset, a MySQL GTID set).
+The functions here turn those positions into a numeric lag, and
+wait_for_catchup polls that lag with a sleep that shrinks as the replica
+gets close to the target, so that a promotion or eject can carry on as
+soon as the replica has caught up.
+"""
+
+import time
+
+from oslo_log import log as logging
+
+from trove.common import exception
+from trove.common.i18n import _
+
+
+LOG = logging.getLogger(__name__)
+
+MIN_SLEEP = 0.05
+MAX_SLEEP = 2.0
+
+
+def lsn_to_int(lsn):
+    """Convert a PostgreSQL xlog location ('16/B374D848') to a byte
+    position.
+    """
+    if not lsn:
+        return 0
+    high, low = str(lsn).split('/')
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+def lsn_lag(current, target):
+    """Number of bytes of xlog between the current and target locations."""
+    return max(lsn_to_int(target) - lsn_to_int(current), 0)
+
+
+def offset_lag(current, target):
+    """Number of bytes between two numeric replication offsets."""
+    return max(int(target) - int(current or 0), 0)
+
+
+def parse_gtid_set(gtid_set):
+    """Parse a MySQL GTID set ('uuid:1-5:7,uuid2:3') into a dict of the
+    transaction intervals executed from each server.
+    """
+    intervals = {}
+    for uuid_set in (gtid_set or '').replace('\n', '').split(','):
+        parts = uuid_set.strip().split(':')
+        if not parts[0]:
+            continue
+        server = intervals.setdefault(parts[0].lower(), [])
+        for interval in parts[1:]:
+            start, _sep, end = interval.partition('-')
+            server.append((int(start), int(end or start)))
+    return intervals
+
+
+def gtid_lag(current, target):
+    """Number of transactions in the target GTID set that are not in the
+    current one.
+    """
+    executed = parse_gtid_set(current)
+    missing = 0
+    for server, intervals in parse_gtid_set(target).items():
+        done = executed.get(server, [])
+        for start, end in intervals:
+            missing += end - start + 1
+            for done_start, done_end in done:
+                overlap = min(end, done_end) - max(start, done_start) + 1
+                if overlap > 0:
+                    missing -= overlap
+    return missing
+
+
+class ReplicationProgress(object):
+    """Tracks how far a replica is behind a target position.
+
+    get_lag returns the remaining distance to the target (in bytes or
+    transactions, as given by unit).  The rate at which the lag shrinks is
+    used to estimate how many seconds the replica is behind.
+    """
+
+    def __init__(self, get_lag, unit):
+        self.get_lag = get_lag
+        self.unit = unit
+        self.lag = None
+        self.rate = None
+        self._checked = None
+
+    def check(self):
+        lag = max(self.get_lag(), 0)
+        now = time.time()
+        if self.lag is not None and now > self._checked:
+            applied = self.lag - lag
+            if applied > 0:
+                rate = applied / (now - self._checked)
+                self.rate = rate if self.rate is None else (
+                    (self.rate + rate) / 2)
+        self.lag = lag
+        self._checked = now
+        return lag
+
+    @property
+    def seconds_behind(self):
+        """Estimated seconds to catch up, or None if it can't be told yet."""
+        if not self.lag:
+            return 0
+        if not self.rate:
+            return None
+        return self.lag / self.rate
+
+    def next_sleep(self, sleep, min_sleep=MIN_SLEEP, max_sleep=MAX_SLEEP):
+        """Sleep for about half the estimated time to catch up, and back off
+        while the replica is not making progress.
+        """
+        seconds = self.seconds_behind
+        if seconds is None:
+            return min(sleep * 2, max_sleep)
+        return max(min_sleep, min(seconds / 2, max_sleep))
+
+
+def wait_for_catchup(get_lag, unit='bytes', time_out=120,
+                     min_sleep=MIN_SLEEP, max_sleep=MAX_SLEEP):
+    """Wait until get_lag returns zero.
+
+    PollTimeOut is raised if that takes longer than time_out seconds.
+    Returns the ReplicationProgress that was tracked.
+    """
+    progress = ReplicationProgress(get_lag, unit)
+    deadline = time.time() + time_out
+    sleep = min_sleep
+    while progress.check() > 0:
+        seconds = progress.seconds_behind
+        LOG.debug("Replica is %(lag)s %(unit)s behind (%(seconds)s seconds)."
+                  % {'lag': progress.lag, 'unit': unit,
+                     'seconds': ('%.1f' % seconds if seconds is not None
+                                 else 'unknown')})
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise exception.PollTimeOut(
+                _("Replica still %(lag)s %(unit)s behind after %(time)s "
+                  "seconds.") % {'lag': progress.lag, 'unit': unit,
+                                 'time': time_out})
+        sleep = progress.next_sleep(sleep, min_sleep, max_sleep)
+        time.sleep(min(sleep, remaining))
+    return progress
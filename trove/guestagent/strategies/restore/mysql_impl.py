@@ -201,8 +201,15 @@ class InnoBackupEx(base.RestoreRunner, MySQLRestoreMixin):
                         ' %(restore_location)s'
                         ' 2>/tmp/innoprepare.log')
 
+    # The data directory is restored with mysqld stopped, so the caller
+    # may ask for it to be left stopped (see start_db).
+    restores_offline = True
+
     def __init__(self, *args, **kwargs):
         self._app = None
+        # If False, mysqld is not started after the restore and the
+        # caller is responsible for resetting the admin user.
+        self.start_db = kwargs.pop('start_db', True)
         super(InnoBackupEx, self).__init__(*args, **kwargs)
         self.prepare_cmd = self.base_prepare_cmd % kwargs
         self.prep_retcode = None
@@ -234,8 +241,9 @@ class InnoBackupEx(base.RestoreRunner, MySQLRestoreMixin):
         operating_system.chown(self.restore_location, 'mysql', None,
                                force=True, as_root=True)
         self._delete_old_binlogs()
-        self.reset_root_password()
-        self.app.start_mysql()
+        if self.start_db:
+            self.reset_root_password()
+            self.app.start_mysql()
 
     def _delete_old_binlogs(self):
         files = glob.glob(os.path.join(self.restore_location, "ib_logfile*"))
@@ -83,6 +83,8 @@ class RmanBackup(base.RestoreRunner):
             'startup nomount',
             "restore controlfile from '%s'" % control_file,
             'startup mount',
+            ('configure device type disk parallelism %d'
+             % CONF.get(MANAGER).backup_channels),
             'crosscheck backup',
             'delete noprompt expired backup',
             'restore database']
@@ -120,9 +122,20 @@ class RmanBackup(base.RestoreRunner):
             t_pswd=self.app.admin.ora_config.admin_password)
         script.run(timeout=CONF.get(MANAGER).usage_timeout)
 
+    def _is_zipped(self, location):
+        # Backups taken before RMAN backups stopped being gzipped on top of
+        # the compressed backupsets have the gzip extension in their name.
+        return bool(location) and (location.endswith('.gz') or
+                                   location.endswith('.gz.enc'))
+
+    def _unpack_cmd(self, location):
+        unzip_cmd = 'gzip -d -c | ' if self._is_zipped(location) else ''
+        return self.decrypt_cmd + unzip_cmd + self.base_restore_cmd
+
     def _unpack_backup_files(self, location, checksum):
         LOG.debug("Restoring full backup files.")
-        self.content_length = self._unpack(location, checksum, self.restore_cmd)
+        self.content_length = self._unpack(location, checksum,
+                                           self._unpack_cmd(location))
 
     def _run_restore(self):
         metadata = self.storage.load_metadata(self.location, self.checksum)
@@ -195,4 +208,4 @@ class RmanBackupIncremental(RmanBackup):
             self._unpack_backup_files(parent_location, parent_checksum)
 
         self.content_length += self._unpack(location, checksum,
-                                            self.restore_cmd)
+                                            self._unpack_cmd(location))
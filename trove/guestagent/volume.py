@@ -18,15 +18,18 @@ import shlex
 from tempfile import NamedTemporaryFile
 import traceback
 
+from eventlet import greenpool
 from oslo_log import log as logging
 
 from trove.common import cfg
 from trove.common import exception
 from trove.common.i18n import _
 from trove.common import utils
+from trove.guestagent.common import guestagent_utils
 from trove.guestagent.common import operating_system
 
 TMP_MOUNT_POINT = "/mnt/volume"
+MIGRATION_MANIFEST = ".trove-migration"
 
 LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
@@ -46,6 +49,12 @@ class VolumeDevice(object):
     def migrate_data(self, source_dir, target_subdir=None):
         """Synchronize the data from the source directory to the new
         volume; optionally to a new sub-directory on the new volume.
+
+        If more than one migration worker is configured, the
+        sub-directories of the source are copied by parallel rsync
+        processes. The ones that have been copied are recorded in a
+        manifest on the guest as they complete, so that a retried
+        migration only copies what is left (see format()).
         """
         self.mount(TMP_MOUNT_POINT, write_to_fstab=False)
         if not source_dir[-1] == '/':
@@ -53,16 +62,83 @@ class VolumeDevice(object):
         target_dir = TMP_MOUNT_POINT
         if target_subdir:
             target_dir = target_dir + "/" + target_subdir
+        manifest = self._migration_manifest()
+        done = set()
+        if operating_system.exists(manifest):
+            done.update(operating_system.read_file(manifest).splitlines())
+            LOG.debug("Resuming data migration, %d directories have "
+                      "already been copied." % len(done))
+        operating_system.write_file(manifest, "\n".join(sorted(done)))
         try:
-            utils.execute("rsync", "--safe-links", "--perms",
-                          "--recursive", "--owner", "--group", "--xattrs",
-                          "--sparse", source_dir, target_dir,
-                          run_as_root=True, root_helper="sudo")
+            if CONF.volume_migration_workers > 1:
+                self._migrate_parallel(source_dir, target_dir, manifest,
+                                       done)
+            else:
+                self._rsync(source_dir, target_dir)
         except exception.ProcessExecutionError:
             msg = _("Could not migrate data.")
             log_and_raise(msg)
+        self._remove_migration_manifest()
         self.unmount(TMP_MOUNT_POINT)
 
+    def _migration_manifest(self):
+        # The manifest is kept on the guest, not on the device, so that it
+        # survives the device being formatted by a retried prepare.
+        return guestagent_utils.build_file_path(
+            '~', MIGRATION_MANIFEST, os.path.basename(self.device_path))
+
+    def _remove_migration_manifest(self):
+        manifest = self._migration_manifest()
+        if os.path.exists(manifest):
+            os.remove(manifest)
+
+    def _rsync(self, source_dir, target_dir, recursive=True):
+        # rsync verifies every file it transfers against a whole-file
+        # checksum and skips the ones already up to date on the target.
+        utils.execute("rsync", "--safe-links", "--perms",
+                      "--recursive" if recursive else "--dirs",
+                      "--owner", "--group", "--xattrs",
+                      "--sparse", source_dir, target_dir,
+                      run_as_root=True, root_helper="sudo")
+
+    def _migrate_parallel(self, source_dir, target_dir, manifest, done):
+        # The files at the top of the tree and the (empty) directories.
+        self._rsync(source_dir, target_dir, recursive=False)
+        out, err = utils.execute("find", source_dir, "-mindepth", "1",
+                                 "-maxdepth", "1", "-type", "d",
+                                 "-printf", "%f\\n",
+                                 run_as_root=True, root_helper="sudo")
+        pending = [name for name in out.splitlines()
+                   if name and name not in done]
+        LOG.debug("Copying %(count)d directories from %(source)s with "
+                  "%(workers)d workers." %
+                  {'count': len(pending), 'source': source_dir,
+                   'workers': CONF.volume_migration_workers})
+
+        errors = []
+
+        def _copy(name):
+            try:
+                self._rsync(os.path.join(source_dir, name) + "/",
+                            os.path.join(target_dir, name))
+            except exception.ProcessExecutionError as ex:
+                LOG.error(_("Could not copy %(dir)s: %(err)s") %
+                          {'dir': name, 'err': ex})
+                errors.append(ex)
+                return
+            # Record each directory as soon as it is copied, so that a
+            # migration that is interrupted in any way can be resumed.
+            done.add(name)
+            operating_system.write_file(manifest, "\n".join(sorted(done)))
+
+        pool = greenpool.GreenPool(CONF.volume_migration_workers)
+        for name in pending:
+            pool.spawn_n(_copy, name)
+        pool.waitall()
+
+        if errors:
+            raise errors[0]
+
     def _check_device_exists(self):
         """Check that the device path exists.
 
@@ -118,8 +194,21 @@ class VolumeDevice(object):
             log_and_raise(msg)
 
     def format(self):
-        """Formats the device at device_path and checks the filesystem."""
+        """Formats the device at device_path and checks the filesystem.
+
+        A device that a data migration was interrupted on is not formatted
+        again, so that the retried migration resumes the copy.
+        """
         self._check_device_exists()
+        manifest = self._migration_manifest()
+        if operating_system.exists(manifest):
+            try:
+                self._check_format()
+                LOG.info(_("Not formatting '%s', it holds a partial data "
+                           "migration.") % self.device_path)
+                return
+            except exception.GuestError:
+                self._remove_migration_manifest()
         self._format()
         self._check_format()
 
@@ -144,8 +233,16 @@ class VolumeDevice(object):
 
         return True
 
-    def resize_fs(self, mount_point):
-        """Resize the filesystem on the specified device."""
+    def resize_fs(self, mount_point, online=False):
+        """Resize the filesystem on the specified device.
+
+        If online is set, the filesystem is grown while it is still
+        mounted at mount_point, otherwise it is checked and resized
+        with the device unmounted.
+        """
+        if online:
+            self._resize_fs_online(mount_point)
+            return
         self._check_device_exists()
         # Some OS's will mount a file systems after it's attached if
         # an entry is put in the fstab file (like Trove does).
@@ -164,6 +261,55 @@ class VolumeDevice(object):
                 self.device_path)
             log_and_raise(msg)
 
+    def _resize_fs_online(self, mount_point):
+        """Grow the mounted filesystem to fill the (extended) device."""
+        self._rescan_device()
+        self._check_device_exists()
+        if not operating_system.is_mount(mount_point):
+            msg = _("Cannot grow the filesystem online, '%s' is not "
+                    "mounted.") % mount_point
+            raise exception.GuestError(original_message=msg)
+        volume_fstype = CONF.volume_fstype
+        LOG.debug("Growing %(type)s filesystem on '%(dev)s' mounted at "
+                  "'%(mount)s'." % {'type': volume_fstype,
+                                    'dev': self.device_path,
+                                    'mount': mount_point})
+        try:
+            if volume_fstype == 'xfs':
+                utils.execute("xfs_growfs", mount_point,
+                              run_as_root=True, root_helper="sudo")
+            else:
+                utils.execute("resize2fs", self.device_path,
+                              run_as_root=True, root_helper="sudo")
+        except exception.ProcessExecutionError:
+            msg = _("Error growing the filesystem with device '%s'.") % (
+                self.device_path)
+            log_and_raise(msg)
+
+    def _rescan_device(self):
+        """Make the kernel pick up the new size of the device.
+
+        Loop devices need their capacity reread from the backing file,
+        SCSI devices need a rescan.  Virtio devices are resized by the
+        hypervisor, so there is nothing to do for them.
+        """
+        device_name = os.path.basename(os.path.realpath(self.device_path))
+        rescan_file = os.path.join('/sys/class/block', device_name,
+                                   'device', 'rescan')
+        try:
+            if device_name.startswith('loop'):
+                LOG.debug("Rereading the capacity of '%s'." %
+                          self.device_path)
+                utils.execute("losetup", "--set-capacity", self.device_path,
+                              run_as_root=True, root_helper="sudo")
+            elif os.path.exists(rescan_file):
+                LOG.debug("Rescanning '%s'." % self.device_path)
+                utils.execute("tee", rescan_file, process_input='1',
+                              run_as_root=True, root_helper="sudo")
+        except exception.ProcessExecutionError:
+            msg = _("Could not rescan device '%s'.") % self.device_path
+            log_and_raise(msg)
+
     def unmount(self, mount_point):
         if operating_system.is_mount(mount_point):
             try:
@@ -175,9 +175,11 @@ class SimpleInstance(object):
         self.root_pass = root_password
         self._fault = None
         self._fault_loaded = False
+        self.ds_version = ds_version
         if ds_version is None:
             self.ds_version = (datastore_models.DatastoreVersion.
                                load_by_uuid(self.db_info.datastore_version_id))
+        self.ds = ds
         if ds is None:
             self.ds = (datastore_models.Datastore.
                        load(self.ds_version.datastore_id))
@@ -626,7 +628,8 @@ class BaseInstance(SimpleInstance):
     -----------
     """
 
-    def __init__(self, context, db_info, server, datastore_status):
+    def __init__(self, context, db_info, server, datastore_status,
+                 ds_version=None, ds=None):
         """
         Creates a new initialized representation of an instance composed of its
         state in the database and its state from Nova
@@ -644,7 +647,8 @@ class BaseInstance(SimpleInstance):
         :type server: novaclient.v2.servers.Server
         :typdatastore_statusus: trove.instance.models.InstanceServiceStatus
         """
-        super(BaseInstance, self).__init__(context, db_info, datastore_status)
+        super(BaseInstance, self).__init__(context, db_info, datastore_status,
+                                           ds_version=ds_version, ds=ds)
         self.server = server
         self._guest = None
         self._nova_client = None
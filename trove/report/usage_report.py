@@ -18,6 +18,8 @@ import csv
 import datetime
 
 from oslo_log import log as logging
+from sqlalchemy import func
+from sqlalchemy import or_
 from sqlalchemy.sql.expression import literal_column
 from sqlalchemy import text
 
@@ -34,6 +36,9 @@ db_api = get_db_api()
 
 DSVS = None
 
+# Number of events fetched from the database at a time.
+QUERY_BATCH_SIZE = 1000
+
 
 class DataStoreCounter(object):
     def __init__(self):
@@ -55,12 +60,12 @@ class DataStoreCounter(object):
             # The list is DSV Name, Active Counter & High Watermark
             self._dsv_counters[dsv.id] = [dsvname, 0, 0]
 
-    def increment(self, dsv_id):
+    def increment(self, dsv_id, count=1):
         if not self._is_dsv_valid(dsv_id):
             raise exception.DatastoreVersionNotFound(dsv_id)
 
         counter = self._dsv_counters[dsv_id]
-        counter[1] += 1
+        counter[1] += count
         if counter[1] > counter[2]:
             counter[2] = counter[1]
 
@@ -107,8 +112,8 @@ class DailyCounter(DataStoreCounter):
         self._hwm = 0
         super(DailyCounter, self).__init__()
 
-    def increment(self, dsv_id):
-        super(DailyCounter, self).increment(dsv_id)
+    def increment(self, dsv_id, count=1):
+        super(DailyCounter, self).increment(dsv_id, count=count)
         current_active = self.get_total_active()
         if current_active > self._hwm:
             self._hwm = current_active
@@ -136,8 +141,8 @@ class RangeCounter(DataStoreCounter):
         self.hwm = 0
         super(RangeCounter, self).__init__()
 
-    def increment(self, dsv_id):
-        super(RangeCounter, self).increment(dsv_id)
+    def increment(self, dsv_id, count=1):
+        super(RangeCounter, self).increment(dsv_id, count=count)
         current_active = self.get_total_active()
         if current_active > self.hwm:
             self.hwm = current_active
@@ -151,31 +156,39 @@ class RangeCounter(DataStoreCounter):
 
 def adjust_counters(event, daily_ctr, range_ctr):
     if event.deleted == 0:
-        LOG.debug("Created %s instance at %s" %
-                  (daily_ctr.get_dsvname(event.dsvid),
-                   event.timestamp))
+        LOG.debug("Created instance of datastore version %s at %s",
+                  event.dsvid, event.timestamp)
         daily_ctr.increment(event.dsvid)
         range_ctr.increment(event.dsvid)
     else:
-        LOG.debug("Deleted %s instance at %s" %
-                  (daily_ctr.get_dsvname(event.dsvid),
-                   event.timestamp))
+        LOG.debug("Deleted instance of datastore version %s at %s",
+                  event.dsvid, event.timestamp)
         daily_ctr.decrement(event.dsvid)
         range_ctr.decrement(event.dsvid)
 
 
-def process_data(data, start_date, end_date):
+def process_data(data, start_date, end_date, active_counts=None):
+    """Count the active instances of each day from the creation and
+    deletion events of the period, in timestamp order.
+
+    :param active_counts:   Instances already active at the start of the
+                            period, by datastore version id.
+    """
     daily_counter = list()
     daily_counter.append(DailyCounter(start_date))
     overall_counter = RangeCounter(start_date, end_date)
     current_day = start_date
 
+    for dsv_id, count in (active_counts or {}).items():
+        daily_counter[0].increment(dsv_id, count=count)
+        overall_counter.increment(dsv_id, count=count)
+
     daily_counter_idx = 0
     for event in data:
         event_date = event.timestamp.date()
         current_day = daily_counter[daily_counter_idx].get_date()
-        LOG.debug("Processing event with timestamp %s for current day %s" %
-                  (event.timestamp, current_day))
+        LOG.debug("Processing event with timestamp %s for current day %s",
+                  event.timestamp, current_day)
 
         if event_date > current_day:
             # an event happened after the date we are processing
@@ -205,14 +218,35 @@ def process_data(data, start_date, end_date):
     return daily_counter, overall_counter
 
 
+def _query_active_counts(start_date):
+    """Count the instances active at the start of the period, by
+    datastore version.  Only one row per datastore version is read,
+    however long the history before the period.
+    """
+    query = DBInstance.query().\
+        join(DBDatastoreVersion).\
+        with_entities(DBDatastoreVersion.id, func.count(DBInstance.id)).\
+        filter(DBInstance.created < start_date,
+               or_(DBInstance.deleted == 0,
+                   DBInstance.deleted_at >= start_date)).\
+        group_by(DBDatastoreVersion.id)
+
+    return dict(query.all())
+
+
 def _run_query(start_date, end_date):
-    created_filters = [DBInstance.created < end_date,
-                       DBInstance.deleted == 0]
+    """Return the creation and deletion events of the period in timestamp
+    order.  The events are streamed from the database in batches of
+    QUERY_BATCH_SIZE rows.
+    """
+    created_filters = [DBInstance.created >= start_date,
+                       DBInstance.created < end_date]
     created_columns = [DBInstance.created.label('timestamp'),
                        literal_column("0").label('deleted'),
                        DBDatastoreVersion.id.label('dsvid')]
     deleted_filters = [DBInstance.created < end_date,
                        DBInstance.deleted_at >= start_date,
+                       DBInstance.deleted_at <= end_date,
                        DBInstance.deleted == 1]
     deleted_columns = [DBInstance.deleted_at.label('timestamp'),
                        literal_column("1").label('deleted'),
@@ -220,23 +254,18 @@ def _run_query(start_date, end_date):
 
     query1 = DBInstance.query().\
         join(DBDatastoreVersion).\
-        add_columns(*created_columns)
+        with_entities(*created_columns)
     query1 = query1.filter(*created_filters)
 
     query2 = DBInstance.query().\
         join(DBDatastoreVersion).\
-        add_columns(*created_columns)
+        with_entities(*deleted_columns)
     query2 = query2.filter(*deleted_filters)
 
-    query3 = DBInstance.query().\
-        join(DBDatastoreVersion).\
-        add_columns(*deleted_columns)
-    query3 = query3.filter(*deleted_filters)
-
-    union_query = query1.union(query2, query3).\
+    union_query = query1.union_all(query2).\
         order_by(text('anon_1.timestamp'))
 
-    return union_query.all()
+    return union_query.yield_per(QUERY_BATCH_SIZE)
 
 
 def _get_current_date():
@@ -294,11 +323,12 @@ def usage_report(start_date, end_date, output_file):
 
     db_api.configure_db(CONF)
 
-    LOG.debug("Calling run_query for range %s to %s" %
-              (start_date_dt, end_date_dt))
+    LOG.debug("Calling run_query for range %s to %s",
+              start_date_dt, end_date_dt)
+    active_counts = _query_active_counts(start_date_dt)
     result = _run_query(start_date_dt, end_date_dt)
 
-    LOG.debug("Calling process_data with %s rows" % len(result))
-    (daily, overall) = process_data(result, start_date_d, end_date_d)
+    (daily, overall) = process_data(result, start_date_d, end_date_d,
+                                    active_counts=active_counts)
 
     _generate_csv_file(output_file, daily, overall)
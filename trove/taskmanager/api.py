@@ -267,6 +267,24 @@ class API(object):
         cctxt.cast(self.context, "upgrade_cluster", cluster_id=cluster_id,
                    datastore_version_id=datastore_version_id)
 
+    def update_cluster_configuration(self, cluster_id, configuration_id,
+                                     apply_on_all):
+        LOG.debug("Making async call to update the configuration of cluster "
+                  "%s " % cluster_id)
+        version = self.API_BASE_VERSION
+
+        self._cast("update_cluster_configuration", version=version,
+                   cluster_id=cluster_id, configuration_id=configuration_id,
+                   apply_on_all=apply_on_all)
+
+    def remove_cluster_configuration(self, cluster_id, apply_on_all):
+        LOG.debug("Making async call to remove the configuration of cluster "
+                  "%s " % cluster_id)
+        version = self.API_BASE_VERSION
+
+        self._cast("remove_cluster_configuration", version=version,
+                   cluster_id=cluster_id, apply_on_all=apply_on_all)
+
     def reapply_module(self, module_id, md5, include_clustered,
                        batch_size, batch_delay, force):
         LOG.debug("Making async call to reapply module %s" % module_id)
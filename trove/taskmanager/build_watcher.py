@@ -0,0 +1,153 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+import time
+
+from eventlet import event
+from eventlet import greenthread
+from oslo_log import log as logging
+
+from trove.common import exception
+from trove.common.i18n import _
+from trove.instance.models import InstanceServiceStatus
+
+
+LOG = logging.getLogger(__name__)
+
+
+class PendingBuild(object):
+
+    def __init__(self, instance, timeout):
+        self.instance = instance
+        self.deadline = time.time() + timeout
+        self.event = event.Event()
+
+
+class BuildWatcher(object):
+    """Waits for the instances being built by this taskmanager to become
+    active.
+
+    Rather than every build polling the database and Nova on its own,
+    all the pending builds are checked together by a single green thread.
+    Each sweep does one query for the service status of all the builds
+    and one (paged) server listing per tenant and region for those that
+    are not active yet.
+    """
+
+    def __init__(self, sleep_time):
+        self.sleep_time = sleep_time
+        self._pending = {}
+        self._running = False
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def wait(self, instance, timeout):
+        """Wait until the service on the instance is active.
+
+        The instance must provide check_service_status(status) and
+        check_server_status(server), which return True once the build is
+        complete and raise an exception if it has failed.  That exception
+        is raised here, as is PollTimeOut if the build is not complete
+        within timeout seconds.
+        """
+        build = PendingBuild(instance, timeout)
+        self._pending[instance.id] = build
+        if not self._running:
+            self._running = True
+            greenthread.spawn_n(self._run)
+        return build.event.wait()
+
+    def _run(self):
+        try:
+            while self._pending:
+                greenthread.sleep(self.sleep_time)
+                try:
+                    self.sweep()
+                except Exception:
+                    LOG.exception(_("Error checking the status of %d "
+                                    "pending builds.") % len(self._pending))
+                self._check_timeouts()
+        finally:
+            self._running = False
+
+    def _finish(self, build, error=None):
+        if self._pending.get(build.instance.id) is not build:
+            return
+        del self._pending[build.instance.id]
+        if error is None:
+            build.event.send(True)
+        else:
+            build.event.send_exception(error)
+
+    def _check_timeouts(self):
+        now = time.time()
+        for build in list(self._pending.values()):
+            if now > build.deadline:
+                self._finish(build, exception.PollTimeOut())
+
+    def sweep(self):
+        """Check all the pending builds once."""
+        builds = list(self._pending.values())
+        if not builds:
+            return
+        LOG.debug("Checking the status of %d pending builds." % len(builds))
+        instance_ids = [build.instance.id for build in builds]
+        services = InstanceServiceStatus.find_by_filter(
+            filters=[InstanceServiceStatus.instance_id.in_(instance_ids)])
+        statuses = dict((service.instance_id, service.get_status())
+                        for service in services)
+
+        # Only look for the servers of the builds that aren't done yet.
+        waiting = {}
+        for build in builds:
+            try:
+                if build.instance.id not in statuses:
+                    raise exception.ModelNotFoundError(
+                        _("InstanceServiceStatus Not Found"))
+                if build.instance.check_service_status(
+                        statuses[build.instance.id]):
+                    self._finish(build)
+                else:
+                    key = (build.instance.tenant_id,
+                           build.instance.db_info.region_id)
+                    waiting.setdefault(key, []).append(build)
+            except Exception as ex:
+                self._finish(build, ex)
+
+        for (tenant_id, region), tenant_builds in waiting.items():
+            try:
+                nova_client = tenant_builds[0].instance.nova_client
+                servers = nova_client.servers.list(limit=-1)
+            except Exception:
+                LOG.exception(_("Could not list the servers of tenant "
+                                "%(tenant)s in region %(region)s.") %
+                              {'tenant': tenant_id, 'region': region})
+                continue
+            servers = dict((server.id, server) for server in servers)
+            for build in tenant_builds:
+                server_id = build.instance.db_info.compute_instance_id
+                try:
+                    if server_id not in servers:
+                        raise exception.ComputeInstanceNotFound(
+                            server_id=server_id,
+                            instance_id=build.instance.id)
+                    if build.instance.check_server_status(
+                            servers[server_id]):
+                        self._finish(build)
+                except Exception as ex:
+                    self._finish(build, ex)
@@ -466,6 +466,20 @@ class Manager(periodic_task.PeriodicTasks):
         cluster_tasks = models.load_cluster_tasks(context, cluster_id)
         cluster_tasks.upgrade_cluster(context, cluster_id, datastore_version)
 
+    def update_cluster_configuration(self, context, cluster_id,
+                                     configuration_id, apply_on_all):
+        with EndNotification(context, cluster_id=cluster_id):
+            cluster_tasks = models.load_cluster_tasks(context, cluster_id)
+            cluster_tasks.rolling_configuration_update(
+                context, cluster_id, configuration_id, apply_on_all)
+
+    def remove_cluster_configuration(self, context, cluster_id,
+                                     apply_on_all):
+        with EndNotification(context, cluster_id=cluster_id):
+            cluster_tasks = models.load_cluster_tasks(context, cluster_id)
+            cluster_tasks.rolling_configuration_remove(
+                context, cluster_id, apply_on_all)
+
     def delete_cluster(self, context, cluster_id):
         with EndNotification(context):
             cluster_tasks = models.load_cluster_tasks(context, cluster_id)
@@ -12,16 +12,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import os.path
 import time
 import traceback
 
 from cinderclient import exceptions as cinder_exceptions
+from eventlet import greenpool
 from eventlet import greenthread
 from eventlet.timeout import Timeout
 from heatclient import exc as heat_exceptions
 from novaclient import exceptions as nova_exceptions
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import importutils
 from oslo_utils import timeutils
 from swiftclient.client import ClientException
@@ -48,6 +51,8 @@ from trove.common.i18n import _
 from trove.common import instance as rd_instance
 from trove.common.instance import ServiceStatuses
 from trove.common.notification import (
+    DBaaSInstanceAttachConfiguration,
+    DBaaSInstanceDetachConfiguration,
     DBaaSInstanceRestart,
     DBaaSInstanceUpgrade,
     EndNotification,
@@ -64,9 +69,12 @@ from trove.common.remote import create_heat_client
 from trove.common import server_group as srv_grp
 from trove.common.strategies.cluster import strategy
 from trove.common.strategies.storage import get_storage_strategy
+from trove.common import swift_utils
 from trove.common import template
 from trove.common import utils
 from trove.common.utils import try_recover
+from trove.configuration.models import Configuration
+from trove.datastore import models as datastore_models
 from trove.extensions.common import models as api_ext_models
 from trove.extensions.security_group.models import (
     SecurityGroupInstanceAssociation)
@@ -84,6 +92,7 @@ from trove.module import models as module_models
 from trove.module import views as module_views
 from trove.quota.quota import run_with_quotas
 from trove import rpc
+from trove.taskmanager import build_watcher
 
 LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
@@ -99,6 +108,16 @@ HEAT_RESOURCE_SUCCESSFUL_STATE = 'CREATE_COMPLETE'
 use_nova_server_volume = CONF.use_nova_server_volume
 use_heat = CONF.use_heat
 
+_build_watcher = None
+
+
+def get_build_watcher():
+    """Returns the watcher shared by all the builds in this taskmanager."""
+    global _build_watcher
+    if _build_watcher is None:
+        _build_watcher = build_watcher.BuildWatcher(USAGE_SLEEP_TIME)
+    return _build_watcher
+
 
 class NotifyMixin(object):
     """Notification Mixin
@@ -455,6 +474,205 @@ class ClusterTasks(Cluster):
 
         LOG.debug("End upgrade_cluster for id: %s." % cluster_id)
 
+    def _load_cluster_nodes(self, context, cluster_id):
+        """Load the nodes of a cluster with one query for the instances and
+        one for their service statuses. The compute servers are not needed
+        to change the configuration of a node and are not loaded.
+        """
+        db_infos = DBInstance.find_all(cluster_id=cluster_id,
+                                       deleted=False).all()
+        if not db_infos:
+            return []
+        statuses = dict(
+            (status.instance_id, status)
+            for status in InstanceServiceStatus.find_by_filter(filters=[
+                InstanceServiceStatus.instance_id.in_(
+                    [db_info.id for db_info in db_infos])]))
+        return [Instance(context, db_info, None, statuses.get(db_info.id),
+                         ds_version=self.ds_version, ds=self.ds)
+                for db_info in db_infos]
+
+    def _update_cluster_nodes(self, nodes, update):
+        """Call update on each of the nodes, on at most
+        cluster_configuration_batch_size nodes at a time.
+        All the nodes are processed even if some fail, so that the progress
+        recorded on each of them is complete, and the first error is then
+        raised.
+        """
+        errors = []
+
+        def _update_node(node):
+            try:
+                update(node)
+            except Exception as e:
+                LOG.exception(_("Error updating the configuration of cluster "
+                                "node %s.") % node.id)
+                errors.append(e)
+
+        pool = greenpool.GreenPool(CONF.cluster_configuration_batch_size)
+        for node in nodes:
+            pool.spawn_n(_update_node, node)
+        pool.waitall()
+        if errors:
+            raise errors[0]
+
+    def rolling_configuration_update(self, context, cluster_id,
+                                     configuration_id, apply_on_all=True):
+        """Persist a configuration on all the nodes of a cluster and then
+        apply it.
+
+        Each node records its own progress: save_configuration sets its
+        configuration ID (and the RESTART_REQUIRED task) once the change
+        is persisted on the guest. If the cluster does not have the
+        configuration yet, the persist phase of an earlier attempt has not
+        completed, and the nodes that already have it are not updated
+        again.
+        """
+        LOG.debug("Begin rolling configuration update for cluster: %s"
+                  % cluster_id)
+
+        def _save_configuration(node):
+            node_context = copy.copy(context)
+            node_context.notification = (
+                DBaaSInstanceAttachConfiguration(node_context,
+                                                 **request_info))
+            with StartNotification(node_context, instance_id=node.id,
+                                   configuration_id=configuration_id):
+                with EndNotification(node_context):
+                    node.save_configuration(configuration)
+
+        request_info = context.notification.serialize(context)
+        try:
+            configuration = Configuration.find(
+                context, configuration_id, self.ds_version.id)
+            resuming = self.configuration_id != configuration_id
+            nodes = self._load_cluster_nodes(context, cluster_id)
+
+            LOG.debug("Persisting changes on cluster nodes.")
+            pending = []
+            for node in nodes:
+                node_config_id = node.db_info.configuration_id
+                if node_config_id is None or (node_config_id ==
+                                              configuration_id and
+                                              not resuming):
+                    # Allow re-applying the same configuration (e.g. on
+                    # configuration updates).
+                    pending.append(node)
+                elif node_config_id == configuration_id:
+                    LOG.debug("Node '%s' has already persisted the "
+                              "configuration '%s'." % (node.id,
+                                                       configuration_id))
+                else:
+                    LOG.debug(
+                        "Node '%s' already has the configuration '%s' "
+                        "attached." % (node.id, node_config_id))
+            self._update_cluster_nodes(pending, _save_configuration)
+
+            # Configuration has been persisted to all instances.
+            # The cluster is in a consistent state with all nodes
+            # requiring restart.
+            # We therefore assign the configuration group ID now.
+            # The configuration can be safely detached at this point.
+            self.update_db(configuration_id=configuration_id)
+
+            LOG.debug("Applying runtime configuration changes.")
+            if nodes and nodes[0].apply_configuration(configuration):
+                LOG.debug(
+                    "Runtime changes have been applied successfully to the "
+                    "first node.")
+                remaining_nodes = nodes[1:]
+                if apply_on_all:
+                    LOG.debug(
+                        "Applying the changes to the remaining nodes.")
+                    self._update_cluster_nodes(
+                        remaining_nodes,
+                        lambda node: node.apply_configuration(configuration))
+                else:
+                    LOG.debug(
+                        "Releasing restart-required task on the remaining "
+                        "nodes.")
+                    for node in remaining_nodes:
+                        node.update_db(task_status=InstanceTasks.NONE)
+        except Exception:
+            LOG.exception(_("Error updating the configuration of cluster "
+                            "%s.") % cluster_id)
+            raise
+        finally:
+            self.reset_task()
+
+        LOG.debug("End rolling configuration update for cluster: %s"
+                  % cluster_id)
+
+    def rolling_configuration_remove(self, context, cluster_id,
+                                     apply_on_all=True):
+        """Remove the configuration from all the nodes of a cluster and then
+        reset the runtime values.
+
+        Nodes from which the configuration has already been removed (e.g.
+        by an earlier attempt) are skipped.
+        """
+        LOG.debug("Begin rolling configuration removal for cluster: %s"
+                  % cluster_id)
+
+        def _delete_configuration(node):
+            node_context = copy.copy(context)
+            node_context.notification = (
+                DBaaSInstanceDetachConfiguration(node_context,
+                                                 **request_info))
+            with StartNotification(node_context, instance_id=node.id):
+                with EndNotification(node_context):
+                    node.delete_configuration()
+
+        request_info = context.notification.serialize(context)
+        try:
+            nodes = self._load_cluster_nodes(context, cluster_id)
+
+            LOG.debug("Removing changes from cluster nodes.")
+            pending = []
+            for node in nodes:
+                if node.db_info.configuration_id:
+                    pending.append(node)
+                else:
+                    LOG.debug(
+                        "Node '%s' has no configuration attached."
+                        % node.id)
+            self._update_cluster_nodes(pending, _delete_configuration)
+
+            # The cluster is in a consistent state with all nodes
+            # requiring restart.
+            # New configuration can be safely attached at this point.
+            configuration_id = self.configuration_id
+            self.update_db(configuration_id=None)
+
+            LOG.debug("Applying runtime configuration changes.")
+            if nodes and nodes[0].reset_configuration(configuration_id):
+                LOG.debug(
+                    "Runtime changes have been applied successfully to the "
+                    "first node.")
+                remaining_nodes = nodes[1:]
+                if apply_on_all:
+                    LOG.debug(
+                        "Applying the changes to the remaining nodes.")
+                    self._update_cluster_nodes(
+                        remaining_nodes,
+                        lambda node: node.reset_configuration(
+                            configuration_id))
+                else:
+                    LOG.debug(
+                        "Releasing restart-required task on the remaining "
+                        "nodes.")
+                    for node in remaining_nodes:
+                        node.update_db(task_status=InstanceTasks.NONE)
+        except Exception:
+            LOG.exception(_("Error removing the configuration of cluster "
+                            "%s.") % cluster_id)
+            raise
+        finally:
+            self.reset_task()
+
+        LOG.debug("End rolling configuration removal for cluster: %s"
+                  % cluster_id)
+
 
 class FreshInstanceTasks(FreshInstance, NotifyMixin, ConfigurationMixin):
 
@@ -483,9 +701,7 @@ class FreshInstanceTasks(FreshInstance, NotifyMixin, ConfigurationMixin):
         error_message = ''
         error_details = ''
         try:
-            utils.poll_until(self._service_is_active,
-                             sleep_time=USAGE_SLEEP_TIME,
-                             time_out=timeout)
+            get_build_watcher().wait(self, timeout)
             LOG.info(_("Created instance %s successfully.") % self.id)
             TroveInstanceCreate(instance=self,
                                 instance_size=flavor['ram']).notify()
@@ -759,7 +975,18 @@ class FreshInstanceTasks(FreshInstance, NotifyMixin, ConfigurationMixin):
         Raises: TroveError if the service is in a failure state.
         """
         service = InstanceServiceStatus.find_by(instance_id=self.id)
-        status = service.get_status()
+        if self.check_service_status(service.get_status()):
+            return True
+
+        c_id = self.db_info.compute_instance_id
+        server = self.nova_client.servers.get(c_id)
+        return self.check_server_status(server)
+
+    def check_service_status(self, status):
+        """
+        Returns: True if the service status shows the guest is active.
+        Raises: TroveError if the service is in a failure state.
+        """
         if (status == rd_instance.ServiceStatuses.RUNNING or
            status == rd_instance.ServiceStatuses.INSTANCE_READY):
                 return True
@@ -768,9 +995,13 @@ class FreshInstanceTasks(FreshInstance, NotifyMixin, ConfigurationMixin):
                             rd_instance.ServiceStatuses.UNKNOWN,
                             rd_instance.ServiceStatuses.DELETED]:
             raise TroveError(_("Service not active, status: %s") % status)
+        return False
 
-        c_id = self.db_info.compute_instance_id
-        server = self.nova_client.servers.get(c_id)
+    def check_server_status(self, server):
+        """
+        Returns: False, as a server status never shows the guest is active.
+        Raises: TroveError if the server is in a failure state.
+        """
         server_status = server.status
         if server_status in [InstanceStatus.ERROR,
                              InstanceStatus.FAILED]:
@@ -1676,11 +1907,22 @@ class BackupTasks(object):
         client = remote.create_swift_client(context)
         obj = client.head_object(container, filename)
         if 'x-static-large-object' in obj:
-            # Static large object
+            # Static large object - delete the segments in bulk, then the
+            # manifest (so that a failed delete can simply be retried).
             LOG.debug("Deleting large object file: %(cont)s/%(filename)s" %
                       {'cont': container, 'filename': filename})
-            client.delete_object(container, filename,
-                                 query_string='multipart-manifest=delete')
+            manifest = client.get_object(
+                container, filename,
+                query_string='multipart-manifest=get')[1]
+            segments = {}
+            for segment in jsonutils.loads(manifest):
+                seg_container, seg_name = (
+                    segment['name'].lstrip('/').split('/', 1))
+                segments.setdefault(seg_container, []).append(seg_name)
+            for seg_container, seg_names in segments.items():
+                swift_utils.delete_objects(context, seg_container, seg_names,
+                                           client=client)
+            client.delete_object(container, filename)
         else:
             # Single object
             LOG.debug("Deleting object file: %(cont)s/%(filename)s" %
@@ -1728,6 +1970,7 @@ class ModuleTasks(object):
         if not context.is_admin:
             batch_size = min(batch_size, CONF.module_reapply_max_batch_size)
             batch_delay = max(batch_delay, CONF.module_reapply_min_batch_delay)
+        batch_size = max(batch_size, 1)
         modules = module_models.Modules.load_by_ids(context, [module_id])
         current_md5 = modules[0].md5
         LOG.debug("MD5: %s  Force: %s." % (md5, force))
@@ -1736,50 +1979,122 @@ class ModuleTasks(object):
         instance_modules = module_models.InstanceModules.load_all(
             context, module_id=module_id, md5=md5)
         total_count = instance_modules.count()
+        instance_ids = []
+        # The instances that already have the current contents (forced
+        # reapply) are sent the module without its contents.
+        current_ids = set()
+        for instance_module in instance_modules:
+            if (instance_module.md5 != current_md5 or force) and (
+                    not md5 or md5 == instance_module.md5):
+                instance_ids.append(instance_module.instance_id)
+                if instance_module.md5 == current_md5:
+                    current_ids.add(instance_module.instance_id)
+            else:
+                LOG.debug("Instance '%s' does not match "
+                          "criteria, skipping reapply." %
+                          instance_module.instance_id)
+        instances = cls._load_instances(context, instance_ids,
+                                        include_clustered)
+        skipped_count = total_count - len(instances)
+
         reapply_count = 0
-        skipped_count = 0
-        if instance_modules:
+        if instances:
             module_list = module_views.get_module_list(modules)
-            for instance_module in instance_modules:
-                instance_id = instance_module.instance_id
-                if (instance_module.md5 != current_md5 or force) and (
-                        not md5 or md5 == instance_module.md5):
-                    instance = BuiltInstanceTasks.load(context, instance_id,
-                                                       needs_server=False)
-                    if instance and (
-                            include_clustered or not instance.cluster_id):
-                        reapply_count += 1
-                        try:
-                            module_models.Modules.validate(
-                                modules, instance.datastore.id,
-                                instance.datastore_version.id)
-                            client = create_guest_client(context, instance_id)
-                            client.module_apply(module_list)
-                            Instance.add_instance_modules(
-                                context, instance_id, modules)
-                        except exception.ModuleInvalid as ex:
-                            LOG.info(_("Skipping: %s") % ex)
-
-                        # Sleep if we've fired off too many in a row.
-                        if (batch_size and
-                                not reapply_count % batch_size and
-                                (reapply_count + skipped_count) < total_count):
-                            LOG.debug("Applied module to %d of %d instances - "
-                                      "sleeping for %ds" % (reapply_count,
-                                                            total_count,
-                                                            batch_delay))
-                            time.sleep(batch_delay)
-                    else:
-                        LOG.debug("Instance '%s' not found or doesn't match "
-                                  "criteria, skipping reapply." % instance_id)
-                        skipped_count += 1
-                else:
-                    LOG.debug("Instance '%s' does not match "
-                              "criteria, skipping reapply." % instance_id)
-                    skipped_count += 1
+            datastore_ids = {}
+            for db_info in instances:
+                version_id = db_info.datastore_version_id
+                if version_id not in datastore_ids:
+                    datastore_ids[version_id] = (
+                        datastore_models.DatastoreVersion.load_by_uuid(
+                            version_id).datastore_id)
+            pool = greenpool.GreenPool(batch_size)
+            for index in range(0, len(instances), batch_size):
+                batch = instances[index:index + batch_size]
+                for db_info in batch:
+                    pool.spawn_n(
+                        cls._reapply_to_instance, context, db_info,
+                        datastore_ids[db_info.datastore_version_id],
+                        modules, module_list, db_info.id in current_ids)
+                pool.waitall()
+                reapply_count += len(batch)
+
+                # Sleep if there are more batches to go.
+                if reapply_count < len(instances):
+                    LOG.debug("Applied module to %d of %d instances - "
+                              "sleeping for %ds" % (reapply_count,
+                                                    total_count,
+                                                    batch_delay))
+                    time.sleep(batch_delay)
         LOG.info(_("Reapplied module to %(num)d instances (skipped %(skip)d).")
                  % {'num': reapply_count, 'skip': skipped_count})
 
+    @classmethod
+    def _load_instances(cls, context, instance_ids, include_clustered):
+        """Load the rows of all the instances to reapply to at once,
+        rather than loading each instance (and its server) in turn.
+        """
+        if not instance_ids:
+            return []
+        query_opts = {'deleted': False}
+        if not context.is_admin:
+            query_opts['tenant_id'] = context.tenant
+        if not include_clustered:
+            query_opts['cluster_id'] = None
+        db_infos = DBInstance.find_by_filter(
+            filters=[DBInstance.id.in_(instance_ids)], **query_opts)
+        db_infos = dict((db_info.id, db_info) for db_info in db_infos)
+        instances = []
+        for instance_id in instance_ids:
+            if instance_id in db_infos:
+                instances.append(db_infos[instance_id])
+            else:
+                LOG.debug("Instance '%s' not found or doesn't match "
+                          "criteria, skipping reapply." % instance_id)
+        return instances
+
+    @classmethod
+    def _reapply_to_instance(cls, context, db_info, datastore_id, modules,
+                             module_list, has_contents):
+        try:
+            module_models.Modules.validate(
+                modules, datastore_id, db_info.datastore_version_id)
+            cls._apply_modules(context, db_info.id, module_list,
+                               has_contents=has_contents)
+            Instance.add_instance_modules(context, db_info.id, modules)
+        except exception.ModuleInvalid as ex:
+            LOG.info(_("Skipping: %s") % ex)
+        except Exception:
+            LOG.exception(_("Could not reapply module to instance %s.") %
+                          db_info.id)
+
+    @classmethod
+    def _apply_modules(cls, context, instance_id, module_list,
+                       has_contents=False):
+        """Apply the modules to the instance.  If the instance already has
+        the current contents of the modules, they are only sent if the
+        guest doesn't have them after all.
+        """
+        client = create_guest_client(context, instance_id)
+        if not has_contents:
+            return client.module_apply(module_list)
+        module_refs = []
+        for module_info in module_list:
+            module = dict(module_info['module'])
+            module.pop('contents', None)
+            module_refs.append({'module': module})
+        try:
+            results = client.module_apply(module_refs)
+        except GuestError:
+            # Guests that predate this always need the contents.
+            LOG.debug("Guest on instance %s did not accept modules without "
+                      "contents, resending them." % instance_id)
+            results = None
+        if results is None or any(
+                result.get('status') == rd_instance.MODULE_CONTENTS_REQUIRED
+                for result in results):
+            results = client.module_apply(module_list)
+        return results
+
 
 class ResizeVolumeAction(object):
     """Performs volume resize action."""
@@ -1893,13 +2208,14 @@ class ResizeVolumeAction(object):
                               'id': self.instance.id})
 
     @try_recover
-    def _resize_fs(self):
+    def _resize_fs(self, online=False):
         LOG.debug("Resizing the filesystem for instance %(id)s" % {
                   'id': self.instance.id})
         mount_point = self.get_mount_point()
         device_path = self.get_device_path()
         self.instance.guest.resize_fs(device_path=device_path,
-                                      mount_point=mount_point)
+                                      mount_point=mount_point,
+                                      online=online)
         LOG.debug("Successfully resized volume %(vol_id)s filesystem for "
                   "instance %(id)s" % {'vol_id': self.instance.volume_id,
                                        'id': self.instance.id})
@@ -1967,7 +2283,80 @@ class ResizeVolumeAction(object):
             self._recover_full(self._verify_extend)
             raise
 
+    def _extend_online(self):
+        """Extend the volume while it is still attached.
+
+        Returns False if Cinder refuses to extend an in-use volume, in
+        which case nothing has been changed.
+        """
+        LOG.debug("Extending in-use volume %(vol_id)s for instance %(id)s "
+                  "to size %(size)s" % {'vol_id': self.instance.volume_id,
+                                        'id': self.instance.id,
+                                        'size': self.new_size})
+        try:
+            self.instance.volume_client.volumes.extend(
+                self.instance.volume_id, self.new_size)
+        except cinder_exceptions.ClientException as ex:
+            LOG.info(_("Volume %(vol_id)s could not be extended while in "
+                       "use (%(error)s), resizing it offline.") %
+                     {'vol_id': self.instance.volume_id, 'error': ex})
+            return False
+
+        def volume_is_extended():
+            volume = self.instance.volume_client.volumes.get(
+                self.instance.volume_id)
+            if volume.status == 'error_extending':
+                raise TroveError(_("Extending volume %s failed.") %
+                                 self.instance.volume_id)
+            return (volume.status == 'in-use' and
+                    volume.size == self.new_size)
+        try:
+            utils.poll_until(volume_is_extended,
+                             sleep_time=2,
+                             time_out=CONF.volume_time_out)
+        except Exception:
+            LOG.exception(_("Error encountered trying to verify extend for "
+                          "the volume %(vol_id)s for instance %(id)s") % {
+                          'vol_id': self.instance.volume_id,
+                          'id': self.instance.id})
+            self._fail(self._extend_online)
+            raise
+        self.instance.update_db(volume_size=self.new_size)
+        return True
+
+    def _resize_fs_offline(self):
+        """Resize the filesystem of an already extended volume with the
+        database stopped and the volume unmounted.
+        """
+        self._stop_db()
+        self._unmount_volume(recover_func=self._recover_restart)
+        self._resize_fs(recover_func=self._recover_mount_restart)
+        self._mount_volume(recover_func=self._fail)
+        self.instance.restart()
+
+    def _resize_online_volume(self):
+        """Grow the volume and its filesystem without stopping the
+        database.  Returns False if the volume has to be resized offline.
+        """
+        LOG.debug("Begin _resize_online_volume for id: %(id)s" % {
+                  'id': self.instance.id})
+        if not self._extend_online():
+            return False
+        try:
+            self._resize_fs(online=True)
+        except Exception:
+            # e.g. an older guest, or a filesystem that can't grow online
+            LOG.exception(_("Could not grow the filesystem of instance "
+                            "%s online, resizing it offline.") %
+                          self.instance.id)
+            self._resize_fs_offline()
+        LOG.debug("End _resize_online_volume for id: %(id)s" % {
+                  'id': self.instance.id})
+        return True
+
     def _resize_active_volume(self):
+        if CONF.volume_online_resize and self._resize_online_volume():
+            return
         LOG.debug("Begin _resize_active_volume for id: %(id)s" % {
                   'id': self.instance.id})
         self._stop_db()
@@ -15,9 +15,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 #
+import threading
 import uuid
 
 from mock import patch, MagicMock
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
 import swiftclient.client
 from testtools import ExpectedException, matchers
 
@@ -616,6 +619,146 @@ class TestCreateGlanceClient(trove_testtools.TestCase):
         self.assertIsNotNone(client)
 
 
+class StubServer(socketserver.ThreadingMixIn,
+                 BaseHTTPServer.HTTPServer):
+    """Counts the connections opened to it."""
+
+    daemon_threads = True
+    connections = 0
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers every request on keep-alive connections."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def _reply(self, body, **headers):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        # Authenticate the token of the session.
+        self.rfile.read(int(self.headers['Content-Length']))
+        self._reply(b'{"token": {"methods": ["token"], '
+                    b'"expires_at": "2099-01-01T00:00:00Z"}}',
+                    **{'X-Subject-Token': 'token'})
+
+    def do_GET(self):
+        self._reply(b'{"images": []}')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClientCache(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(TestClientCache, self).setUp()
+        self.create = MagicMock(side_effect=lambda context, region: object())
+
+    def _context(self, token='token', tenant='tenant'):
+        return TroveContext(auth_token=token, tenant=tenant)
+
+    def test_shared_by_token(self):
+        client = remote.cached_client(self.create, self._context())
+        self.assertIs(client, remote.cached_client(self.create,
+                                                   self._context()))
+        self.assertEqual(1, self.create.call_count)
+
+        self.assertIsNot(client, remote.cached_client(
+            self.create, self._context(token='token2')))
+        self.assertIsNot(client, remote.cached_client(
+            self.create, self._context(tenant='tenant2')))
+        self.assertIsNot(client, remote.cached_client(
+            self.create, self._context(), region_name='RegionTwo'))
+        self.assertEqual(4, self.create.call_count)
+
+    def test_not_cached(self):
+        remote.cached_client(self.create, TroveContext())
+        remote.cached_client(self.create, TroveContext())
+        self.patch_conf_property('remote_client_cache_ttl', 0)
+        remote.cached_client(self.create, self._context())
+        remote.cached_client(self.create, self._context())
+        self.assertEqual(4, self.create.call_count)
+        self.assertEqual(0, len(remote._clients))
+
+    @patch.object(remote, 'time')
+    def test_expired(self, mock_time):
+        mock_time.time.return_value = 1000
+        client = remote.cached_client(self.create, self._context())
+        mock_time.time.return_value += cfg.CONF.remote_client_cache_ttl - 1
+        self.assertIs(client, remote.cached_client(self.create,
+                                                   self._context()))
+        mock_time.time.return_value += 1
+        self.assertIsNot(client, remote.cached_client(self.create,
+                                                      self._context()))
+        self.assertEqual(2, self.create.call_count)
+
+        # Expired clients of other tokens are evicted too.
+        mock_time.time.return_value += cfg.CONF.remote_client_cache_ttl
+        remote.cached_client(self.create, self._context(token='token2'))
+        self.assertEqual(1, len(remote._clients))
+
+    def test_least_recently_used_evicted(self):
+        self.patch_conf_property('remote_client_cache_size', 2)
+        client1 = remote.cached_client(self.create, self._context('token1'))
+        remote.cached_client(self.create, self._context('token2'))
+        remote.cached_client(self.create, self._context('token1'))
+        remote.cached_client(self.create, self._context('token3'))
+        self.assertEqual(2, len(remote._clients))
+        self.assertIs(client1, remote.cached_client(self.create,
+                                                    self._context('token1')))
+        remote.cached_client(self.create, self._context('token2'))
+        self.assertEqual(4, self.create.call_count)
+
+    def test_admin_nova_client_not_shared(self):
+        self.patch_conf_property('nova_compute_url', 'http://example.com/')
+        context = TroveContext(user='user', auth_token='token',
+                               tenant='tenant')
+        client = remote.nova_client(context)
+        self.assertIs(client, remote.nova_client(context))
+        admin_client = remote.create_admin_nova_client(context)
+        self.assertIsNot(client, admin_client)
+        self.assertIsNone(admin_client.client.auth_token)
+        self.assertEqual('token', client.client.auth_token)
+
+    def test_connections_reused(self):
+        server = StubServer(('127.0.0.1', 0), StubHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = 'http://127.0.0.1:%d/' % server.server_port
+        self.patch_conf_property('trove_auth_url', url + 'v3')
+        self.patch_conf_property('glance_url', url)
+
+        for _ in range(20):
+            list(glance_remote.glance_client(self._context()).images.list())
+        self.assertEqual(1, server.connections)
+
+        self.patch_conf_property('remote_client_cache_ttl', 0)
+        for _ in range(20):
+            list(glance_remote.glance_client(self._context()).images.list())
+        self.assertEqual(21, server.connections)
+
+    def test_swift_client_not_shared(self):
+        # The pools of swift connections need distinct connections.
+        self.patch_conf_property('swift_url', 'http://example.com/v1/AUTH_')
+        client = remote.create_swift_client(self._context())
+        self.assertIsNot(client, remote.create_swift_client(self._context()))
+        self.assertEqual(0, len(remote._clients))
+
+
 class TestEndpoints(trove_testtools.TestCase):
     """
     Copied from glance/tests/unit/test_auth.py.
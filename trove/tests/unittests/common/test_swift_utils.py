@@ -0,0 +1,116 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+from mock import MagicMock
+from mock import patch
+from oslo_serialization import jsonutils
+import requests
+from swiftclient.client import ClientException
+
+from trove.common import remote
+from trove.common import swift_utils
+from trove.tests.unittests import trove_testtools
+
+
+class TestSwiftUtils(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(TestSwiftUtils, self).setUp()
+        self.client = MagicMock(url='http://swift/v1/AUTH_test')
+        self.client.get_capabilities.return_value = {}
+        self.create_client_patch = patch.object(
+            remote, 'create_swift_client', return_value=self.client)
+        self.create_client_patch.start()
+        self.addCleanup(self.create_client_patch.stop)
+        self.addCleanup(swift_utils._bulk_delete_limits.clear)
+
+    def test_iter_container_pages(self):
+        self.patch_conf_property('swift_listing_page_size', 2)
+        self.client.get_container.side_effect = [
+            (None, [{'name': 'a'}, {'name': 'b'}]),
+            (None, [{'name': 'c'}]),
+            (None, [])]
+        self.assertEqual(['a', 'b', 'c'], swift_utils.list_object_names(
+            self.client, 'cont', prefix='pre'))
+        markers = [call[1]['marker']
+                   for call in self.client.get_container.call_args_list]
+        self.assertEqual([None, 'b', 'c'], markers)
+
+    def test_delete_objects_without_bulk(self):
+        progress = MagicMock()
+        swift_utils.delete_objects(None, 'cont', ['a', 'b', 'c'],
+                                   client=self.client,
+                                   progress_callback=progress)
+        self.assertEqual(3, self.client.delete_object.call_count)
+        self.assertFalse(self.client.post_account.called)
+        progress.assert_called_with(3, 3)
+
+    def test_delete_objects_ignores_missing(self):
+        self.client.delete_object.side_effect = [
+            None, ClientException('gone', http_status=404), None]
+        swift_utils.delete_objects(None, 'cont', ['a', 'b', 'c'],
+                                   client=self.client)
+        self.assertEqual(3, self.client.delete_object.call_count)
+
+    @patch.object(swift_utils, 'LOG')
+    def test_delete_objects_raises_after_all_attempted(self, mock_logging):
+        self.client.delete_object.side_effect = [
+            None, ClientException('boom', http_status=500), None]
+        self.assertRaises(ClientException, swift_utils.delete_objects,
+                          None, 'cont', ['a', 'b', 'c'], client=self.client)
+        self.assertEqual(3, self.client.delete_object.call_count)
+
+    @patch.object(swift_utils, 'LOG')
+    def test_delete_objects_raises_other_errors(self, mock_logging):
+        # Errors other than the Swift ones are raised too, so that the
+        # caller doesn't go on to delete the manifest of the objects.
+        self.client.delete_object.side_effect = [
+            None, requests.exceptions.ConnectionError('reset'), None]
+        self.assertRaises(requests.exceptions.ConnectionError,
+                          swift_utils.delete_objects,
+                          None, 'cont', ['a', 'b', 'c'], client=self.client)
+        self.assertEqual(3, self.client.delete_object.call_count)
+
+    def test_delete_objects_bulk(self):
+        self.patch_conf_property('swift_bulk_delete_batch_size', 2)
+        self.client.get_capabilities.return_value = {
+            'bulk_delete': {'max_deletes_per_request': 10000}}
+        self.client.post_account.return_value = (
+            {}, jsonutils.dumps({'Response Status': '200 OK',
+                                 'Errors': []}))
+        swift_utils.delete_objects(None, 'cont', ['a', 'b', 'c'],
+                                   client=self.client)
+        self.assertEqual(2, self.client.post_account.call_count)
+        self.assertFalse(self.client.delete_object.called)
+        data = sorted(call[1]['data']
+                      for call in self.client.post_account.call_args_list)
+        self.assertEqual([b'/cont/a\n/cont/b\n', b'/cont/c\n'], data)
+
+    @patch.object(swift_utils, 'LOG')
+    def test_delete_objects_bulk_errors(self, mock_logging):
+        self.client.get_capabilities.return_value = {
+            'bulk_delete': {'max_deletes_per_request': 10000}}
+        self.client.post_account.return_value = (
+            {}, jsonutils.dumps({'Response Status': '400 Bad Request',
+                                 'Errors': [['/cont/a', '409 Conflict']]}))
+        self.assertRaises(ClientException, swift_utils.delete_objects,
+                          None, 'cont', ['a'], client=self.client)
+
+    def test_delete_objects_bulk_disabled(self):
+        self.patch_conf_property('swift_use_bulk_delete', False)
+        swift_utils.delete_objects(None, 'cont', ['a'], client=self.client)
+        self.assertFalse(self.client.get_capabilities.called)
+        self.assertEqual(1, self.client.delete_object.call_count)
@@ -9,9 +9,14 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
 import re
+import shutil
+import tempfile
 
+import jinja2
 from mock import Mock
+from mock import patch
 
 from trove.common import exception
 from trove.common import template
@@ -104,6 +109,121 @@ class TemplateTest(trove_testtools.TestCase):
                                                 self.server_id)
         self.assertTrue(self._find_in_template(config.render(), "relay_log"))
 
+    def _mysql_datastore(self):
+        datastore = Mock(spec=DatastoreVersion)
+        datastore.datastore_name = 'MySql'
+        datastore.name = 'mysql-5.6'
+        datastore.manager = 'mysql'
+        return datastore
+
+    def _clear_caches(self):
+        template._templates.clear()
+        template._rendered.clear()
+
+    def test_render_cached_for_cluster(self):
+        """Render 1000 configs for a 100 node cluster and make sure the
+        template is only rendered to fill the cache.
+        """
+        self._clear_caches()
+        self.addCleanup(self._clear_caches)
+        datastore = self._mysql_datastore()
+        instance_ids = ['instance-%03d' % index for index in range(100)]
+        expected = {}
+        for instance_id in instance_ids:
+            config = template.SingleInstanceConfigTemplate(
+                datastore, self.flavor_dict, instance_id)
+            expected[instance_id] = config.get_template().render(
+                flavor=self.flavor_dict, datastore=config.datastore_dict,
+                server_id=config._calculate_unique_id())
+
+        config_class = template.SingleInstanceConfigTemplate
+        with patch.object(template.ENV, 'select_template',
+                          wraps=template.ENV.select_template) as mock_select:
+            with patch.object(config_class, '_render_template',
+                              autospec=True,
+                              side_effect=config_class._render_template
+                              ) as mock_render:
+                self._clear_caches()
+                for _ in range(10):
+                    for instance_id in instance_ids:
+                        config = template.SingleInstanceConfigTemplate(
+                            datastore, self.flavor_dict, instance_id)
+                        self.assertEqual(expected[instance_id],
+                                         config.render())
+                self.assertEqual(2, mock_render.call_count)
+                self.assertEqual(1, mock_select.call_count)
+
+    def test_render_dict_cached(self):
+        self._clear_caches()
+        self.addCleanup(self._clear_caches)
+        datastore = self._mysql_datastore()
+        first = template.SingleInstanceConfigTemplate(
+            datastore, self.flavor_dict, 'instance-1')
+        second = template.SingleInstanceConfigTemplate(
+            datastore, self.flavor_dict, 'instance-2')
+        first_dict = dict(first.render_dict())
+        second_dict = dict(second.render_dict())
+        self.assertEqual(first._calculate_unique_id(),
+                         first_dict['server_id'])
+        self.assertEqual(second._calculate_unique_id(),
+                         second_dict['server_id'])
+        del first_dict['server_id']
+        del second_dict['server_id']
+        self.assertEqual(first_dict, second_dict)
+
+    def test_render_not_cached_if_server_id_transformed(self):
+        self._clear_caches()
+        self.addCleanup(self._clear_caches)
+        config = template.SingleInstanceConfigTemplate(
+            self._mysql_datastore(), self.flavor_dict, 'instance-1')
+        with patch.object(template.SingleInstanceConfigTemplate,
+                          'get_template') as mock_get_template:
+            mock_get_template.return_value = self.env.from_string(
+                'server_id = {{ server_id + 1 }}')
+            self.assertEqual(
+                'server_id = %d' % (config._calculate_unique_id() + 1),
+                config.render())
+            self.assertIsNone(list(template._rendered.values())[0][1])
+
+    def _use_template_dir(self, contents):
+        """Load the templates from a temporary directory holding a mysql
+        config template with the given contents.
+        """
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+        os.mkdir(os.path.join(template_dir, 'mysql'))
+        template_file = os.path.join(template_dir, 'mysql', 'config.template')
+        with open(template_file, 'w') as config_template:
+            config_template.write(contents)
+        env_patch = patch.object(template, 'ENV', jinja2.Environment(
+            loader=jinja2.FileSystemLoader(template_dir)))
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        return template_file
+
+    def test_render_cached_per_flavor(self):
+        self._clear_caches()
+        self.addCleanup(self._clear_caches)
+        self._use_template_dir("disk = {{ flavor['disk'] }}")
+        for disk in (10, 20):
+            flavor = dict(self.flavor_dict, disk=disk)
+            config = template.SingleInstanceConfigTemplate(
+                self._mysql_datastore(), flavor, 'instance-1')
+            self.assertEqual('disk = %d' % disk, config.render())
+
+    def test_render_cache_reloads_edited_template(self):
+        self._clear_caches()
+        self.addCleanup(self._clear_caches)
+        template_file = self._use_template_dir("version = 1")
+        config = template.SingleInstanceConfigTemplate(
+            self._mysql_datastore(), self.flavor_dict, 'instance-1')
+        self.assertEqual('version = 1', config.render())
+        with open(template_file, 'w') as config_template:
+            config_template.write("version = 2")
+        mtime = os.path.getmtime(template_file) + 10
+        os.utime(template_file, (mtime, mtime))
+        self.assertEqual('version = 2', config.render())
+
 
 class HeatTemplateLoadTest(trove_testtools.TestCase):
 
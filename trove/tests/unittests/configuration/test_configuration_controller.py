@@ -139,7 +139,7 @@ class TestConfigurationController(trove_testtools.TestCase):
             config_val1.max = 1
             config_val1.min = 0
             config_val1.data_type = 'integer'
-            config_rules = [config_val1]
+            config_rules = {'max_connections': config_val1}
 
         data_version = MagicMock()
         data_version.id = 42
@@ -153,7 +153,7 @@ class TestConfigurationController(trove_testtools.TestCase):
                           config_rules)
 
     def test_validate_configuration_with_no_rules(self):
-        self._test_validate_configuration({'max_connections': 5}, [])
+        self._test_validate_configuration({'max_connections': 5}, {})
 
     def test_validate_configuration_with_invalid_param(self):
         self._test_validate_configuration({'test': 5})
@@ -173,7 +173,7 @@ class TestConfigurationController(trove_testtools.TestCase):
         config_val1.max_size = 18446744073709551615
         config_val1.min_size = 4096
         config_val1.data_type = 'integer'
-        config_rules = [config_val1]
+        config_rules = {'myisam_sort_buffer_size': config_val1}
 
         ConfigurationsController._validate_configuration(
             {'myisam_sort_buffer_size': 18446744073709551615},
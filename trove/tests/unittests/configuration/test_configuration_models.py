@@ -0,0 +1,72 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+from mock import MagicMock
+from mock import patch
+
+from trove.configuration import models
+from trove.tests.unittests import trove_testtools
+
+
+class TestDatastoreConfigurationRules(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(TestDatastoreConfigurationRules, self).setUp()
+        self.rule = MagicMock()
+        self.rule.name = 'Max_Connections'
+        self.params = models.DatastoreConfigurationParameters
+        self.load_patch = patch.object(
+            self.params, 'load_parameters', return_value=[self.rule])
+        self.load_mock = self.load_patch.start()
+        self.addCleanup(self.load_patch.stop)
+        self.addCleanup(self.params._rules_cache.clear)
+
+    def test_load_rules_indexed_by_name(self):
+        rules = self.params.load_rules('dsv-1')
+        self.assertEqual({'max_connections': self.rule}, rules)
+        self.assertEqual(self.rule, models.Configuration.
+                         find_parameter_details('Max_Connections', rules))
+        self.assertIsNone(models.Configuration.
+                          find_parameter_details('MAX_CONNECTIONS', rules))
+        self.assertIsNone(models.Configuration.
+                          find_parameter_details('unknown', rules))
+
+    def test_load_rules_cached(self):
+        self.params.load_rules('dsv-1')
+        self.params.load_rules('dsv-1')
+        self.params.load_rules('dsv-1', show_deleted=True)
+        self.assertEqual(2, self.load_mock.call_count)
+
+    def test_load_rules_cache_disabled(self):
+        self.patch_conf_property('configuration_parameters_cache_ttl', 0)
+        self.params.load_rules('dsv-1')
+        self.params.load_rules('dsv-1')
+        self.assertEqual(2, self.load_mock.call_count)
+
+    def test_invalidate_rules(self):
+        self.params.load_rules('dsv-1')
+        self.params.load_rules('dsv-2')
+        self.params.invalidate_rules('dsv-1')
+        self.params.load_rules('dsv-1')
+        self.params.load_rules('dsv-2')
+        self.assertEqual(3, self.load_mock.call_count)
+
+    @patch.object(models.DatastoreConfigurationParameters,
+                  'load_parameter_by_name')
+    def test_delete_invalidates_rules(self, mock_load_by_name):
+        self.params.load_rules('dsv-1')
+        self.params.delete('dsv-1', 'max_connections')
+        self.params.load_rules('dsv-1')
+        self.assertEqual(2, self.load_mock.call_count)
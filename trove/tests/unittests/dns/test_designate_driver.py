@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 import base64
+import collections
 import hashlib
 
 from designateclient.v1.domains import Domain
@@ -20,10 +21,16 @@ from mock import MagicMock
 from mock import patch
 import six
 
+from trove.common import exception
 from trove.dns.designate import driver
 from trove.tests.unittests import trove_testtools
 
 
+FakeRecord = collections.namedtuple('FakeRecord',
+                                    ['id', 'name', 'type', 'data', 'ttl',
+                                     'priority'])
+
+
 class DesignateObjectConverterTest(trove_testtools.TestCase):
 
     def setUp(self):
@@ -87,6 +94,8 @@ class DesignateDriverTest(trove_testtools.TestCase):
             driver, 'create_designate_client', MagicMock(return_value=None))
         self.create_des_client_mock = self.create_des_client_patch.start()
         self.addCleanup(self.create_des_client_patch.stop)
+        self.addCleanup(driver._record_indexes.clear)
+        self.addCleanup(driver._domains.clear)
 
     def tearDown(self):
         super(DesignateDriverTest, self).tearDown()
@@ -168,6 +177,93 @@ class DesignateDriverTest(trove_testtools.TestCase):
         zones = dns_driver.get_dns_zones('www.notfound.com')
         self.assertEqual(0, len(zones))
 
+    def test_get_dns_zones_cached(self):
+        client = MagicMock()
+        self.create_des_client_mock.return_value = client
+        client.domains.list = MagicMock(return_value=self.domains)
+        driver.DesignateDriver().get_dns_zones()
+        zones = driver.DesignateDriver().get_dns_zones('www.trove.com')
+        self.assertDomainsAreEqual(self.domains[1], zones[0])
+        self.assertEqual(1, client.domains.list.call_count)
+
+    def _record_id(self, index):
+        return '%08x-0000-0000-0000-000000000000' % index
+
+    def _record(self, index, name, data):
+        # Validating thousands of client Records is too slow for a unit test.
+        return FakeRecord(id=self._record_id(index), name=name, type='A',
+                          data=data, ttl=300, priority=None)
+
+    def _zone_client(self, size=20):
+        client = MagicMock()
+        self.create_des_client_mock.return_value = client
+        client.records.list.return_value = [
+            self._record(index, 'host%d.example.com.' % index,
+                         '10.0.%d.%d' % (index >> 8, index & 255))
+            for index in range(size)]
+        return client
+
+    def test_record_index_large_zone(self):
+        client = self._zone_client(size=50000)
+        zone = driver.DesignateDnsZone('123', 'example.com')
+        for index in range(0, 50000, 500):
+            dns_driver = driver.DesignateDriver()
+            entries = dns_driver.get_entries_by_name(
+                'host%d.example.com.' % index, zone)
+            self.assertEqual(1, len(entries))
+            entries = dns_driver.get_entries_by_content(
+                '10.0.%d.%d' % (index >> 8, index & 255), zone)
+            self.assertEqual(1, len(entries))
+        self.assertEqual(1, client.records.list.call_count)
+
+    def test_record_index_cache_disabled(self):
+        self.patch_conf_property('dns_record_cache_ttl', 0)
+        client = self._zone_client()
+        zone = driver.DesignateDnsZone('123', 'example.com')
+        dns_driver = driver.DesignateDriver()
+        dns_driver.get_entries_by_name('host1.example.com.', zone)
+        dns_driver.get_entries_by_name('host2.example.com.', zone)
+        self.assertEqual(2, client.records.list.call_count)
+
+    def test_delete_entry_invalidates_index(self):
+        client = self._zone_client()
+        zone = driver.DesignateDnsZone('123', 'example.com')
+        dns_driver = driver.DesignateDriver()
+        dns_driver.delete_entry('host7.example.com', 'A', zone)
+        client.records.delete.assert_called_once_with(
+            '123', self._record_id(7))
+        dns_driver.get_entries_by_name('host8.example.com.', zone)
+        self.assertEqual(2, client.records.list.call_count)
+
+    def test_delete_entry_refreshes_stale_index(self):
+        client = self._zone_client()
+        zone = driver.DesignateDnsZone('123', 'example.com')
+        dns_driver = driver.DesignateDriver()
+        dns_driver.get_entries_by_name('host1.example.com.', zone)
+        # Created by another process after the index was built.
+        client.records.list.return_value = [
+            self._record(99999, 'new.example.com.', '10.1.1.1')]
+        dns_driver.delete_entry('new.example.com', 'A', zone)
+        client.records.delete.assert_called_once_with(
+            '123', self._record_id(99999))
+
+    def test_delete_entry_not_found(self):
+        self._zone_client()
+        zone = driver.DesignateDnsZone('123', 'example.com')
+        self.assertRaises(exception.DnsRecordNotFound,
+                          driver.DesignateDriver().delete_entry,
+                          'host1.example.com', 'CNAME', zone)
+
+    @patch.object(driver, 'Record')
+    def test_create_entry_invalidates_index(self, mock_record):
+        client = self._zone_client()
+        zone = driver.DesignateDnsZone('123', 'example.com')
+        dns_driver = driver.DesignateDriver()
+        dns_driver.get_entries_by_name('host1.example.com.', zone)
+        dns_driver.create_entry(MagicMock(dns_zone=zone), '10.1.1.1')
+        dns_driver.get_entries_by_name('host1.example.com.', zone)
+        self.assertEqual(2, client.records.list.call_count)
+
     def assertDomainsAreEqual(self, expected, actual):
         self.assertEqual(expected.name, actual.name)
         self.assertEqual(expected.id, actual.id)
@@ -309,6 +309,21 @@ class GuestAgentBackupTest(trove_testtools.TestCase):
                          restr.restore_cmd)
         self.assertEqual(PREPARE, restr.prepare_cmd)
 
+    @patch.object(operating_system, 'chown')
+    def test_restore_xtrabackup_without_start(self, mock_chown):
+        RunnerClass = utils.import_class(RESTORE_XTRA_CLS)
+        restr = RunnerClass(None, restore_location="/var/lib/mysql/data",
+                            location="filename", checksum="md5",
+                            start_db=False)
+        restr._app = Mock()
+        with patch.multiple(restr, _run_prepare=DEFAULT,
+                            _delete_old_binlogs=DEFAULT,
+                            reset_root_password=DEFAULT):
+            restr.post_restore()
+            self.assertFalse(restr.reset_root_password.called)
+        self.assertFalse(restr._app.start_mysql.called)
+        self.assertEqual(PREPARE, restr.prepare_cmd)
+
     def test_restore_xtrabackup_incremental_prepare_command(self):
         RunnerClass = utils.import_class(RESTORE_XTRA_INCR_CLS)
         restr = RunnerClass(None, restore_location="/var/lib/mysql/data",
@@ -48,7 +48,7 @@ class GuestAgentCassandraDBManagerTest(DatastoreManagerTest):
     __MOUNT_POINT = '/var/lib/cassandra'
 
     __N_GAK = '_get_available_keyspaces'
-    __N_GLU = '_get_listed_users'
+    __N_GACL = '_get_acl'
     __N_BU = '_build_user'
     __N_RU = '_rename_user'
     __N_AUP = '_alter_user_password'
@@ -449,19 +449,34 @@ class GuestAgentCassandraDBManagerTest(DatastoreManagerTest):
         db2 = models.CassandraSchema('db2')
         db3 = models.CassandraSchema(self._get_random_name(32))
 
-        with patch.object(self.admin, self.__N_GAK, return_value={db1, db2,
-                                                                  db3}):
-            found = self.manager.list_databases(self.context)
-            self.assertEqual(2, len(found))
-            self.assertEqual(3, len(found[0]))
-            self.assertIsNone(found[1])
-            self.assertIn(db1.serialize(), found[0])
-            self.assertIn(db2.serialize(), found[0])
-            self.assertIn(db3.serialize(), found[0])
-
-        with patch.object(self.admin, self.__N_GAK, return_value=set()):
-            found = self.manager.list_databases(self.context)
-            self.assertEqual(([], None), found)
+        self.conn.list_keyspaces.return_value = [db1.name, db2.name,
+                                                 db3.name, 'system']
+        found = self.manager.list_databases(self.context)
+        self.assertEqual(2, len(found))
+        self.assertEqual(3, len(found[0]))
+        self.assertIsNone(found[1])
+        self.assertIn(db1.serialize(), found[0])
+        self.assertIn(db2.serialize(), found[0])
+        self.assertIn(db3.serialize(), found[0])
+
+        self.conn.list_keyspaces.return_value = []
+        found = self.manager.list_databases(self.context)
+        self.assertEqual(([], None), found)
+
+    def test_list_databases_page(self):
+        self.conn.list_keyspaces.return_value = ['db%d' % index
+                                                 for index in range(9, -1, -1)]
+        found = self.manager.list_databases(self.context, limit=3,
+                                            marker='db2')
+        self.assertEqual(['db3', 'db4', 'db5'],
+                         [db['_name'] for db in found[0]])
+        self.assertEqual('db5', found[1])
+
+        found = self.manager.list_databases(self.context, limit=3,
+                                            marker='db7', include_marker=True)
+        self.assertEqual(['db7', 'db8', 'db9'],
+                         [db['_name'] for db in found[0]])
+        self.assertIsNone(found[1])
 
     def test_get_acl(self):
         r0 = NonCallableMagicMock(username='user1', resource='<all keyspaces>',
@@ -541,36 +556,61 @@ class GuestAgentCassandraDBManagerTest(DatastoreManagerTest):
 
             self.assertEqual({}, acl)
 
-    def test_get_listed_users(self):
-        usr1 = models.CassandraUser(self._get_random_name(1025))
-        usr2 = models.CassandraUser(self._get_random_name(1025))
-        usr3 = models.CassandraUser(self._get_random_name(1025))
-        db1 = models.CassandraSchema('db1')
-        db2 = models.CassandraSchema('db2')
-        usr1.databases.append(db1.serialize())
-        usr3.databases.append(db2.serialize())
-
-        rv_1 = NonCallableMagicMock()
-        rv_1.configure_mock(name=usr1.name, super=False)
-        rv_2 = NonCallableMagicMock()
-        rv_2.configure_mock(name=usr2.name, super=False)
-        rv_3 = NonCallableMagicMock()
-        rv_3.configure_mock(name=usr3.name, super=True)
-
-        with patch.object(self.conn, 'execute', return_value=iter(
-                [rv_1, rv_2, rv_3])):
-            with patch.object(self.admin, '_get_acl',
-                              return_value={usr1.name: {db1.name: {'SELECT'},
-                                                        db2.name: {}},
-                                            usr3.name: {db2.name: {'SELECT'}}}
-                              ):
-                usrs = self.manager.list_users(self.context)
-                self.conn.execute.assert_has_calls([
-                    call(self.__LIST_USR_FORMAT),
-                ], any_order=True)
-                self.assertIn(usr1.serialize(), usrs[0])
-                self.assertIn(usr2.serialize(), usrs[0])
-                self.assertIn(usr3.serialize(), usrs[0])
+    def _mock_users(self, users):
+        """Have the mock connection list the given users and return the
+        permissions on their databases.
+        """
+        rows = []
+        for user in users:
+            row = NonCallableMagicMock(super=False)
+            row.name = user.name
+            rows.append(row)
+        self.conn.execute.side_effect = (
+            lambda query, *args: list(rows) if query == "LIST USERS;" else [])
+        acl = {user.name: {db['_name']: {'SELECT'} for db in user.databases}
+               for user in users}
+
+        def _get_acl(client, username=None):
+            if username is None:
+                return acl
+            if username not in acl:
+                raise cass_service.InvalidRequest()
+            return {username: acl[username]}
+        patcher = patch.object(self.admin, self.__N_GACL,
+                               side_effect=_get_acl)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_list_users_page(self):
+        users = [models.CassandraUser('user%05d' % index)
+                 for index in range(10000)]
+        for user in users[::7]:
+            user.databases.append(models.CassandraSchema('db1').serialize())
+        random.shuffle(users)
+        mock_acl = self._mock_users(users)
+
+        found, next_marker = self.manager.list_users(
+            self.context, limit=20, marker='user00013')
+
+        self.assertEqual(['user%05d' % index for index in range(14, 34)],
+                         [user['_name'] for user in found])
+        self.assertEqual('user00033', next_marker)
+        self.assertEqual([{'_name': 'db1', '_character_set': None,
+                           '_collate': None}], found[0]['_databases'])
+        self.assertEqual([], found[1]['_databases'])
+        # Only the users on the page (and the next one) were loaded.
+        self.assertEqual(21, mock_acl.call_count)
+
+    def test_list_all_users(self):
+        users = [models.CassandraUser('user%05d' % index)
+                 for index in range(500)]
+        mock_acl = self._mock_users(users)
+
+        found, next_marker = self.manager.list_users(self.context)
+
+        self.assertEqual(500, len(found))
+        self.assertIsNone(next_marker)
+        mock_acl.assert_called_once_with(self.conn)
 
     def test_list_access(self):
         usr1 = models.CassandraUser('usr1')
@@ -582,50 +622,57 @@ class GuestAgentCassandraDBManagerTest(DatastoreManagerTest):
         usr3.databases.append(db1)
         usr3.databases.append(db2)
 
-        with patch.object(self.admin, self.__N_GLU, return_value={usr1, usr2,
-                                                                  usr3}):
-            usr1_dbs = self.manager.list_access(self.context, usr1.name, None)
-            usr2_dbs = self.manager.list_access(self.context, usr2.name, None)
-            usr3_dbs = self.manager.list_access(self.context, usr3.name, None)
-            self.assertEqual([], usr1_dbs)
-            self.assertEqual([db1], usr2_dbs)
-            self.assertEqual([db1, db2], usr3_dbs)
+        self._mock_users([usr1, usr2, usr3])
+        usr1_dbs = self.manager.list_access(self.context, usr1.name, None)
+        usr2_dbs = self.manager.list_access(self.context, usr2.name, None)
+        usr3_dbs = self.manager.list_access(self.context, usr3.name, None)
+        self.assertEqual([], usr1_dbs)
+        self.assertEqual([db1], usr2_dbs)
+        self.assertEqual(sorted([db1, db2]),
+                         sorted(usr3_dbs))
 
-        with patch.object(self.admin, self.__N_GLU, return_value=set()):
-            with ExpectedException(exception.UserNotFound):
-                self.manager.list_access(self.context, usr3.name, None)
+        with ExpectedException(exception.UserNotFound):
+            self.manager.list_access(self.context, 'usr4', None)
 
     def test_list_users(self):
         usr1 = models.CassandraUser('usr1')
         usr2 = models.CassandraUser('usr2')
         usr3 = models.CassandraUser(self._get_random_name(1025), 'password')
 
-        with patch.object(self.admin, self.__N_GLU, return_value={usr1, usr2,
-                                                                  usr3}):
-            found = self.manager.list_users(self.context)
-            self.assertEqual(2, len(found))
-            self.assertEqual(3, len(found[0]))
-            self.assertIsNone(found[1])
-            self.assertIn(usr1.serialize(), found[0])
-            self.assertIn(usr2.serialize(), found[0])
-            self.assertIn(usr3.serialize(), found[0])
-
-        with patch.object(self.admin, self.__N_GLU, return_value=set()):
-            self.assertEqual(([], None), self.manager.list_users(self.context))
+        self._mock_users([usr1, usr2, usr3])
+        found = self.manager.list_users(self.context)
+        self.assertEqual(2, len(found))
+        self.assertEqual(3, len(found[0]))
+        self.assertIsNone(found[1])
+        self.assertIn(models.CassandraUser(usr1.name).serialize(), found[0])
+        self.assertIn(models.CassandraUser(usr2.name).serialize(), found[0])
+        self.assertIn(models.CassandraUser(usr3.name).serialize(), found[0])
+
+        self._mock_users([])
+        self.assertEqual(([], None), self.manager.list_users(self.context))
+
+    def test_list_users_ignored(self):
+        self._mock_users([models.CassandraUser('usr1'),
+                          models.CassandraUser('os_admin')])
+        found, _ = self.manager.list_users(self.context)
+        self.assertEqual(['usr1'], [user['_name'] for user in found])
+        self.assertIsNone(
+            self.manager.get_user(self.context, 'os_admin', None))
 
     def test_get_user(self):
         usr1 = models.CassandraUser('usr1')
         usr2 = models.CassandraUser('usr2')
         usr3 = models.CassandraUser(self._get_random_name(1025), 'password')
 
-        with patch.object(self.admin, self.__N_GLU, return_value={usr1, usr2,
-                                                                  usr3}):
-            found = self.manager.get_user(self.context, usr2.name, None)
-            self.assertEqual(usr2.serialize(), found)
+        mock_acl = self._mock_users([usr1, usr2, usr3])
+        found = self.manager.get_user(self.context, usr2.name, None)
+        self.assertEqual(usr2.serialize(), found)
+        mock_acl.assert_called_once_with(self.conn, username=usr2.name)
+        self.assertFalse(self.conn.execute.called)
 
-        with patch.object(self.admin, self.__N_GLU, return_value=set()):
-            self.assertIsNone(
-                self.manager.get_user(self.context, usr2.name, None))
+        self._mock_users([])
+        self.assertIsNone(
+            self.manager.get_user(self.context, usr2.name, None))
 
     @patch.object(cass_service.CassandraAdmin, '_deserialize_keyspace',
                   side_effect=lambda p1: p1)
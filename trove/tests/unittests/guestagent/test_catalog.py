@@ -0,0 +1,69 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+from trove.common.db import models
+from trove.guestagent.common import guestagent_utils
+from trove.guestagent.datastore import catalog
+from trove.tests.unittests import trove_testtools
+
+
+class NameCatalog(catalog.Catalog):
+
+    def __init__(self, names):
+        self.names = names
+
+    def find(self, name):
+        return models.DatastoreSchema(name) if name in self.names else None
+
+    def _list(self, limit, marker, include_marker):
+        return [models.DatastoreSchema(name) for name in catalog.select_names(
+            self.names, limit=limit, marker=marker,
+            include_marker=include_marker)]
+
+
+class CatalogTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(CatalogTest, self).setUp()
+        self.names = ['db%02d' % index for index in range(30)][::-1]
+        self.catalog = NameCatalog(self.names)
+
+    def test_select_names(self):
+        self.assertEqual(sorted(self.names),
+                         catalog.select_names(iter(self.names)))
+        self.assertEqual(['db05', 'db06'], catalog.select_names(
+            iter(self.names), limit=2, marker='db04'))
+        self.assertEqual(['db04', 'db05'], catalog.select_names(
+            iter(self.names), limit=2, marker='db04', include_marker=True))
+        self.assertEqual([], catalog.select_names(
+            iter(self.names), limit=2, marker='db29'))
+
+    def test_list_matches_serialize_list(self):
+        schemas = [models.DatastoreSchema(name) for name in self.names]
+        for limit, marker, include_marker in [
+                (None, None, False), (10, None, False), (10, 'db09', False),
+                (10, 'db09', True), (10, 'db19', False), (10, 'db20', True),
+                (50, 'db03', False)]:
+            self.assertEqual(
+                guestagent_utils.serialize_list(
+                    schemas, limit=limit, marker=marker,
+                    include_marker=include_marker),
+                self.catalog.list(limit=limit, marker=marker,
+                                  include_marker=include_marker))
+
+    def test_find(self):
+        self.assertEqual('db07', self.catalog.find('db07').name)
+        self.assertIsNone(self.catalog.find('db30'))
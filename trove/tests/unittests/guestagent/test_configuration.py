@@ -14,12 +14,14 @@
 #    under the License.
 
 import getpass
+from mock import ANY
 from mock import call
 from mock import DEFAULT
 from mock import MagicMock
 from mock import Mock
 from mock import patch
 import os
+import shutil
 import tempfile
 from trove.common.stream_codecs import IniCodec
 from trove.guestagent.common.configuration import ConfigurationManager
@@ -37,7 +39,8 @@ class TestConfigurationManager(trove_testtools.TestCase):
                     chown=DEFAULT, chmod=DEFAULT)
     def test_read_write_configuration(self, read_file, write_file,
                                       chown, chmod):
-        sample_path = Mock()
+        # The manager checks whether the file changed before reading it.
+        sample_path = '/__DOES_NOT_EXIST__/sample.cnf'
         sample_owner = Mock()
         sample_group = Mock()
         sample_codec = MagicMock()
@@ -458,3 +461,65 @@ class TestConfigurationOverrideStrategy(trove_testtools.TestCase):
             self.assertEqual('pi', manager.get_value('Section_1')['name'])
             self.assertEqual(3.1415, manager.get_value('Section_1')['value'])
             self.assertIsNone(manager.get_value('Section_2'))
+
+
+class TestParsedFileCache(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(TestParsedFileCache, self).setUp()
+        self.revision_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.revision_dir)
+        self.base_config = os.path.join(self.revision_dir, 'base.cnf')
+        operating_system.write_file(
+            self.base_config, {'Section_1': {'name': 'pi'}}, IniCodec())
+        current_user = getpass.getuser()
+        with patch.multiple(operating_system, chmod=DEFAULT, chown=DEFAULT):
+            self.manager = ConfigurationManager(
+                self.base_config, current_user, current_user, IniCodec(),
+                override_strategy=ImportOverrideStrategy(
+                    os.path.join(self.revision_dir, 'overrides'), 'cnf'))
+            for index in range(30):
+                self.manager.apply_user_override(
+                    {'Section_1': {'key%d' % index: index}},
+                    change_id='id%d' % index)
+
+    @patch.multiple(operating_system, chmod=DEFAULT, chown=DEFAULT)
+    def test_override_reads_own_file(self, **_):
+        with patch.object(operating_system, 'read_file',
+                          wraps=operating_system.read_file) as read_file:
+            with patch.object(
+                    operating_system, 'list_files_in_directory',
+                    wraps=operating_system.list_files_in_directory) as ls:
+                self.manager.apply_user_override(
+                    {'Section_1': {'key30': 30}}, change_id='id30')
+                self.manager.apply_user_override(
+                    {'Section_1': {'key5': 'five'}}, change_id='id5')
+                self.manager.remove_user_override(change_id='id7')
+        self.assertFalse(read_file.called)
+        self.assertFalse(ls.called)
+
+        section = self.manager.get_value('Section_1')
+        self.assertEqual('pi', section['name'])
+        self.assertEqual('five', section['key5'])
+        self.assertEqual(30, section['key30'])
+        self.assertNotIn('key7', section)
+        self.assertEqual(
+            {'Section_1': {'key5': 'five'}},
+            operating_system.read_file(
+                self.manager._override_strategy._find_revision_file(
+                    ConfigurationManager.USER_GROUP, 'id5'), IniCodec()))
+
+    def test_changed_file_read_again(self):
+        path = self.manager._override_strategy._find_revision_file(
+            ConfigurationManager.USER_GROUP, 'id3')
+        operating_system.write_file(
+            path, {'Section_1': {'key3': 'three'}}, IniCodec())
+        # Make sure the change is seen even within the timer resolution.
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+        with patch.object(operating_system, 'read_file',
+                          wraps=operating_system.read_file) as read_file:
+            self.manager.refresh_cache()
+        read_file.assert_called_once_with(path, codec=ANY, as_root=False)
+        self.assertEqual('three', self.manager.get_value('Section_1')['key3'])
@@ -13,6 +13,7 @@
 #    under the License.
 
 import abc
+from collections import OrderedDict
 import os
 from six.moves.urllib import parse as urllib
 import subprocess
@@ -44,6 +45,7 @@ from trove.conductor import api as conductor_api
 from trove.guestagent.common.configuration import ConfigurationManager
 from trove.guestagent.common.configuration import ImportOverrideStrategy
 from trove.guestagent.common import operating_system
+from trove.guestagent.common import sql_query
 from trove.guestagent.datastore.experimental.cassandra import (
     service as cass_service)
 from trove.guestagent.datastore.experimental.couchbase import (
@@ -1368,14 +1370,21 @@ class MySqlAppTest(trove_testtools.TestCase):
 
     @patch.object(dbaas, 'get_engine',
                   return_value=MagicMock(name='get_engine'))
-    def test_wait_for_txn(self, *args):
+    @patch('trove.guestagent.strategies.replication.progress.time')
+    def test_wait_for_txn(self, mock_time, *args):
+        mock_time.time.return_value = 0
+        uuid = 'b1f3f33a-0789-ee1c-43f3-f8373e12f1ea'
+        self.mock_execute.return_value.first = Mock(side_effect=[
+            ['%s:1-5' % uuid], ['%s:1-9' % uuid], ['%s:1-10' % uuid]])
         with patch.object(dbaas.MySqlApp, 'local_sql_client',
                           return_value=self.mock_client):
-            self.mySqlApp.wait_for_txn('abcd')
+            self.mySqlApp.wait_for_txn('%s:1-10' % uuid)
+        self.assertEqual(3, self.mock_execute.call_count)
         args, _ = self.mock_execute.call_args_list[0]
-        expected = ("SELECT WAIT_UNTIL_SQL_THREAD_AFTER_GTIDS('abcd')")
+        expected = ("SELECT @@global.gtid_executed")
         self.assertEqual(expected, args[0],
                          "Sql statements are not the same")
+        self.assertEqual(2, mock_time.sleep.call_count)
 
     @patch.object(dbaas, 'get_engine',
                   return_value=MagicMock(name='get_engine'))
@@ -1424,6 +1433,7 @@ class MySqlAppTest(trove_testtools.TestCase):
         self.mySqlApp.stop_db = Mock()
         self.mySqlApp._reset_configuration = Mock()
         self.mySqlApp._apply_user_overrides = Mock()
+        self.mySqlApp._start_mysql_with_init_file = Mock()
         self.mysql_stops_successfully()
         self.mysql_starts_successfully()
         sqlalchemy.create_engine = Mock()
@@ -1436,9 +1446,40 @@ class MySqlAppTest(trove_testtools.TestCase):
             self.mySqlApp._reset_configuration.assert_has_calls(
                 [call('contents', auth_pwd_mock.return_value)])
 
-            self.assertTrue(self.mySqlApp.start_mysql.called)
+            # MySQL is started once, creating the admin user as it starts
+            self.assertFalse(self.mySqlApp.start_mysql.called)
+            statements = (
+                self.mySqlApp._start_mysql_with_init_file.call_args[0][0])
+            self.assertIn("GRANT ALL PRIVILEGES ON *.* TO `%s`@`localhost` "
+                          "IDENTIFIED BY 'some_password' WITH GRANT OPTION;"
+                          % mysql_common_service.ADMIN_USER_NAME, statements)
+            self.assertIn(sql_query.REMOVE_ANON, statements)
+            self.assertFalse(sqlalchemy.create_engine.called)
             self.assert_reported_status(rd_instance.ServiceStatuses.NEW)
 
+    @patch.object(operating_system, 'remove')
+    @patch.object(operating_system, 'chown')
+    def test_start_mysql_with_init_file(self, mock_chown, mock_remove):
+        config_manager = Mock()
+        init_files = []
+
+        def _start_mysql():
+            init_file = config_manager.apply_system_override.call_args[0][0][
+                'mysqld']['init_file']
+            with open(init_file) as f:
+                init_files.append(f.read())
+        with patch.object(MySqlApp, 'configuration_manager', config_manager):
+            self.mySqlApp.start_mysql = Mock(side_effect=_start_mysql)
+            self.mySqlApp._start_mysql_with_init_file(['SELECT 1;',
+                                                       'SELECT 2;'])
+        self.assertEqual(['SELECT 1;\nSELECT 2;\n'], init_files)
+        init_file = mock_remove.call_args[0][0]
+        mock_chown.assert_called_once_with(
+            init_file, 'mysql', 'mysql', as_root=True)
+        config_manager.remove_system_override.assert_called_once_with(
+            mysql_common_service.CNF_INIT)
+        os.remove(init_file)
+
     @patch.object(dbaas, 'get_engine')
     @patch.object(utils, 'generate_random_password',
                   return_value='some_password')
@@ -1597,12 +1638,14 @@ class MySqlAppMockTest(trove_testtools.TestCase):
                     return_value=True)
                 app = MySqlApp(mock_status)
                 app._reset_configuration = MagicMock()
-                app.start_mysql = MagicMock(return_value=None)
+                app._start_mysql_with_init_file = MagicMock(
+                    return_value=None)
                 app.stop_db = MagicMock(return_value=None)
                 app.secure('foo')
                 reset_config_calls = [call('foo', auth_pwd_mock.return_value)]
                 app._reset_configuration.assert_has_calls(reset_config_calls)
-                self.assertTrue(mock_execute.called)
+                self.assertTrue(app._start_mysql_with_init_file.called)
+                self.assertFalse(mock_execute.called)
 
     @patch('trove.guestagent.common.configuration.ConfigurationManager'
            '.refresh_cache')
@@ -1627,9 +1670,9 @@ class MySqlAppMockTest(trove_testtools.TestCase):
                     mysql_common_service.clear_expired_password = \
                         MagicMock(return_value=None)
                     self.assertRaises(RuntimeError, app.secure, None)
-                    self.assertTrue(mock_execute.called)
-                    # At least called twice
-                    self.assertGreaterEqual(mock_execute.call_count, 2)
+                    # Nothing is started with a broken configuration
+                    self.assertEqual(1, utils.execute_with_timeout.call_count)
+                    self.assertFalse(mock_execute.called)
                     (mock_status.wait_for_real_status_to_change_to.
                      assert_called_with(rd_instance.ServiceStatuses.SHUTDOWN,
                                         app.state_change_wait_time, False))
@@ -2731,6 +2774,23 @@ class VerticaAppStatusTest(trove_testtools.TestCase):
         self.assertEqual(rd_instance.ServiceStatuses.CRASHED, status)
 
 
+class VerticaSystemTest(trove_testtools.TestCase):
+
+    def test_vsql_batch(self):
+        with patch.object(vertica_system, 'shell_execute',
+                          return_value=('', '')) as mock_execute:
+            vertica_system.exec_vsql_command('pwd', ['SELECT 1', 'SELECT 2'])
+        mock_execute.assert_called_once_with(
+            "/opt/vertica/bin/vsql -w 'pwd' -c \"SELECT 1; SELECT 2\"",
+            'dbadmin')
+
+    def test_vsql_error_in_batch(self):
+        err = vertica_system.VSqlError(
+            "WARNING 4468: Some warning\nERROR 4706: Some error")
+        self.assertFalse(err.is_warning())
+        self.assertEqual(4706, err.code)
+
+
 class VerticaAppTest(trove_testtools.TestCase):
 
     @patch.object(ImportOverrideStrategy, '_initialize_import_directory')
@@ -2771,33 +2831,62 @@ class VerticaAppTest(trove_testtools.TestCase):
             with patch.object(self.app, 'is_root_enabled', return_value=False):
                 with patch.object(vertica_system, 'exec_vsql_command',
                                   MagicMock(side_effect=[['', ''],
-                                                         ['', ''],
                                                          ['', '']])):
                     self.app.enable_root('root_password')
-                    create_user_arguments = (
-                        vertica_system.exec_vsql_command.call_args_list[0])
-                    expected_create_user_cmd = (
-                        vertica_system.CREATE_USER % ('root',
-                                                      'root_password'))
-                    create_user_arguments.assert_called_with(
-                        'some_password', expected_create_user_cmd)
-
-                    grant_role_arguments = (
-                        vertica_system.exec_vsql_command.call_args_list[1])
-                    expected_grant_role_cmd = (
-                        vertica_system.GRANT_TO_USER % ('pseudosuperuser',
-                                                        'root'))
-                    grant_role_arguments.assert_called_with(
-                        'some_password', expected_grant_role_cmd)
-
-                    enable_user_arguments = (
-                        vertica_system.exec_vsql_command.call_args_list[2])
-                    expected_enable_user_cmd = (
-                        vertica_system.ENABLE_FOR_USER % ('root',
-                                                          'pseudosuperuser'
-                                                          ))
-                    enable_user_arguments.assert_called_with(
-                        'some_password', expected_enable_user_cmd)
+                    self.assertEqual(
+                        [call('some_password',
+                              [vertica_system.CREATE_USER % ('root',
+                                                             'root_password'),
+                               vertica_system.GRANT_TO_USER % (
+                                   'pseudosuperuser', 'root')]),
+                         call('some_password',
+                              vertica_system.ENABLE_FOR_USER % (
+                                  'root', 'pseudosuperuser'))],
+                        vertica_system.exec_vsql_command.call_args_list)
+
+    @patch('trove.guestagent.datastore.experimental.vertica.service.LOG')
+    def test_enable_root_enable_role_failed(self, mock_logging):
+        with patch.object(self.app, 'read_config',
+                          return_value=self.test_config):
+            with patch.object(self.app, 'is_root_enabled', return_value=False):
+                with patch.object(vertica_system, 'exec_vsql_command',
+                                  MagicMock(side_effect=[
+                                      ['', ''],
+                                      ['', vertica_system.VSqlError(
+                                          'ERROR 123: Test')]])):
+                    # Failing to enable the role only logs a warning
+                    self.app.enable_root('root_password')
+                    self.assertEqual(1, mock_logging.warning.call_count)
+
+    def test_apply_config_batched(self):
+        with patch.object(self.app, 'read_config',
+                          return_value=self.test_config):
+            with patch.object(vertica_system, 'exec_vsql_command',
+                              return_value=('', '')) as mock_vsql:
+                self.app._apply_config(OrderedDict([('a', 1), ('b', 2)]))
+                self.app._reset_config(OrderedDict([('a', 1), ('b', 2)]))
+        self.assertEqual(
+            [call('some_password',
+                  [vertica_system.ALTER_DB_CFG % ('db_srvr', 'a', '1'),
+                   vertica_system.ALTER_DB_CFG % ('db_srvr', 'b', '2')]),
+             call('some_password',
+                  [vertica_system.ALTER_DB_RESET_CFG % ('db_srvr', 'a'),
+                   vertica_system.ALTER_DB_RESET_CFG % ('db_srvr', 'b')])],
+            mock_vsql.call_args_list)
+
+    @patch('trove.guestagent.datastore.experimental.vertica.service.os.path.'
+           'getmtime', return_value=1)
+    def test_database_password_cached(self, mock_getmtime):
+        with patch.object(self.app, 'read_config',
+                          return_value=self.test_config) as mock_read:
+            self.assertEqual('some_password',
+                             self.app._get_database_password())
+            self.assertEqual('some_password',
+                             self.app._get_database_password())
+            self.assertEqual(1, mock_read.call_count)
+            mock_getmtime.return_value = 2
+            self.app._get_database_password()
+            self.assertEqual(2, mock_read.call_count)
 
     @patch('trove.guestagent.datastore.experimental.vertica.service.LOG')
     def test_enable_root_is_root_not_enabled_failed(self, *args):
@@ -3463,36 +3552,80 @@ class DB2AdminTest(trove_testtools.TestCase):
         FAKE_USER.pop()
 
     def test_list_users(self):
-        databases = []
-        databases.append(FAKE_DB)
         with patch.object(db2service, 'run_command', MagicMock(
                           side_effect=ProcessExecutionError('Error'))):
-            with patch.object(self.db2Admin, "list_databases",
-                              MagicMock(return_value=(databases, None))):
-                self.db2Admin.list_users()
-                self.assertTrue(db2service.run_command.called)
-                args, _ = db2service.run_command.call_args_list[0]
-                expected = "db2 +o  connect to testDB; " \
-                    "db2 -x  select grantee, dataaccessauth " \
-                    "from sysibm.sysdbauth; db2 connect reset"
-            self.assertEqual(expected, args[0],
-                             "List database queries are not the same")
+            self.assertEqual(([], None), self.db2Admin.list_users())
+            self.assertEqual(1, db2service.run_command.call_count)
+            args, _ = db2service.run_command.call_args_list[0]
+            self.assertIn("db2 list database directory", args[0])
+            self.assertIn("db2 -x \"select grantee, dataaccessauth "
+                          "from sysibm.sysdbauth where dataaccessauth = 'Y'",
+                          args[0])
+
+    def test_list_users_single_session(self):
+        out = ("DATABASE= DB1\n"
+               "USER1                Y\n"
+               "USER2                Y\n"
+               "DATABASE= DB2\n"
+               "SQL1013N  The database alias name could not be found.\n"
+               "DATABASE= DB3\n"
+               "USER2                Y\n"
+               "USER3                Y\n")
+        with patch.object(db2service, 'run_command',
+                          return_value=(out, None)) as mock_run, \
+                patch.object(db2service.cfg, 'get_ignored_users',
+                             return_value=['os_admin', 'root']):
+            users, next_marker = self.db2Admin.list_users(limit=2,
+                                                          marker='USER0')
+            self.assertEqual(1, mock_run.call_count)
+        self.assertEqual('USER2', next_marker)
+        self.assertEqual(['USER1', 'USER2'],
+                         [user['_name'] for user in users])
+        self.assertEqual(['DB1', 'DB3'], [
+            database['_name'] for database in users[1]['_databases']])
+        command = mock_run.call_args[0][0]
+        self.assertIn("grantee not in ('os_admin', 'root')", command)
+        self.assertIn("grantee > 'USER0'", command)
+        self.assertIn("fetch first 3 rows only", command)
+
+    def test_list_users_unsafe_marker(self):
+        with patch.object(db2service, 'run_command',
+                          return_value=('', None)) as mock_run:
+            self.db2Admin.list_users(limit=2, marker="x'; drop")
+        self.assertNotIn("drop", mock_run.call_args[0][0])
+        # The marker is filtered in Python, so all the rows are fetched
+        self.assertNotIn("fetch first", mock_run.call_args[0][0])
 
     def test_get_user(self):
-        databases = []
-        databases.append(FAKE_DB)
-        with patch.object(db2service, 'run_command', MagicMock(
-                          side_effect=ProcessExecutionError('Error'))):
-            with patch.object(self.db2Admin, "list_databases",
-                              MagicMock(return_value=(databases, None))):
-                self.db2Admin._get_user('random', None)
-                self.assertTrue(db2service.run_command.called)
-                args, _ = db2service.run_command.call_args_list[0]
-                expected = "db2 +o  connect to testDB; " \
-                    "db2 -x  select grantee, dataaccessauth " \
-                    "from sysibm.sysdbauth; db2 connect reset"
-                self.assertEqual(args[0], expected,
-                                 "Delete database queries are not the same")
+        out = ("DATABASE= TESTDB\n"
+               "RANDOM               Y\n")
+        with patch.object(db2service, 'run_command',
+                          return_value=(out, None)) as mock_run:
+            user = self.db2Admin._get_user('random', None)
+            self.assertEqual(1, mock_run.call_count)
+            self.assertIn("lower(grantee) = 'random'",
+                          mock_run.call_args[0][0])
+        self.assertEqual(['TESTDB'],
+                         [database['_name'] for database in user.databases])
+
+    def test_create_users_batched(self):
+        users = [{"_name": "random", "_password": "guesswhat",
+                  "_host": "%", "_databases": [FAKE_DB, FAKE_DB_2]},
+                 {"_name": "random2", "_password": "guesswhat",
+                  "_host": "%", "_databases": [FAKE_DB]}]
+        with patch.object(db2service, 'run_command',
+                          return_value=None) as mock_run:
+            db2service.utils.execute_with_timeout = MagicMock(
+                return_value=None)
+            self.db2Admin.create_user(users)
+        self.assertEqual(1, mock_run.call_count)
+        grant = ("db2 GRANT DBADM,CREATETAB,BINDADD,CONNECT,DATAACCESS "
+                 "ON DATABASE TO USER %s")
+        self.assertEqual(
+            "db2 connect to testDB; " + grant % 'random' + "; " +
+            grant % 'random2' + "; db2 connect reset; "
+            "db2 connect to testDB2; " + grant % 'random' +
+            "; db2 connect reset", mock_run.call_args[0][0])
 
 
 class PXCAppTest(trove_testtools.TestCase):
@@ -0,0 +1,160 @@
+# Copyright 2016 Tesora Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import os
+import tempfile
+
+from mock import MagicMock
+from mock import patch
+
+from trove.common import cfg
+from trove.common import exception
+from trove.guestagent.common import operating_system
+from trove.guestagent import guest_log
+from trove.tests.unittests import trove_testtools
+
+CONF = cfg.CONF
+
+
+class GuestLogTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(GuestLogTest, self).setUp()
+        chmod_patch = patch.object(operating_system, 'chmod')
+        chmod_patch.start()
+        self.addCleanup(chmod_patch.stop)
+
+        fd, self.log_file = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.log_file)
+
+        self.context = trove_testtools.TroveTestContext(self)
+        self.swift_client = MagicMock()
+        self.swift_client.get_object.return_value = (
+            {}, '{"log_size": 0, "log_header_digest": "abc"}')
+        self.guest_log = guest_log.GuestLog(
+            self.context, 'general', guest_log.LogType.SYS, None,
+            self.log_file, True)
+        self.guest_log._cached_swift_client = self.swift_client
+        self.guest_log._cached_context = self.context
+        self.guest_log._container_name = 'log_container'
+        self.guest_log.get_container_name = MagicMock(
+            return_value='log_container')
+
+    def _write_log(self, data):
+        with open(self.log_file, 'ab') as log:
+            log.write(data)
+
+    def _published_components(self):
+        return [call[0][2] for call in
+                self.swift_client.put_object.call_args_list
+                if not call[0][1].endswith('_metafile')]
+
+    def test_read_log_components_line_boundaries(self):
+        log = io.BytesIO(b'aaaa\nbb\ncccccc\nd\n')
+        components = list(
+            guest_log.GuestLog._read_log_components(log, 8))
+        self.assertEqual([(b'aaaa\nbb\n', 2), (b'cccccc\n', 1), (b'd\n', 1)],
+                         components)
+
+    def test_read_log_components_long_line(self):
+        log = io.BytesIO(b'abcdefghij\nk\n')
+        components = list(
+            guest_log.GuestLog._read_log_components(log, 4))
+        self.assertEqual(b'abcdefghij\nk\n',
+                         b''.join(data for data, _ in components))
+        self.assertTrue(all(len(data) <= 4 for data, _ in components))
+
+    def test_read_log_components_not_final(self):
+        log = io.BytesIO(b'complete\npartial')
+        components = list(
+            guest_log.GuestLog._read_log_components(log, 64, final=False))
+        self.assertEqual([(b'complete\n', 1)], components)
+
+    def test_read_log_components_limit(self):
+        log = io.BytesIO(b'1234\n' * 10)
+        components = list(
+            guest_log.GuestLog._read_log_components(log, 10, limit=20))
+        self.assertEqual(20, sum(len(data) for data, _ in components))
+
+    def test_publish_from_last_offset(self):
+        self.patch_conf_property('guest_log_limit', 16)
+        self._write_log(b'line one\nline two\n')
+        self.guest_log._publish_to_container(self.log_file)
+        self.assertEqual(18, self.guest_log._published_size)
+
+        self._write_log(b'line three\n')
+        self.swift_client.put_object.reset_mock()
+        self.guest_log._publish_to_container(self.log_file)
+        self.assertEqual(29, self.guest_log._published_size)
+        self.assertEqual([b'line three\n'], self._published_components())
+
+    def test_publish_single_metafile_put(self):
+        self._write_log(b'x\n' * 100)
+        self.guest_log._publish_to_container(self.log_file)
+        metafile_puts = [call for call in
+                         self.swift_client.put_object.call_args_list
+                         if call[0][1].endswith('_metafile')]
+        self.assertEqual(1, len(metafile_puts))
+
+    @patch.object(guest_log, 'LOG')
+    def test_publish_failure_keeps_contiguous_offset(self, mock_logging):
+        self.patch_conf_property('guest_log_limit', 4)
+        self.patch_conf_property('guest_log_publish_workers', 1)
+        self._write_log(b'aaa\nbbb\nccc\n')
+        self.swift_client.put_object.side_effect = [
+            None, exception.TroveError('boom'), None, None]
+        self.assertRaises(exception.TroveError,
+                          self.guest_log._publish_to_container, self.log_file)
+        self.assertEqual(4, self.guest_log._published_size)
+
+    @patch.object(guest_log, 'LOG')
+    def test_publish_failure_no_duplicates(self, mock_logging):
+        self.patch_conf_property('guest_log_limit', 4)
+        self._write_log(b'aaa\nbbb\nccc\nddd\n')
+        container = {}
+
+        def _put_object(container_name, name, data, headers=None):
+            if data == b'bbb\n' and not container.get('failed'):
+                container['failed'] = True
+                raise exception.TroveError('boom')
+            container[name] = data
+
+        def _delete_objects(context, container_name, names, client=None):
+            for name in names:
+                container.pop(name)
+
+        self.swift_client.put_object.side_effect = _put_object
+        with patch.object(guest_log.swift_utils, 'delete_objects',
+                          side_effect=_delete_objects):
+            self.assertRaises(exception.TroveError,
+                              self.guest_log._publish_to_container,
+                              self.log_file)
+            self.guest_log._publish_to_container(self.log_file)
+        components = [container[name] for name in sorted(container)
+                      if name.startswith(self.guest_log._object_prefix())]
+        self.assertEqual(b'aaa\nbbb\nccc\nddd\n', b''.join(components))
+
+    def test_publish_log_follow(self):
+        self.patch_conf_property('guest_log_follow_interval', 5)
+        with patch.object(guest_log.loopingcall,
+                          'FixedIntervalLoopingCall') as mock_loop:
+            self.guest_log.publish_log()
+            self.guest_log.publish_log()
+            self.assertEqual(1, mock_loop.call_count)
+            self.assertTrue(self.guest_log.following)
+            self.guest_log.enabled = False
+            self.assertFalse(self.guest_log.following)
@@ -28,6 +28,7 @@ from proboscis.asserts import assert_is_none
 from proboscis.asserts import assert_true
 
 from trove.common import exception
+from trove.common import instance as rd_instance
 from trove.guestagent.common import operating_system
 from trove.guestagent.datastore import manager
 from trove.guestagent import guest_log
@@ -506,6 +507,34 @@ class ManagerTest(trove_testtools.TestCase):
             assert_equal([[self.expected_module_details]], module_details)
             assert_equal(1, mock_am.call_count)
 
+    def test_module_apply_without_contents(self):
+        module = {'id': 'mod-id', 'name': 'mymod', 'type': 'ping',
+                  'md5': 'md5sum'}
+        with patch.object(
+                module_manager.ModuleManager, 'has_contents',
+                return_value=True) as mock_hc, patch.object(
+                module_manager.ModuleManager, 'apply_module',
+                return_value=self.expected_module_details) as mock_am:
+            module_details = self.manager.module_apply(
+                self.context, [{'module': module}])
+            assert_equal([self.expected_module_details], module_details)
+            mock_hc.assert_called_once_with('ping', 'mod-id', 'md5sum')
+            assert_is_none(mock_am.call_args[0][6])
+
+    def test_module_apply_contents_required(self):
+        module = {'id': 'mod-id', 'name': 'mymod', 'type': 'ping',
+                  'md5': 'md5sum'}
+        with patch.object(
+                module_manager.ModuleManager, 'has_contents',
+                return_value=False), patch.object(
+                module_manager.ModuleManager, 'apply_module') as mock_am:
+            module_details = self.manager.module_apply(
+                self.context, [{'module': module}])
+            assert_equal(1, len(module_details))
+            assert_equal(rd_instance.MODULE_CONTENTS_REQUIRED,
+                         module_details[0]['status'])
+            assert_equal(0, mock_am.call_count)
+
     def test_module_remove(self):
         with patch.object(
                 module_manager.ModuleManager, 'remove_module',
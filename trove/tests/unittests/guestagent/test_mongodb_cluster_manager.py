@@ -17,6 +17,7 @@ import mock
 from oslo_utils import netutils
 import pymongo
 
+from trove.common import exception
 import trove.common.instance as ds_instance
 import trove.common.utils as utils
 from trove.guestagent.common.configuration import ImportOverrideStrategy
@@ -59,14 +60,65 @@ class GuestAgentMongoDBClusterManagerTest(trove_testtools.TestCase):
         self.manager.app.status.set_status.assert_called_with(
             ds_instance.ServiceStatuses.FAILED)
 
-    @mock.patch.object(utils, 'poll_until')
+    def _rs_status(self, states, my_state=1):
+        return {'ok': 1, 'myState': my_state,
+                'members': [{'name': 'member%d' % index, 'state': state,
+                             'stateStr': {1: 'PRIMARY'}.get(state, 'OTHER'),
+                             'health': 1}
+                            for index, state in enumerate(states)]}
+
+    @mock.patch.object(service, 'time')
+    @mock.patch.object(service.MongoDBAdmin, '_admin_user')
+    @mock.patch.object(service, 'MongoDBClient')
+    @mock.patch.object(service.MongoDBAdmin, 'get_repl_status')
     @mock.patch.object(service.MongoDBAdmin, 'rs_initiate')
     @mock.patch.object(service.MongoDBAdmin, 'rs_add_members')
-    def test_add_member(self, mock_add, mock_initiate, mock_poll):
+    def test_add_member(self, mock_add, mock_initiate, mock_status,
+                        mock_client, mock_user, mock_time):
+        mock_time.time.return_value = 0
         members = ["test1", "test2"]
+        mock_status.side_effect = [
+            self._rs_status([2], my_state=2),
+            self._rs_status([1]),
+            self._rs_status([1, 0, 0]),
+            self._rs_status([1, 5, 2]),
+            self._rs_status([1, 2, 2])]
         self.manager.add_members(self.context, members)
-        mock_initiate.assert_any_call()
-        mock_add.assert_any_call(["test1", "test2"])
+        client = mock_client().__enter__()
+        self.assertEqual(2, mock_client.call_count)
+        mock_initiate.assert_called_once_with(client=client)
+        mock_add.assert_called_once_with(["test1", "test2"], client=client)
+        mock_status.assert_called_with(client=client)
+        self.assertEqual(5, mock_status.call_count)
+        self.assertEqual([service.RS_STATUS_MIN_INTERVAL] * 3,
+                         [args[0] for args, _ in
+                          mock_time.sleep.call_args_list])
+
+    @mock.patch.object(service, 'time')
+    @mock.patch.object(service.MongoDBAdmin, 'get_repl_status')
+    def test_wait_for_replica_set_backoff(self, mock_status, mock_time):
+        mock_time.time.return_value = 0
+        mock_status.side_effect = (
+            [pymongo.errors.OperationFailure('not yet')] +
+            [self._rs_status([1, 0])] * 6 +
+            [self._rs_status([1, 2])])
+        self.manager.app._wait_for_replica_set(
+            service.MongoDBAdmin(), mock.Mock(),
+            lambda status: status['members'][1]['state'] == 2)
+        self.assertEqual([0.5, 0.5, 1, 2, 4, 8, 10],
+                         [args[0] for args, _ in
+                          mock_time.sleep.call_args_list])
+
+    @mock.patch.object(service, 'time')
+    @mock.patch.object(service.MongoDBAdmin, 'get_repl_status')
+    def test_wait_for_replica_set_timeout(self, mock_status, mock_time):
+        mock_time.time.return_value = 0
+        self.patch_conf_property('add_members_timeout', 0, section='mongodb')
+        mock_status.return_value = self._rs_status([2])
+        self.assertRaises(exception.PollTimeOut,
+                          self.manager.app._wait_for_replica_set,
+                          service.MongoDBAdmin(), mock.Mock(),
+                          lambda status: False)
 
     @mock.patch.object(service.MongoDBApp, 'restart')
     @mock.patch.object(service.MongoDBApp, 'create_admin_user')
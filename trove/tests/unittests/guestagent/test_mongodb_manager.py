@@ -232,19 +232,14 @@ class GuestAgentMongoDBManagerTest(DatastoreManagerTest):
 
         mocked_find = mock.MagicMock(return_value=[
             {
-                '_id': 'admin.os_admin',
-                'user': 'os_admin', 'db': 'admin',
-                'roles': [{'db': 'admin', 'role': 'root'}]
+                '_id': 'testdb.otheruser',
+                'user': 'otheruser', 'db': 'testdb',
+                'roles': [{'db': 'testdb2', 'role': 'readWrite'}]
             },
             {
                 '_id': 'testdb.testuser',
                 'user': 'testuser', 'db': 'testdb',
                 'roles': [{'db': 'testdb', 'role': 'testrole'}]
-            },
-            {
-                '_id': 'testdb.otheruser',
-                'user': 'otheruser', 'db': 'testdb',
-                'roles': [{'db': 'testdb2', 'role': 'readWrite'}]
             }
         ])
 
@@ -253,10 +248,35 @@ class GuestAgentMongoDBManagerTest(DatastoreManagerTest):
 
         users, next_marker = self.manager.list_users(self.context)
 
+        # The reserved users are filtered out, and the users sorted, by
+        # the query.
+        mocked_find.assert_called_once_with(
+            {'_id': {'$nin': ['admin.os_admin', 'admin.root']}},
+            sort=[('_id', pymongo.ASCENDING)], limit=0)
         self.assertIsNone(next_marker)
         self.assertEqual(sorted([user1, user2], key=lambda x: x['_name']),
                          users)
 
+    @mock.patch.object(service, 'MongoDBClient')
+    @mock.patch.object(service.MongoDBAdmin, '_admin_user')
+    def test_list_users_page(self, mocked_admin_user, mocked_client):
+        mocked_find = mock.MagicMock(return_value=[
+            {'_id': 'testdb.user%d' % index, 'roles': []}
+            for index in range(4, 7)])
+        client = mocked_client().__enter__().admin
+        client.system.users.find = mocked_find
+
+        users, next_marker = self.manager.list_users(
+            self.context, limit=2, marker='testdb.user3')
+
+        mocked_find.assert_called_once_with(
+            {'_id': {'$nin': ['admin.os_admin', 'admin.root'],
+                     '$gt': 'testdb.user3'}},
+            sort=[('_id', pymongo.ASCENDING)], limit=3)
+        self.assertEqual(['testdb.user4', 'testdb.user5'],
+                         [user['_name'] for user in users])
+        self.assertEqual('testdb.user5', next_marker)
+
     @mock.patch.object(service.MongoDBAdmin, 'create_validated_user')
     @mock.patch.object(utils, 'generate_random_password',
                        return_value='password')
@@ -205,6 +205,10 @@ class GuestAgentManagerTest(DatastoreManagerTest):
         self._prepare_dynamic(backup_id='backup_id_123abc',
                               is_root_enabled=True)
 
+    def test_prepare_mysql_from_dump(self):
+        self._prepare_dynamic(backup_id='backup_id_123abc',
+                              backup_type='MySQLDump')
+
     def test_prepare_mysql_with_root_password(self):
         self._prepare_dynamic(root_password='some_password')
 
@@ -230,14 +234,15 @@ class GuestAgentManagerTest(DatastoreManagerTest):
                          is_mysql_installed=True,
                          backup_id=None, is_root_enabled=False,
                          root_password=None, overrides=None, is_mounted=False,
-                         databases=None, users=None, snapshot=None):
+                         databases=None, users=None, snapshot=None,
+                         backup_type='InnoBackupEx'):
         # covering all outcomes is starting to cause trouble here
         COUNT = 1 if device_path else 0
         backup_info = None
         if backup_id is not None:
             backup_info = {'id': backup_id,
                            'location': 'fake-location',
-                           'type': 'InnoBackupEx',
+                           'type': backup_type,
                            'checksum': 'fake-checksum',
                            }
 
@@ -264,6 +269,12 @@ class GuestAgentManagerTest(DatastoreManagerTest):
         dbaas.MySqlApp.install_if_needed = MagicMock(return_value=None)
         dbaas.MySqlApp.secure = MagicMock(return_value=None)
         dbaas.MySqlApp.secure_root = MagicMock(return_value=None)
+        admin_patcher = patch.multiple(dbaas.MySqlApp,
+                                       reset_admin_password=DEFAULT,
+                                       get_auth_password=DEFAULT)
+        self.addCleanup(admin_patcher.stop)
+        admin_patcher.start()
+        dbaas.MySqlApp.get_auth_password.return_value = 'password'
         pkg.Package.pkg_is_installed = MagicMock(
             return_value=is_mysql_installed)
         operating_system.chown = MagicMock(return_value=None)
@@ -298,10 +309,20 @@ class GuestAgentManagerTest(DatastoreManagerTest):
             self.assertEqual(1, VolumeDevice.unmount.call_count)
         else:
             self.assertEqual(0, VolumeDevice.unmount.call_count)
-        if backup_info:
+        # MySQL is only started by secure()
+        self.assertFalse(dbaas.MySqlApp.start_mysql.called)
+        if backup_type == 'InnoBackupEx' and backup_info:
+            restore_mock.assert_any_call(self.context,
+                                         backup_info,
+                                         '/var/lib/mysql/data',
+                                         start_db=False)
+            self.assertFalse(dbaas.MySqlApp.reset_admin_password.called)
+        elif backup_info:
             restore_mock.assert_any_call(self.context,
                                          backup_info,
                                          '/var/lib/mysql/data')
+            dbaas.MySqlApp.reset_admin_password.assert_called_once_with(
+                'password')
         dbaas.MySqlApp.install_if_needed.assert_any_call(None)
         # We don't need to make sure the exact contents are there
         dbaas.MySqlApp.secure.assert_any_call(None)
@@ -49,6 +49,7 @@
 # the logo is not reasonably feasible for technical reasons.
 
 import glob
+import time
 
 import mock
 from oslo_utils import netutils
@@ -260,6 +261,8 @@ class GuestAgentOracleBackupTest(trove_testtools.TestCase):
             "rman TARGET %(admin_user)s/%(admin_pswd)s <<EOF\n"
             "run {\n"
             "configure backup optimization on;\n"
+            "configure device type disk parallelism 4 "
+            "backup type to compressed backupset;\n"
             "configure channel device type disk format "
             "'/u01/app/oracle/oradata/backupset_files/%(dbname)s/"
             "%%I_%%u_%%s_%(filename)s.dat';\n"
@@ -278,6 +281,12 @@ class GuestAgentOracleBackupTest(trove_testtools.TestCase):
             run_as_root=True, root_helper='sudo', shell=True,
             timeout=cfg.CONF.restore_usage_timeout)
 
+    def test_backup_not_zipped(self):
+        backup = self._instantiate_backup(self.backup_module.RmanBackup)
+        self.assertNotIn('gzip', backup.command)
+        self.assertTrue(backup.command.startswith('sudo tar cPf - '))
+        self.assertFalse(backup.manifest.endswith('.gz'))
+
     @mock.patch.object(utils, 'execute_with_timeout')
     def test_truncate_backup_chain(self, mock_exec):
         inc_backup = self._instantiate_backup(
@@ -363,6 +372,7 @@ class GuestAgentOracleRestoreTest(trove_testtools.TestCase):
             "startup nomount;\n"
             "restore controlfile from '%(ctl_file)s';\n"
             "startup mount;\n"
+            "configure device type disk parallelism 4;\n"
             "crosscheck backup;\n"
             "delete noprompt expired backup;\n"
             "restore database;\n"
@@ -416,6 +426,25 @@ class GuestAgentOracleRestoreTest(trove_testtools.TestCase):
             run_as_root=True, root_helper='sudo', shell=True,
             timeout=cfg.CONF.oracle.usage_timeout)
 
+    def test_unpack_incremental_chain(self):
+        restore = self._instantiate_restore(
+            self.restore_module.RmanBackupIncremental)
+        restore.storage = mock.MagicMock()
+        restore.storage.load_metadata.side_effect = [
+            {'parent_location': 'swift/full.gz.enc',
+             'parent_checksum': 'md5-1'},
+            {}]
+        restore._unpack = mock.MagicMock(return_value=10)
+
+        restore._unpack_backup_files('swift/incremental.enc', 'md5-2')
+
+        restore._unpack.assert_has_calls([
+            mock.call('swift/full.gz.enc', 'md5-1',
+                      restore.decrypt_cmd + 'gzip -d -c | sudo tar xPf -'),
+            mock.call('swift/incremental.enc', 'md5-2',
+                      restore.decrypt_cmd + 'sudo tar xPf -')])
+        self.assertEqual(20, restore.content_length)
+
     @mock.patch.object(operating_system, 'read_file')
     @mock.patch.object(operating_system, 'write_file')
     @mock.patch.object(operating_system, 'chown')
@@ -841,3 +870,110 @@ class GuestAgentOracleReplicationTest(trove_testtools.TestCase):
             self.service, cursor,
             {'LOG_ARCHIVE_CONFIG': "''", 'FAL_SERVER': "''"})
 
+
+class OracleSessionPoolTest(trove_testtools.TestCase):
+
+    class DatabaseError(Exception):
+        pass
+
+    def setUp(self):
+        super(OracleSessionPoolTest, self).setUp()
+        # A stub of the cx_Oracle driver that counts logons.
+        self.driver = mock.MagicMock(SYSDBA=2, PRELIM_AUTH=8,
+                                     DatabaseError=self.DatabaseError)
+        self.driver.connect.side_effect = (
+            lambda **kwargs: mock.MagicMock(name='session'))
+        self.oracle_patch = mock.patch.dict('sys.modules',
+                                            {'cx_Oracle': self.driver})
+        self.addCleanup(self.oracle_patch.stop)
+        self.oracle_patch.start()
+        import trove.guestagent.datastore.oracle_common.service as service
+        self.service = service
+        driver_patch = mock.patch.object(service, 'cx_Oracle', self.driver)
+        driver_patch.start()
+        self.addCleanup(driver_patch.stop)
+        pool_patch = mock.patch.object(service, 'SESSION_POOL',
+                                       service.OracleSessionPool())
+        self.pool = pool_patch.start()
+        self.addCleanup(pool_patch.stop)
+
+    def _client(self, cls=None, user_id='os_admin', mode=2):
+        cls = cls or self.service.OracleClient
+        return cls('orcl', '/u01/app/oracle', 'localhost', 1521,
+                   user_id, 'password', False, mode)
+
+    def test_sessions_reused(self):
+        for index in range(100):
+            with self._client(self.service.OracleCursor) as cursor:
+                cursor.execute('SELECT OPEN_MODE FROM V$DATABASE')
+        self.assertEqual(1, self.driver.connect.call_count)
+        self.assertEqual(100, cursor.close.call_count)
+
+    def test_concurrent_clients(self):
+        with self._client() as conn1:
+            with self._client() as conn2:
+                self.assertIsNot(conn1, conn2)
+        with self._client() as conn3:
+            self.assertIn(conn3, (conn1, conn2))
+        self.assertEqual(2, self.driver.connect.call_count)
+
+    def test_sessions_per_user(self):
+        with self._client(user_id='sys') as sys_conn:
+            pass
+        with self._client() as conn:
+            self.assertIsNot(sys_conn, conn)
+        self.assertEqual(2, self.driver.connect.call_count)
+
+    def test_stale_session_replaced(self):
+        with self._client() as conn:
+            pass
+        conn.ping.side_effect = self.DatabaseError()
+        with self._client() as new_conn:
+            self.assertIsNot(conn, new_conn)
+        conn.close.assert_called_once_with()
+
+    def test_idle_session_expired(self):
+        with self._client() as conn:
+            pass
+        with mock.patch.object(self.service.time, 'time',
+                               return_value=time.time() + 3600):
+            with self._client() as new_conn:
+                self.assertIsNot(conn, new_conn)
+        conn.close.assert_called_once_with()
+        self.assertFalse(conn.ping.called)
+
+    def test_failed_session_discarded(self):
+        def _fail():
+            with self._client() as conn:
+                conn.rollback.side_effect = self.DatabaseError()
+                raise self.DatabaseError()
+        self.assertRaises(self.DatabaseError, _fail)
+        self.assertEqual({}, dict((key, sessions) for key, sessions
+                                  in self.pool._idle.items() if sessions))
+
+    def test_prelim_auth_not_pooled(self):
+        for index in range(2):
+            with self._client(mode=2 | 8) as conn:
+                pass
+            conn.close.assert_called_once_with()
+        self.assertEqual(2, self.driver.connect.call_count)
+        self.assertEqual({}, self.pool._idle)
+
+    def test_max_idle_sessions(self):
+        clients = [self._client() for index in range(6)]
+        conns = [client.__enter__() for client in clients]
+        for client in clients:
+            client.__exit__(None, None, None)
+        self.assertEqual(self.service.MAX_IDLE_SESSIONS,
+                         len(list(self.pool._idle.values())[0]))
+        self.assertEqual(6 - self.service.MAX_IDLE_SESSIONS,
+                         len([conn for conn in conns if conn.close.called]))
+
+    def test_clear(self):
+        with self._client() as conn:
+            pass
+        self.pool.clear()
+        conn.close.assert_called_once_with()
+        with self._client():
+            pass
+        self.assertEqual(2, self.driver.connect.call_count)
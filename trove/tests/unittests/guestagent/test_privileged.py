@@ -0,0 +1,171 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from mock import MagicMock
+from mock import patch
+
+from trove.common import exception
+from trove.common.stream_codecs import JsonCodec
+from trove.common import utils
+from trove.guestagent.common import operating_system
+from trove.guestagent.common import privileged
+from trove.tests.unittests import trove_testtools
+
+
+class PrivilegedHelperTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(PrivilegedHelperTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        # Run the helper without sudo.
+        self.helper = privileged.PrivilegedHelper(
+            command=[sys.executable, '-m', privileged.__name__])
+        self.addCleanup(self.helper.stop)
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir, name)
+
+    def _serve(self, *requests):
+        replies = io.BytesIO()
+        privileged.serve(io.BytesIO(b''.join(
+            json.dumps(request).encode('ascii') + b'\n'
+            for request in requests)), replies)
+        return [json.loads(line) for line in
+                replies.getvalue().splitlines()]
+
+    def test_serve_allowlist(self):
+        replies = self._serve(
+            {'op': 'exists', 'args': {'path': self.tmpdir,
+                                      'is_directory': True}},
+            {'op': 'execute', 'args': {'cmd': 'usermod',
+                                       'args': ['-a', 'user']}},
+            {'op': 'execute', 'args': {'cmd': 'rm', 'args': [1]}},
+            {'op': 'eval', 'args': {'expression': '1'}},
+            {'op': 'read', 'args': {'path': self.tmpdir, 'mode': 'w'}})
+        self.assertEqual({'result': True}, replies[0])
+        self.assertEqual(['ValueError', 'ValueError', 'KeyError',
+                          'TypeError'],
+                         [reply['error'].split(':')[0]
+                          for reply in replies[1:]])
+
+    def test_serve_find_options(self):
+        replies = self._serve(*[
+            {'op': 'execute', 'args': {'cmd': 'find', 'args': args}}
+            for args in ([self.tmpdir, '-noleaf', '-maxdepth', '0',
+                          '-type', 'f', '-regextype', 'posix-extended',
+                          '-regex', '.*/x$'],
+                         [self.tmpdir, '-exec', 'touch', self._path('x'),
+                          ';'],
+                         [self.tmpdir, '-delete'],
+                         [self.tmpdir, '-fprint', self._path('x')],
+                         ['-exec', 'true', ';'],
+                         [self.tmpdir, '-maxdepth'])])
+        self.assertEqual(0, replies[0]['result']['exit_code'])
+        self.assertEqual(['ValueError'] * 5,
+                         [reply['error'].split(':')[0]
+                          for reply in replies[1:]])
+        self.assertFalse(os.path.exists(self._path('x')))
+
+    def test_file_operations(self):
+        path = self._path('file')
+        with patch.object(privileged.green_subprocess, 'Popen',
+                          wraps=privileged.green_subprocess.Popen) as popen:
+            self.assertFalse(self.helper.exists(path))
+            self.helper.write_file(path, b'\x00data\n')
+            self.assertTrue(self.helper.exists(path))
+            self.assertFalse(self.helper.exists(path, is_directory=True))
+            self.assertEqual(b'\x00data\n', self.helper.read_file(path))
+            self.helper.execute('mkdir', '-p', self._path('dir'))
+            self.helper.execute('mv', path, self._path('dir'))
+            stdout, _ = self.helper.execute('find', self.tmpdir, '-type', 'f')
+            self.assertEqual(self._path('dir/file'), stdout.strip())
+        # All the operations were served by one helper process.
+        self.assertEqual(1, popen.call_count)
+
+    def test_errors(self):
+        error = self.assertRaises(exception.ProcessExecutionError,
+                                  self.helper.execute, 'rm', self._path('x'))
+        self.assertEqual(1, error.exit_code)
+        self.assertIn('rm', error.cmd)
+        self.assertRaises(exception.ProcessExecutionError,
+                          self.helper.read_file, self._path('x'))
+        self.assertRaises(exception.ProcessExecutionError,
+                          self.helper.execute, 'usermod', '-a', 'user')
+
+        # The helper is started again once it exits.
+        self.helper.stop()
+        self.assertTrue(self.helper.exists(self.tmpdir, is_directory=True))
+
+    def test_get_helper(self):
+        self.assertIsNone(privileged.get_helper())
+        self.patch_conf_property('guest_privileged_helper', True)
+        with patch.object(privileged, '_helper', None):
+            helper = privileged.get_helper()
+            self.assertIsInstance(helper, privileged.PrivilegedHelper)
+            self.assertIs(helper, privileged.get_helper())
+
+
+class OperatingSystemHelperTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(OperatingSystemHelperTest, self).setUp()
+        self.helper = MagicMock()
+        self.helper.execute.return_value = ('', '')
+        helper_patch = patch.object(privileged, 'get_helper',
+                                    return_value=self.helper)
+        helper_patch.start()
+        self.addCleanup(helper_patch.stop)
+        execute_patch = patch.object(utils, 'execute_with_timeout',
+                                     return_value=('', ''))
+        self.mock_execute = execute_patch.start()
+        self.addCleanup(execute_patch.stop)
+
+    def test_file_operations(self):
+        operating_system.write_file('/path', {'key': 'value'},
+                                    codec=JsonCodec(), as_root=True)
+        self.helper.write_file.assert_called_once_with(
+            '/path', JsonCodec().serialize({'key': 'value'}))
+
+        self.helper.read_file.return_value = '{"key": "value"}'
+        self.assertEqual({'key': 'value'}, operating_system.read_file(
+            '/path', codec=JsonCodec(), as_root=True))
+        self.helper.exists.assert_called_once_with('/path',
+                                                   is_directory=False)
+
+        operating_system.chown('/path', 'user', 'group', as_root=True)
+        operating_system.copy('/path', '/copy', force=True, as_root=True,
+                              timeout=60)
+        self.assertEqual(
+            [(('chown', '-R', 'user:group', '/path'), {'timeout': 30}),
+             (('cp', '-f', '-R', '/path', '/copy'), {'timeout': 60})],
+            self.helper.execute.call_args_list)
+        self.assertFalse(self.mock_execute.called)
+
+    def test_other_commands(self):
+        operating_system.change_user_group('user', 'group', as_root=True)
+        self.mock_execute.assert_called_once_with(
+            'usermod', '-a', '-G', 'group', 'user', run_as_root=True,
+            root_helper='sudo')
+        operating_system.chown('/path', 'user', 'group')
+        self.assertFalse(self.helper.execute.called)
@@ -0,0 +1,145 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+from mock import Mock
+from mock import patch
+import six
+
+from trove.common import exception
+from trove.guestagent.datastore.experimental.postgresql import (
+    manager as pg_manager)
+from trove.guestagent.strategies.replication import progress
+from trove.tests.unittests import trove_testtools
+
+
+UUID1 = '3e11fa47-71ca-11e1-9e33-c80aa9429562'
+UUID2 = 'b1f3f33a-0789-ee1c-43f3-f8373e12f1ea'
+
+
+class ReplicationPositionTest(trove_testtools.TestCase):
+
+    def test_lsn_to_int(self):
+        self.assertEqual(0, progress.lsn_to_int(None))
+        self.assertEqual(0x9000000, progress.lsn_to_int('0/9000000'))
+        self.assertEqual((0x16 << 32) + 0xB374D848,
+                         progress.lsn_to_int('16/B374D848'))
+
+    def test_lsn_compared_numerically(self):
+        # As strings '0/9...' sorts after '0/10...'.
+        self.assertEqual(0x10000000 - 0x9000000,
+                         progress.lsn_lag('0/9000000', '0/10000000'))
+        self.assertEqual(0, progress.lsn_lag('0/10000000', '0/9000000'))
+        self.assertEqual(0x100000000 - 0xFFFFFF00,
+                         progress.lsn_lag('0/FFFFFF00', '1/0'))
+
+    def test_offset_lag(self):
+        self.assertEqual(99, progress.offset_lag(100, 199))
+        self.assertEqual(0, progress.offset_lag(200, 199))
+        self.assertEqual(199, progress.offset_lag(None, 199))
+
+    def test_parse_gtid_set(self):
+        self.assertEqual(
+            {UUID1.lower(): [(1, 5), (7, 7)], UUID2: [(1, 20)]},
+            progress.parse_gtid_set('%s:1-5:7,\n%s:1-20'
+                                    % (UUID1.upper(), UUID2)))
+        self.assertEqual({}, progress.parse_gtid_set(''))
+
+    def test_gtid_lag(self):
+        target = '%s:1-10,%s:1-3' % (UUID1, UUID2)
+        self.assertEqual(13, progress.gtid_lag('', target))
+        self.assertEqual(9, progress.gtid_lag('%s:1-4' % UUID1, target))
+        self.assertEqual(3, progress.gtid_lag(
+            '%s:1-4:6-10,%s:2' % (UUID1, UUID2), target))
+        self.assertEqual(0, progress.gtid_lag(
+            '%s:1-12,%s:1-3' % (UUID1, UUID2), target))
+
+
+class WaitForCatchupTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(WaitForCatchupTest, self).setUp()
+        self.now = [1000.0]
+        # Patch the module reference only, other threads may be sleeping.
+        time_patch = patch.object(progress, 'time')
+        self.mock_time = time_patch.start()
+        self.addCleanup(time_patch.stop)
+        self.mock_time.time.side_effect = lambda: self.now[0]
+        self.mock_sleep = self.mock_time.sleep
+
+    def _lags(self, lags, step=1.0):
+        lags = list(lags)
+
+        def _get_lag():
+            self.now[0] += step
+            return lags.pop(0)
+        return _get_lag
+
+    def test_caught_up(self):
+        result = progress.wait_for_catchup(self._lags([0]))
+        self.assertEqual(0, result.lag)
+        self.assertFalse(self.mock_sleep.called)
+
+    def test_sleep_tightens_near_target(self):
+        progress.wait_for_catchup(
+            self._lags([4000, 3000, 2000, 1000, 100, 0]))
+        sleeps = [args[0] for args, _ in self.mock_sleep.call_args_list]
+        self.assertEqual([0.1, 1.5, 1.0, 0.5, 0.05],
+                         [round(sleep, 2) for sleep in sleeps])
+
+    def test_backoff_without_progress(self):
+        progress.wait_for_catchup(self._lags([10, 10, 10, 10, 0]))
+        sleeps = [args[0] for args, _ in self.mock_sleep.call_args_list]
+        self.assertEqual([0.1, 0.2, 0.4, 0.8],
+                         [round(sleep, 2) for sleep in sleeps])
+
+    def test_timeout(self):
+        self.assertRaises(exception.PollTimeOut, progress.wait_for_catchup,
+                          self._lags([10] * 10, step=5.0), time_out=20)
+
+    def test_seconds_behind(self):
+        tracker = progress.ReplicationProgress(
+            self._lags([1000, 800], step=2.0), 'bytes')
+        tracker.check()
+        self.assertIsNone(tracker.seconds_behind)
+        tracker.check()
+        self.assertEqual(100, tracker.rate)
+        self.assertEqual(8, tracker.seconds_behind)
+
+
+WAIT_FOR_TXN = six.get_unbound_function(pg_manager.Manager.wait_for_txn)
+
+
+class PostgresWaitForTxnTest(trove_testtools.TestCase):
+
+    @patch.object(progress, 'time')
+    def test_wait_for_txn(self, mock_time):
+        mock_time.time.return_value = 0
+        manager = Mock(app=Mock(spec=['pg_is_in_recovery',
+                                      'pg_last_xlog_replay_location']))
+        manager.app.pg_is_in_recovery.return_value = True
+        manager.app.pg_last_xlog_replay_location.side_effect = [
+            '0/9000000', '0/F000000', '0/10000000']
+        WAIT_FOR_TXN(manager, Mock(), '0/10000000')
+        self.assertEqual(
+            3, manager.app.pg_last_xlog_replay_location.call_count)
+
+    def test_wait_for_txn_timeout(self):
+        manager = Mock()
+        manager.app.pg_last_xlog_replay_location.return_value = '0/9000000'
+        with patch.object(progress, 'wait_for_catchup',
+                          side_effect=exception.PollTimeOut):
+            self.assertRaises(RuntimeError,
+                              WAIT_FOR_TXN, manager, Mock(), '0/10000000')
@@ -210,15 +210,12 @@ class GuestAgentManagerTest(DatastoreManagerTest):
         mock_pwd.return_value = password
         mock_isfile.return_value = True
         self.manager.app.add_udls()
-        mock_vsql.assert_any_call(
+        mock_vsql.assert_called_once_with(
             password,
-            "CREATE LIBRARY curllib AS "
-            "'/opt/vertica/sdk/examples/build/cURLLib.so'"
-        )
-        mock_vsql.assert_any_call(
-            password,
-            "CREATE SOURCE curl AS LANGUAGE 'C++' NAME 'CurlSourceFactory' "
-            "LIBRARY curllib"
+            ["CREATE LIBRARY curllib AS "
+             "'/opt/vertica/sdk/examples/build/cURLLib.so'",
+             "CREATE SOURCE curl AS LANGUAGE 'C++' NAME 'CurlSourceFactory' "
+             "LIBRARY curllib"]
         )
 
     @patch.object(volume.VolumeDevice, 'mount_points', return_value=[])
@@ -12,6 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import shutil
+import tempfile
+
 from mock import ANY, call, DEFAULT, patch, mock_open
 
 from trove.common import exception
@@ -34,11 +38,17 @@ class VolumeDeviceTest(trove_testtools.TestCase):
         self.ismount_patcher = patch.object(operating_system, 'is_mount')
         self.mock_ismount = self.ismount_patcher.start()
         self.addCleanup(self.ismount_patcher.stop)
+        self.home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home)
+        home_patcher = patch.dict(os.environ, {'HOME': self.home})
+        home_patcher.start()
+        self.addCleanup(home_patcher.stop)
 
     def tearDown(self):
         super(VolumeDeviceTest, self).tearDown()
 
     def test_migrate_data(self):
+        self.patch_conf_property('volume_migration_workers', 1)
         with patch.multiple(self.volumeDevice,
                             mount=DEFAULT, unmount=DEFAULT) as mocks:
             self.volumeDevice.migrate_data('/')
@@ -53,6 +63,98 @@ class VolumeDeviceTest(trove_testtools.TestCase):
             ]
             self.mock_exec.assert_has_calls(calls)
 
+    def _rsync_targets(self):
+        return sorted(args[-1] for args, kwargs in
+                      self.mock_exec.call_args_list if args[0] == 'rsync')
+
+    def _manifest(self):
+        return os.path.join(self.home, '.trove-migration.vdb')
+
+    def _execute(self, failed=()):
+        """Run the commands on a fake device: mkfs empties it, rsync copies
+        the directories of /src that are not in failed.
+        """
+        def _execute(*args, **kwargs):
+            if args[0] == 'find':
+                return 'a\nb\nc\n', ''
+            if args[0] == 'mkfs':
+                self.device_files.clear()
+            elif args[0] == 'rsync':
+                if args[-2].rstrip('/').split('/')[-1] in failed:
+                    raise exception.ProcessExecutionError()
+                self.device_files.add(args[-1])
+            return 'has_journal', ''
+        return _execute
+
+    def test_migrate_data_parallel(self):
+        self.mock_exec.side_effect = lambda *args, **kwargs: (
+            ('mysql\nperformance_schema\n', '') if args[0] == 'find'
+            else ('', ''))
+        with patch.multiple(self.volumeDevice,
+                            mount=DEFAULT, unmount=DEFAULT) as mocks:
+            self.volumeDevice.migrate_data('/var/lib/mysql',
+                                           target_subdir='data')
+            self.assertEqual(1, mocks['unmount'].call_count)
+        self.mock_exec.assert_any_call(
+            'rsync', '--safe-links', '--perms', '--dirs', '--owner',
+            '--group', '--xattrs', '--sparse', '/var/lib/mysql/',
+            '/mnt/volume/data', root_helper='sudo', run_as_root=True)
+        self.mock_exec.assert_any_call(
+            'rsync', '--safe-links', '--perms', '--recursive', '--owner',
+            '--group', '--xattrs', '--sparse', '/var/lib/mysql/mysql/',
+            '/mnt/volume/data/mysql', root_helper='sudo', run_as_root=True)
+        self.assertEqual(['/mnt/volume/data', '/mnt/volume/data/mysql',
+                          '/mnt/volume/data/performance_schema'],
+                         self._rsync_targets())
+        self.assertFalse(os.path.exists(self._manifest()))
+
+    @patch('trove.guestagent.volume.LOG')
+    def test_migrate_data_failure_records_manifest(self, mock_logging):
+        self.device_files = set()
+        self.mock_exec.side_effect = self._execute(failed=['b'])
+        with patch.multiple(self.volumeDevice,
+                            mount=DEFAULT, unmount=DEFAULT) as mocks:
+            self.assertRaises(exception.GuestError,
+                              self.volumeDevice.migrate_data, '/src')
+            self.assertFalse(mocks['unmount'].called)
+        self.assertEqual(4, len(self._rsync_targets()))
+        with open(self._manifest()) as manifest:
+            self.assertEqual('a\nc', manifest.read())
+
+    @patch('trove.guestagent.volume.LOG')
+    def test_prepare_resumes_migration(self, mock_logging):
+        self.device_files = set()
+
+        def _prepare(failed=()):
+            self.mock_exec.reset_mock()
+            self.mock_exec.side_effect = self._execute(failed=failed)
+            with patch.multiple(self.volumeDevice, mount=DEFAULT,
+                                unmount=DEFAULT, unmount_device=DEFAULT):
+                self.volumeDevice.unmount_device('/dev/vdb')
+                self.volumeDevice.format()
+                self.volumeDevice.migrate_data('/src', target_subdir='data')
+
+        # The first prepare formats the device, then fails to copy 'b'.
+        self.assertRaises(exception.GuestError, _prepare, failed=['b'])
+        self.assertIn('mkfs', [args[0] for args, kwargs in
+                               self.mock_exec.call_args_list])
+
+        # The retried prepare keeps the copied directories.
+        _prepare()
+        self.assertNotIn('mkfs', [args[0] for args, kwargs in
+                                  self.mock_exec.call_args_list])
+        self.assertEqual(['/mnt/volume/data', '/mnt/volume/data/b'],
+                         self._rsync_targets())
+        self.assertEqual({'/mnt/volume/data', '/mnt/volume/data/a',
+                          '/mnt/volume/data/b', '/mnt/volume/data/c'},
+                         self.device_files)
+        self.assertFalse(os.path.exists(self._manifest()))
+
+        # Without a partial migration the device is formatted again.
+        _prepare()
+        self.assertIn('mkfs', [args[0] for args, kwargs in
+                               self.mock_exec.call_args_list])
+
     def test__check_device_exists(self):
         self.volumeDevice._check_device_exists()
         self.assertEqual(1, self.mock_exec.call_count)
@@ -134,6 +236,48 @@ class VolumeDeviceTest(trove_testtools.TestCase):
             ]
             self.mock_exec.assert_has_calls(calls)
 
+    @patch.object(volume.os.path, 'exists', return_value=False)
+    def test_resize_fs_online(self, mock_exists):
+        self.mock_ismount.return_value = True
+        self.volumeDevice.resize_fs('/mnt/volume', online=True)
+        self.assertEqual(1, self.mock_ismount.call_count)
+        self.mock_exec.assert_has_calls([
+            call('blockdev', '--getsize64', '/dev/vdb', attempts=3,
+                 root_helper='sudo', run_as_root=True),
+            call('resize2fs', '/dev/vdb', root_helper='sudo',
+                 run_as_root=True)])
+        self.assertNotIn(call('tee', ANY, process_input='1',
+                              root_helper='sudo', run_as_root=True),
+                         self.mock_exec.call_args_list)
+        self.assertNotIn(call('e2fsck', '-f', '-p', '/dev/vdb',
+                              root_helper='sudo', run_as_root=True),
+                         self.mock_exec.call_args_list)
+
+    def test_resize_fs_online_xfs(self):
+        self.mock_ismount.return_value = True
+        self.patch_conf_property('volume_fstype', 'xfs')
+        self.volumeDevice.resize_fs('/mnt/volume', online=True)
+        self.mock_exec.assert_called_with(
+            'xfs_growfs', '/mnt/volume', root_helper='sudo', run_as_root=True)
+
+    def test_resize_fs_online_loop_device(self):
+        self.mock_ismount.return_value = True
+        loop_device = volume.VolumeDevice('/dev/loop0')
+        loop_device.resize_fs('/mnt/volume', online=True)
+        self.mock_exec.assert_has_calls([
+            call('losetup', '--set-capacity', '/dev/loop0',
+                 root_helper='sudo', run_as_root=True),
+            call('blockdev', '--getsize64', '/dev/loop0', attempts=3,
+                 root_helper='sudo', run_as_root=True),
+            call('resize2fs', '/dev/loop0', root_helper='sudo',
+                 run_as_root=True)])
+
+    def test_resize_fs_online_not_mounted(self):
+        self.mock_ismount.return_value = False
+        self.assertRaises(exception.GuestError,
+                          self.volumeDevice.resize_fs, '/mnt/volume',
+                          online=True)
+
     @patch.object(utils, 'execute',
                   side_effect=exception.ProcessExecutionError)
     @patch('trove.guestagent.volume.LOG')
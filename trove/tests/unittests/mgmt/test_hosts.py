@@ -0,0 +1,107 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+from mock import MagicMock
+from mock import Mock
+from mock import patch
+
+from trove.common import exception
+from trove.common.instance import ServiceStatuses
+from trove.extensions.mgmt.host import models
+from trove.instance.models import DBInstance
+from trove.instance.models import InstanceServiceStatus
+from trove.instance.tasks import InstanceTasks
+from trove.tests.unittests import trove_testtools
+from trove.tests.unittests.util import util
+
+
+class DetailedHostTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(DetailedHostTest, self).setUp()
+        util.init_db()
+        self.db_infos = [
+            DBInstance(InstanceTasks.NONE, id='inst-%d' % index,
+                       tenant_id='tenant',
+                       compute_instance_id='server-%d' % index,
+                       datastore_version_id='dsv-%d' % (index % 2),
+                       deleted=False)
+            for index in range(80)]
+        self.statuses = [
+            InstanceServiceStatus(ServiceStatuses.RUNNING,
+                                  instance_id=db_info.id)
+            for db_info in self.db_infos]
+        self.host_info = Mock(percentUsed=50, totalRAM=1024, usedRAM=512,
+                              instances=[{'uuid': 'server-%d' % index}
+                                         for index in range(80)] +
+                              [{'uuid': 'unknown'}])
+        self.host_info.name = 'host'
+
+        patches = [
+            patch.object(models.DBInstance, 'find_by_filter',
+                         return_value=self.db_infos),
+            patch.object(models.InstanceServiceStatus, 'find_by_filter',
+                         return_value=self.statuses),
+            patch.object(models.datastore_models.DatastoreVersion,
+                         'load_by_uuid'),
+            patch.object(models.datastore_models.Datastore, 'load'),
+            patch.object(models, 'LOG'),
+        ]
+        (self.mock_find_instances, self.mock_find_statuses,
+         self.mock_load_version, self.mock_load_datastore,
+         self.mock_logging) = [p.start() for p in patches]
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def test_load_host(self):
+        host = models.DetailedHost(self.host_info)
+        self.assertEqual(1, self.mock_find_instances.call_count)
+        self.assertEqual(1, self.mock_find_statuses.call_count)
+        self.assertEqual(2, self.mock_load_version.call_count)
+        self.assertEqual(2, self.mock_load_datastore.call_count)
+        self.assertEqual('inst-42', host.instances[42]['id'])
+        self.assertEqual('server-42', host.instances[42]['server_id'])
+        self.assertEqual('tenant', host.instances[42]['tenant_id'])
+        self.assertEqual('ACTIVE', host.instances[42]['status'])
+        self.assertIsNone(host.instances[80]['id'])
+
+    def test_load_host_missing_status(self):
+        del self.statuses[3]
+        host = models.DetailedHost(self.host_info)
+        self.assertIsNone(host.instances[3]['id'])
+        self.assertNotIn('status', host.instances[3])
+        self.assertEqual('ACTIVE', host.instances[4]['status'])
+
+    @patch.object(models, 'create_guest_client')
+    def test_update_all(self, mock_client):
+        self.patch_conf_property('host_update_workers', 4)
+        host = models.DetailedHost(self.host_info)
+        host.instances = host.instances[:10]
+        clients = {}
+
+        def _client(context, instance_id):
+            client = MagicMock()
+            if instance_id in ('inst-2', 'inst-7'):
+                client.update_guest.side_effect = exception.TroveError()
+            clients[instance_id] = client
+            return client
+        mock_client.side_effect = _client
+        error = self.assertRaises(exception.UpdateGuestError,
+                                  host.update_all, Mock())
+        self.assertIn("['inst-2', 'inst-7']", str(error))
+        self.assertEqual(10, len(clients))
+        for client in clients.values():
+            client.update_guest.assert_called_once_with()
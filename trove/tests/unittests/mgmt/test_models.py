@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 #
+from datetime import datetime
 import uuid
 
 from mock import MagicMock, patch, ANY
@@ -401,6 +402,124 @@ class TestMgmtInstanceTasks(MockMgmtInstanceTest):
         self.addCleanup(self.do_cleanup, instance, service_status)
 
 
+class TestExistsEvents(MockMgmtInstanceTest):
+
+    def setUp(self):
+        super(TestExistsEvents, self).setUp()
+        self.tenant_id = str(uuid.uuid4())
+        servers = []
+        for index in range(100):
+            instance, service_status = self.build_db_instance(
+                rd_instance.ServiceStatuses.RUNNING.api_status)
+            instance.tenant_id = self.tenant_id
+            instance.compute_instance_id = 'server-%s' % instance.id
+            instance.save()
+            self.addCleanup(self.do_cleanup, instance, service_status)
+            servers.append(MagicMock(id=instance.compute_instance_id,
+                                     status='ACTIVE', addresses={},
+                                     user_id='test_user_id'))
+        # An instance without a service status yet is left out.
+        instance = DBInstance.create(
+            name='new', tenant_id=self.tenant_id,
+            task_status=InstanceTasks.BUILDING,
+            datastore_version_id=self.version.id)
+        self.addCleanup(instance.delete)
+        self.server_mgr.list.return_value = servers
+        flavor = MagicMock(spec=Flavor)
+        flavor.id = 'flavor_1'
+        flavor.name = 'db.small'
+        self.flavor_mgr.list.return_value = [flavor]
+
+        patches = [
+            patch.object(InstanceServiceStatus, 'find_by'),
+            patch.object(datastore_models.DatastoreVersion, 'load_by_uuid',
+                         wraps=datastore_models.DatastoreVersion.load_by_uuid)]
+        self.mock_find_status, self.mock_load_version = [
+            p.start() for p in patches]
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def _payloads(self, transformer):
+        return [payload for payload in transformer()
+                if payload['tenant_id'] == self.tenant_id]
+
+    def _assert_bulk_loaded(self):
+        # The statuses came from the joined query and the datastore version
+        # was loaded once for all the instances.
+        self.assertFalse(self.mock_find_status.called)
+        self.assertEqual(1, self.mock_load_version.call_args_list.count(
+            ((self.version.id,), {})))
+
+    def test_transformer(self):
+        payloads = self._payloads(
+            mgmtmodels.NotificationTransformer(context=self.context))
+        self.assertEqual(100, len(payloads))
+        self.assertEqual({'123'}, set(payload['service_id']
+                                      for payload in payloads))
+        self._assert_bulk_loaded()
+
+    def test_nova_transformer(self):
+        payloads = self._payloads(
+            mgmtmodels.NovaNotificationTransformer(context=self.context))
+        self.assertEqual(100, len(payloads))
+        self.assertEqual({('db.small', 'test_user_id', 'active')},
+                         set((payload['instance_type'], payload['user_id'],
+                              payload['state']) for payload in payloads))
+        self._assert_bulk_loaded()
+        # The flavors were listed once, instead of looked up one at a time.
+        self.flavor_mgr.list.assert_called_once_with(is_public=None)
+        self.assertFalse(self.flavor_mgr.get.called)
+        self.assertEqual(1, self.server_mgr.list.call_count)
+
+    def _add_excluded_instances(self):
+        """Add a deleted and a clustered instance, both with a service
+        status and a server, and return their ids.
+        """
+        servers = self.server_mgr.list.return_value
+        excluded = []
+        for index in range(2):
+            instance, service_status = self.build_db_instance(
+                rd_instance.ServiceStatuses.RUNNING.api_status)
+            instance.tenant_id = self.tenant_id
+            instance.compute_instance_id = 'server-%s' % instance.id
+            instance.save()
+            self.addCleanup(self.do_cleanup, instance, service_status)
+            servers.append(MagicMock(id=instance.compute_instance_id,
+                                     status='ACTIVE', addresses={},
+                                     user_id='test_user_id'))
+            excluded.append(instance)
+        excluded[0].update(deleted=True, deleted_at=datetime.utcnow())
+        excluded[1].update(cluster_id='cluster-id')
+        return [excluded_instance.id for excluded_instance in excluded]
+
+    def test_transformer_skips_deleted(self):
+        deleted_id, clustered_id = self._add_excluded_instances()
+        instance_ids = [payload['instance_id'] for payload in self._payloads(
+            mgmtmodels.NotificationTransformer(context=self.context))]
+        self.assertEqual(101, len(instance_ids))
+        self.assertNotIn(deleted_id, instance_ids)
+        # As before, the exists events include the cluster members.
+        self.assertIn(clustered_id, instance_ids)
+
+    def test_nova_transformer_skips_deleted_and_clustered(self):
+        excluded_ids = self._add_excluded_instances()
+        instance_ids = [payload['instance_id'] for payload in self._payloads(
+            mgmtmodels.NovaNotificationTransformer(context=self.context))]
+        self.assertEqual(100, len(instance_ids))
+        for instance_id in excluded_ids:
+            self.assertNotIn(instance_id, instance_ids)
+
+    def test_publish_exist_events(self):
+        self.patch_conf_property('exists_notification_batch_size', 10)
+        transformer = MagicMock(return_value=[{}] * 25)
+        notifier = MagicMock()
+        with patch.object(rpc, 'get_notifier', return_value=notifier):
+            with patch.object(mgmtmodels.greenthread, 'sleep') as mock_sleep:
+                mgmtmodels.publish_exist_events(transformer, self.context)
+        self.assertEqual(25, notifier.info.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+
+
 class TestMgmtInstanceDeleted(MockMgmtInstanceTest):
 
     def test_show_deleted_mgmt_instances(self):
@@ -458,3 +577,65 @@ class TestMgmtInstancePing(MockMgmtInstanceTest):
                 self.assertTrue(mgmt_instance.rpc_ping())
 
         self.addCleanup(self.do_cleanup, instance, service_status)
+
+
+class TestMgmtInstancesPage(MockMgmtInstanceTest):
+
+    def setUp(self):
+        super(TestMgmtInstancesPage, self).setUp()
+        self.tenant_id = str(uuid.uuid4())
+        self.instances = []
+        for index in range(3):
+            instance, service_status = self.build_db_instance(
+                rd_instance.ServiceStatuses.RUNNING.api_status)
+            instance.tenant_id = self.tenant_id
+            instance.compute_instance_id = 'server-%s' % instance.id
+            instance.save()
+            self.addCleanup(self.do_cleanup, instance, service_status)
+            self.instances.append((instance, service_status))
+        self.instances.sort(key=lambda pair: pair[0].id)
+        self.server_mgr.get.side_effect = lambda server_id: MagicMock(
+            id=server_id, status='ACTIVE', addresses={})
+
+    def _load_page(self, **kwargs):
+        return mgmtmodels.load_mgmt_instances_page(
+            self.context, tenant_id=self.tenant_id, client=self.client,
+            **kwargs)
+
+    def test_load_page(self):
+        instances, marker = self._load_page(limit=2)
+        self.assertEqual([pair[0].id for pair in self.instances[:2]],
+                         [instance.id for instance in instances])
+        self.assertEqual(self.instances[1][0].id, marker)
+        self.assertEqual(2, self.server_mgr.get.call_count)
+        self.assertFalse(self.server_mgr.list.called)
+        self.assertEqual('ACTIVE', instances[0].status)
+        self.assertIsNotNone(instances[0].server)
+
+        instances, marker = self._load_page(limit=2, marker=marker)
+        self.assertEqual([self.instances[2][0].id],
+                         [instance.id for instance in instances])
+        self.assertIsNone(marker)
+
+    def test_load_page_filter_status(self):
+        instance, service_status = self.instances[1]
+        service_status.set_status(rd_instance.ServiceStatuses.SHUTDOWN)
+        service_status.save()
+        instances, marker = self._load_page(status='shutdown')
+        self.assertEqual([instance.id], [inst.id for inst in instances])
+
+    def test_load_page_filter_datastore(self):
+        instances, marker = self._load_page(datastore=self.datastore.name)
+        self.assertEqual(3, len(instances))
+        self.assertRaises(exception.DatastoreNotFound, self._load_page,
+                          datastore='unknown')
+
+    def test_load_page_filter_host(self):
+        instance = self.instances[2][0]
+        self.server_mgr.list.return_value = [MagicMock(
+            id=instance.compute_instance_id, status='ACTIVE', addresses={})]
+        instances, marker = self._load_page(host='host-1')
+        self.assertEqual([instance.id], [inst.id for inst in instances])
+        self.server_mgr.list.assert_called_once_with(
+            search_opts={'all_tenants': 1, 'host': 'host-1'})
+        self.assertFalse(self.server_mgr.get.called)
@@ -15,11 +15,17 @@
 
 import datetime as dt
 import mock
+import random
 
 from testtools import matchers
 
 from trove.common import cfg
 from trove.common import exception
+from trove.common import utils
+from trove.datastore.models import DBDatastoreVersion
+from trove.db import get_db_api
+from trove.instance.models import DBInstance
+from trove.instance.tasks import InstanceTasks
 from trove.report import usage_report
 from trove.tests.unittests import trove_testtools
 from trove.tests.unittests.util import util
@@ -172,10 +178,12 @@ class UsageReportTest(trove_testtools.TestCase):
 
     @mock.patch.object(usage_report, '_generate_csv_file')
     @mock.patch.object(usage_report, 'process_data')
+    @mock.patch.object(usage_report, '_query_active_counts',
+                       return_value={})
     @mock.patch.object(usage_report, '_run_query')
     @mock.patch.object(usage_report, '_get_current_date')
-    def test_date_parameters(self, mock_end_date, mock_query, mock_process,
-                             mock_gen_csv):
+    def test_date_parameters(self, mock_end_date, mock_query, mock_counts,
+                             mock_process, mock_gen_csv):
         mock_end_date.return_value = dt.datetime(2016, 8, 5)
 
         start_date = '2016-08-02'
@@ -199,7 +207,8 @@ class UsageReportTest(trove_testtools.TestCase):
         end_date = '2016-08-05'
         end_date_d = dt.datetime.strptime(end_date, '%Y-%m-%d').date()
         usage_report.usage_report(start_date, end_date, "nofile")
-        mock_process.assert_called_once_with(list(), start_date_d, end_date_d)
+        mock_process.assert_called_once_with(list(), start_date_d, end_date_d,
+                                             active_counts={})
         self.assertTrue(mock_gen_csv.called)
         mock_process.reset_mock()
         mock_gen_csv.reset_mock()
@@ -207,11 +216,24 @@ class UsageReportTest(trove_testtools.TestCase):
         # end date = start date
         usage_report.usage_report(start_date, start_date, "nofile")
         mock_process.assert_called_once_with(list(), start_date_d,
-                                             start_date_d)
+                                             start_date_d, active_counts={})
         self.assertTrue(mock_gen_csv.called)
         mock_process.reset_mock()
         mock_gen_csv.reset_mock()
 
+    def test_process_data_active_counts(self):
+        start_date = dt.date(2016, 8, 2)
+        end_date = dt.date(2016, 8, 3)
+        events = [MockEvent(dt.datetime(2016, 8, 2, 6), 1, '1'),
+                  MockEvent(dt.datetime(2016, 8, 3, 6), 0, '2')]
+
+        (daily, overall) = usage_report.process_data(
+            events, start_date, end_date, active_counts={'1': 3, '2': 1})
+
+        self.assertEqual([4, 4], [day.get_hwm() for day in daily])
+        self.assertEqual({'mgr1_v1': 2, 'mgr2_v2': 2}, daily[1].to_dict())
+        self.assertEqual(4, overall.get_hwm())
+
     def _generate_mock_events(self, event_date, is_deleted):
         # give event_date an arbitrary time component
         event_date = dt.datetime.combine(event_date, dt.time(hour=6))
@@ -237,3 +259,83 @@ class UsageReportTest(trove_testtools.TestCase):
                         "Overall high watermark of %d doesn't match "
                         "expected result %d" %
                         (overall.get_hwm(), test_results.get_overall_hwm()))
+
+
+class UsageReportQueryTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(UsageReportQueryTest, self).setUp()
+        util.init_db()
+        db_api = get_db_api()
+        dsvs = []
+        for name in ('v1', 'v2'):
+            dsv = DBDatastoreVersion.create(
+                datastore_id=utils.generate_uuid(), name=name,
+                manager='mgr', image_id='image', packages='', active=1)
+            self.addCleanup(db_api.delete, dsv)
+            dsvs.append(dsv)
+        dsvs_patch = mock.patch.object(usage_report, 'DSVS', dsvs)
+        dsvs_patch.start()
+        self.addCleanup(dsvs_patch.stop)
+
+        # Instances created and deleted at distinct times over three months.
+        rand = random.Random(4)
+        self.instances = []
+        first = dt.datetime(2010, 1, 1)
+        for index, minute in enumerate(
+                rand.sample(range(90 * 24 * 60), 300)):
+            created = first + dt.timedelta(minutes=minute)
+            deleted_at = None
+            if index % 2:
+                deleted_at = created + dt.timedelta(
+                    minutes=rand.randint(1, 40 * 24 * 60), seconds=30)
+            db_info = DBInstance.create(
+                name='instance%d' % index, tenant_id='tenant',
+                task_status=InstanceTasks.NONE, created=created,
+                datastore_version_id=rand.choice(dsvs).id)
+            self.addCleanup(db_api.delete, db_info)
+            if deleted_at:
+                db_info.update(deleted=True, deleted_at=deleted_at)
+            self.instances.append(db_info)
+
+        self.start = dt.datetime(2010, 2, 1)
+        self.end = dt.datetime(2010, 2, 28, 23, 59, 59)
+
+    def _all_events(self):
+        """Build the events of every instance, before and in the period."""
+        events = []
+        for db_info in self.instances:
+            deleted_at = db_info.deleted_at
+            if db_info.created < self.end and (
+                    deleted_at is None or deleted_at >= self.start):
+                events.append(MockEvent(db_info.created, 0,
+                                        db_info.datastore_version_id))
+            if deleted_at and self.start <= deleted_at <= self.end:
+                events.append(MockEvent(deleted_at, 1,
+                                        db_info.datastore_version_id))
+        return sorted(events, key=lambda event: event.timestamp)
+
+    def test_query(self):
+        active_counts = usage_report._query_active_counts(self.start)
+        events = list(usage_report._run_query(self.start, self.end))
+
+        # Only the events of the period are read.
+        all_events = self._all_events()
+        self.assertEqual(len(all_events) - sum(active_counts.values()),
+                         len(events))
+        self.assertTrue(all(self.start <= event.timestamp <= self.end
+                            for event in events))
+
+        (daily, overall) = usage_report.process_data(
+            events, self.start.date(), self.end.date(),
+            active_counts=active_counts)
+        (expected_daily, expected_overall) = usage_report.process_data(
+            all_events, self.start.date(), self.end.date())
+
+        self.assertEqual(28, len(daily))
+        self.assertEqual([(day.get_date(), day.get_hwm(), day.to_dict())
+                          for day in expected_daily],
+                         [(day.get_date(), day.get_hwm(), day.to_dict())
+                          for day in daily])
+        self.assertEqual(expected_overall.get_hwm(), overall.get_hwm())
+        self.assertEqual(expected_overall.to_dict(), overall.to_dict())
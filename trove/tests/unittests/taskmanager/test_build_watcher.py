@@ -0,0 +1,142 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+from eventlet import greenthread
+from mock import Mock
+from mock import patch
+import six
+
+from trove.common import exception
+from trove.common.instance import ServiceStatuses
+from trove.instance.models import InstanceStatus
+from trove.taskmanager import build_watcher
+from trove.taskmanager import models as taskmanager_models
+from trove.tests.unittests import trove_testtools
+from trove.tests.unittests.util import util
+
+
+class FakeInstance(object):
+
+    check_service_status = six.get_unbound_function(
+        taskmanager_models.FreshInstanceTasks.check_service_status)
+    check_server_status = six.get_unbound_function(
+        taskmanager_models.FreshInstanceTasks.check_server_status)
+
+    def __init__(self, db_info, nova_client):
+        self.id = db_info.id
+        self.tenant_id = db_info.tenant_id
+        self.db_info = db_info
+        self.nova_client = nova_client
+
+
+class BuildWatcherTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(BuildWatcherTest, self).setUp()
+        util.init_db()
+        self.watcher = build_watcher.BuildWatcher(0)
+        self.statuses = {}
+        self.servers = {}
+        self.nova_client = Mock()
+        self.nova_client.servers.list.side_effect = (
+            lambda limit=None: list(self.servers.values()))
+        find_patch = patch.object(
+            build_watcher.InstanceServiceStatus, 'find_by_filter',
+            side_effect=lambda filters: [
+                Mock(instance_id=instance_id,
+                     get_status=Mock(return_value=status))
+                for instance_id, status in self.statuses.items()])
+        self.mock_find = find_patch.start()
+        self.addCleanup(find_patch.stop)
+
+    def _instance(self, index, status=ServiceStatuses.BUILDING,
+                  server_status=InstanceStatus.BUILD, tenant_id='tenant'):
+        instance = FakeInstance(
+            Mock(id='inst-%d' % index, tenant_id=tenant_id,
+                 region_id='region', compute_instance_id='server-%d' % index),
+            self.nova_client)
+        self.statuses[instance.id] = status
+        self.servers[instance.id] = Mock(id='server-%d' % index,
+                                         status=server_status)
+        return instance
+
+    def _add(self, instance, timeout=60):
+        build = build_watcher.PendingBuild(instance, timeout)
+        self.watcher._pending[instance.id] = build
+        return build
+
+    def test_sweep_burst(self):
+        builds = [self._add(self._instance(index)) for index in range(300)]
+        for index in range(0, 300, 2):
+            self.statuses['inst-%d' % index] = ServiceStatuses.RUNNING
+        self.watcher.sweep()
+        self.assertEqual(1, self.mock_find.call_count)
+        self.assertEqual(1, self.nova_client.servers.list.call_count)
+        self.assertEqual(150, self.watcher.pending)
+        self.assertEqual(150, len([build for build in builds
+                                   if build.event.ready()]))
+        self.assertTrue(builds[0].event.wait())
+
+    def test_sweep_lists_servers_per_tenant(self):
+        self._add(self._instance(0, tenant_id='tenant-1'))
+        self._add(self._instance(1, tenant_id='tenant-2'))
+        self._add(self._instance(2, tenant_id='tenant-2'))
+        self.watcher.sweep()
+        self.assertEqual(2, self.nova_client.servers.list.call_count)
+        self.assertEqual(3, self.watcher.pending)
+
+    def test_sweep_service_failed(self):
+        build = self._add(self._instance(0, status=ServiceStatuses.FAILED))
+        self.watcher.sweep()
+        self.assertEqual(0, self.watcher.pending)
+        self.assertRaises(exception.TroveError, build.event.wait)
+        self.assertFalse(self.nova_client.servers.list.called)
+
+    def test_sweep_server_failed(self):
+        build = self._add(self._instance(
+            0, server_status=InstanceStatus.ERROR))
+        self.watcher.sweep()
+        self.assertEqual(0, self.watcher.pending)
+        self.assertRaises(exception.TroveError, build.event.wait)
+
+    @patch.object(exception, 'LOG')
+    def test_sweep_server_missing(self, mock_logging):
+        build = self._add(self._instance(0))
+        self.servers.clear()
+        self.watcher.sweep()
+        self.assertRaises(exception.ComputeInstanceNotFound, build.event.wait)
+
+    @patch.object(build_watcher, 'LOG')
+    def test_sweep_list_error_keeps_waiting(self, mock_logging):
+        self._add(self._instance(0))
+        self.nova_client.servers.list.side_effect = Exception('boom')
+        self.watcher.sweep()
+        self.assertEqual(1, self.watcher.pending)
+
+    def test_wait(self):
+        instance = self._instance(0)
+
+        def _activate():
+            self.statuses[instance.id] = ServiceStatuses.INSTANCE_READY
+        greenthread.spawn_after(0.05, _activate)
+        self.assertTrue(self.watcher.wait(instance, 60))
+        self.assertEqual(0, self.watcher.pending)
+
+    def test_wait_timeout(self):
+        instance = self._instance(0)
+        self.assertRaises(exception.PollTimeOut,
+                          self.watcher.wait, instance, 0.05)
+        self.assertEqual(0, self.watcher.pending)
@@ -0,0 +1,228 @@
+# Copyright 2016 Tesora, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+from mock import MagicMock
+from mock import Mock
+from mock import patch
+
+from trove.cluster.models import Cluster
+from trove.cluster.models import ClusterTasks as ClusterTaskStatus
+from trove.cluster.models import DBCluster
+from trove.common import exception
+from trove.common.instance import ServiceStatuses
+from trove.instance.models import DBInstance
+from trove.instance.models import Instance
+from trove.instance.models import InstanceServiceStatus
+from trove.instance.tasks import InstanceTasks
+from trove.taskmanager import models
+from trove.tests.unittests import trove_testtools
+from trove.tests.unittests.util import util
+
+
+class ClusterConfigurationTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(ClusterConfigurationTest, self).setUp()
+        util.init_db()
+        self.context = trove_testtools.TroveTestContext(self)
+        self.context.notification = Mock()
+        self.context.notification.serialize.return_value = {}
+        self.db_cluster = DBCluster.create(
+            task_status=ClusterTaskStatus.UPDATING_CLUSTER,
+            name='cluster', tenant_id='tenant', datastore_version_id='dsv')
+        self.addCleanup(self.db_cluster.delete)
+        self.node_ids = []
+        for index in range(30):
+            db_info = DBInstance.create(
+                task_status=InstanceTasks.NONE, name='node%d' % index,
+                tenant_id='tenant', compute_instance_id='server-%d' % index,
+                datastore_version_id='dsv', cluster_id=self.db_cluster.id)
+            status = InstanceServiceStatus.create(
+                instance_id=db_info.id, status=ServiceStatuses.RUNNING)
+            self.addCleanup(db_info.delete)
+            self.addCleanup(status.delete)
+            self.node_ids.append(db_info.id)
+        self.cluster_tasks = models.ClusterTasks(
+            self.context, self.db_cluster, datastore=Mock(),
+            datastore_version=Mock(id='dsv'))
+
+        self.configuration = Mock(configuration_id='config')
+        self.configuration.get_configuration_overrides.return_value = {
+            'key': 'value'}
+        self.configuration.does_configuration_need_restart.return_value = (
+            False)
+        self.guests = {}
+
+        def _get_guest(instance):
+            return self.guests.setdefault(instance.id, MagicMock())
+
+        patches = [
+            patch.object(models.Configuration, 'find',
+                         return_value=self.configuration),
+            patch.object(Instance, 'get_guest', autospec=True,
+                         side_effect=_get_guest),
+            patch.object(InstanceServiceStatus, 'find_by_filter',
+                         wraps=InstanceServiceStatus.find_by_filter),
+            patch.object(InstanceServiceStatus, 'find_by'),
+            patch.object(models.inst_models, 'load_server'),
+            patch.object(models, 'DBaaSInstanceAttachConfiguration'),
+            patch.object(models, 'DBaaSInstanceDetachConfiguration'),
+            patch.object(models, 'StartNotification'),
+            patch.object(models, 'EndNotification'),
+            patch.object(models, 'LOG'),
+        ]
+        (_, _, self.mock_find_statuses, self.mock_find_status,
+         self.mock_load_server) = [p.start() for p in patches][:5]
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def _node(self, node_id):
+        return DBInstance.find_by(id=node_id)
+
+    def _update(self, apply_on_all=True):
+        self.cluster_tasks.rolling_configuration_update(
+            self.context, self.db_cluster.id, 'config',
+            apply_on_all=apply_on_all)
+
+    def test_configuration_update(self):
+        self.patch_conf_property('cluster_configuration_batch_size', 8)
+        self._update()
+
+        # The nodes are loaded with bulk queries, without their servers.
+        self.assertEqual(1, self.mock_find_statuses.call_count)
+        self.assertFalse(self.mock_find_status.called)
+        self.assertFalse(self.mock_load_server.called)
+        self.assertEqual(30, len(self.guests))
+        for guest in self.guests.values():
+            guest.update_overrides.assert_called_once_with({'key': 'value'})
+            guest.apply_overrides.assert_called_once_with({'key': 'value'})
+        for node_id in self.node_ids:
+            node = self._node(node_id)
+            self.assertEqual('config', node.configuration_id)
+            self.assertEqual(InstanceTasks.NONE, node.task_status)
+        cluster = DBCluster.find_by(id=self.db_cluster.id)
+        self.assertEqual('config', cluster.configuration_id)
+        self.assertEqual(ClusterTaskStatus.NONE, cluster.task_status)
+
+    def test_configuration_update_apply_on_first(self):
+        self._update(apply_on_all=False)
+        applied = [guest for guest in self.guests.values()
+                   if guest.apply_overrides.called]
+        self.assertEqual(1, len(applied))
+        for node_id in self.node_ids:
+            self.assertEqual(InstanceTasks.NONE,
+                             self._node(node_id).task_status)
+
+    def test_configuration_update_failure(self):
+        failed = self.node_ids[7]
+        self.guests[failed] = MagicMock()
+        self.guests[failed].update_overrides.side_effect = (
+            exception.GuestError(original_message='Boom!'))
+        self.assertRaises(exception.GuestError, self._update)
+
+        # The other nodes recorded their progress.
+        for node_id in self.node_ids:
+            node = self._node(node_id)
+            if node_id == failed:
+                self.assertIsNone(node.configuration_id)
+                self.assertEqual(InstanceTasks.NONE, node.task_status)
+            else:
+                self.assertEqual('config', node.configuration_id)
+                self.assertEqual(InstanceTasks.RESTART_REQUIRED,
+                                 node.task_status)
+        cluster = DBCluster.find_by(id=self.db_cluster.id)
+        self.assertIsNone(cluster.configuration_id)
+        self.assertEqual(ClusterTaskStatus.NONE, cluster.task_status)
+
+        # Resuming the rollout only persists the configuration on the
+        # node that failed.
+        self.guests[failed].update_overrides.side_effect = None
+        for guest in self.guests.values():
+            guest.reset_mock()
+        self._update()
+        for node_id, guest in self.guests.items():
+            self.assertEqual(node_id == failed,
+                             guest.update_overrides.called)
+            guest.apply_overrides.assert_called_once_with({'key': 'value'})
+        for node_id in self.node_ids:
+            self.assertEqual(InstanceTasks.NONE,
+                             self._node(node_id).task_status)
+
+    def test_configuration_refresh(self):
+        self._update()
+        for guest in self.guests.values():
+            guest.reset_mock()
+
+        # Updating the attached configuration again persists it everywhere.
+        self._update()
+        for guest in self.guests.values():
+            guest.update_overrides.assert_called_once_with({'key': 'value'})
+
+    @patch.object(models.Configuration, 'load')
+    def test_configuration_remove(self, mock_load):
+        self._update()
+        for guest in self.guests.values():
+            guest.reset_mock()
+        mock_load.return_value = Mock(id='config')
+
+        with patch.object(Instance, 'reset_configuration',
+                          return_value=False) as mock_reset:
+            self.cluster_tasks.rolling_configuration_remove(
+                self.context, self.db_cluster.id, apply_on_all=True)
+        mock_reset.assert_called_once_with('config')
+        for guest in self.guests.values():
+            guest.update_overrides.assert_called_once_with({}, remove=True)
+        for node_id in self.node_ids:
+            node = self._node(node_id)
+            self.assertIsNone(node.configuration_id)
+            self.assertEqual(InstanceTasks.RESTART_REQUIRED,
+                             node.task_status)
+        cluster = DBCluster.find_by(id=self.db_cluster.id)
+        self.assertIsNone(cluster.configuration_id)
+        self.assertEqual(ClusterTaskStatus.NONE, cluster.task_status)
+
+
+class ClusterConfigurationApiTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(ClusterConfigurationApiTest, self).setUp()
+        self.context = trove_testtools.TroveTestContext(self)
+        self.db_info = Mock(id='cluster',
+                            task_status=ClusterTaskStatus.NONE)
+        self.cluster = Cluster(self.context, self.db_info,
+                               datastore=Mock(),
+                               datastore_version=Mock(id='dsv',
+                                                      manager='galera'))
+
+    @patch('trove.cluster.models.config_models.Configuration.find')
+    @patch('trove.cluster.models.task_api.load')
+    def test_rolling_configuration_update(self, mock_load, mock_find):
+        self.cluster.rolling_configuration_update('config',
+                                                  apply_on_all=False)
+        mock_find.assert_called_once_with(self.context, 'config', 'dsv')
+        self.db_info.update.assert_called_once_with(
+            task_status=ClusterTaskStatus.UPDATING_CLUSTER)
+        (mock_load.return_value.update_cluster_configuration.
+         assert_called_once_with('cluster', 'config', False))
+
+    @patch('trove.cluster.models.task_api.load')
+    def test_rolling_configuration_remove_failure(self, mock_load):
+        (mock_load.return_value.remove_cluster_configuration.
+         side_effect) = exception.TroveError()
+        self.assertRaises(exception.TroveError,
+                          self.cluster.rolling_configuration_remove)
+        self.db_info.update.assert_called_with(
+            task_status=ClusterTaskStatus.NONE)
@@ -15,6 +15,7 @@
 
 import datetime
 
+from eventlet import greenthread
 from mock import Mock
 from mock import patch
 from oslo_utils import importutils
@@ -199,6 +200,52 @@ class MongoDbClusterTasksTest(trove_testtools.TestCase):
         mock_update.assert_called_with(self.cluster_id, shard_id="shard-1")
         self.assertFalse(ret_val)
 
+    def _shard_members(self, shard_id, count):
+        return [BaseInstance(Mock(), DBInstance(
+            InstanceTasks.NONE, id='%s-%d' % (shard_id, index),
+            name='%s-member%d' % (shard_id, index),
+            compute_instance_id='compute-%s-%d' % (shard_id, index),
+            datastore_version_id='1', cluster_id=self.cluster_id,
+            shard_id=shard_id, type='member'), Mock(),
+            InstanceServiceStatus(ServiceStatuses.NEW))
+            for index in range(count)]
+
+    @patch.object(datastore_models.Datastore, 'load')
+    @patch.object(datastore_models.DatastoreVersion, 'load_by_uuid')
+    def test_create_shards_concurrently(self, mock_dv, mock_ds):
+        shards = dict((shard_id, self._shard_members(shard_id, 3))
+                      for shard_id in ['shard-1', 'shard-2', 'shard-3'])
+        members = sum(shards.values(), [])
+        started = []
+        finished = []
+
+        def _create_shard(query_router, shard_members):
+            started.append(shard_members[0].shard_id)
+            greenthread.sleep(0)
+            # All the shards must have been started before any finishes.
+            self.assertEqual(3, len(started))
+            finished.append(shard_members)
+            return True
+
+        with patch.object(ClusterTasks, '_create_shard',
+                          side_effect=_create_shard):
+            self.assertTrue(self.clustertasks._create_shards(Mock(),
+                                                             members))
+        self.assertEqual(sorted(shards.values()), sorted(finished))
+
+    @patch.object(ClusterTasks, '_create_shard')
+    @patch.object(datastore_models.Datastore, 'load')
+    @patch.object(datastore_models.DatastoreVersion, 'load_by_uuid')
+    def test_create_shards_failure(self, mock_dv, mock_ds,
+                                   mock_create_shard):
+        members = (self._shard_members('shard-1', 2) +
+                   self._shard_members('shard-2', 2))
+        mock_create_shard.side_effect = (
+            lambda query_router, shard_members:
+            shard_members[0].shard_id == 'shard-1')
+        self.assertFalse(self.clustertasks._create_shards(Mock(), members))
+        self.assertEqual(2, mock_create_shard.call_count)
+
     @patch.object(ClusterTasks, '_init_replica_set')
     @patch.object(ClusterTasks, 'get_guest')
     @patch.object(ClusterTasks, 'get_ip')
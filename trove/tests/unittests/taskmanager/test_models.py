@@ -35,6 +35,7 @@ from trove.common.exception import GuestError
 from trove.common.exception import MalformedSecurityGroupRuleError
 from trove.common.exception import PollTimeOut
 from trove.common.exception import TroveError
+from trove.common.instance import MODULE_CONTENTS_REQUIRED
 from trove.common.instance import ServiceStatuses
 from trove.common.notification import TroveInstanceModifyVolume
 from trove.common import remote
@@ -522,6 +523,7 @@ class ResizeVolumeTest(trove_testtools.TestCase):
         self.taskmanager_models_CONF = patch.object(taskmanager_models, 'CONF')
         self.mock_conf = self.taskmanager_models_CONF.start()
         self.mock_conf.get = Mock(return_value=FakeGroup())
+        self.mock_conf.volume_online_resize = False
         self.addCleanup(self.taskmanager_models_CONF.stop)
 
     def tearDown(self):
@@ -602,6 +604,69 @@ class ResizeVolumeTest(trove_testtools.TestCase):
         self.assertEqual(1, self.instance.restart.call_count)
         self.instance.reset_mock()
 
+    @patch.object(TroveInstanceModifyVolume, 'notify')
+    def test_resize_volume_online(self, *args):
+        self.mock_conf.volume_online_resize = True
+        server = Mock(status=InstanceStatus.ACTIVE)
+        self.instance.attach_mock(server, 'server')
+        self.action.execute()
+        self.assertEqual(0, self.instance.guest.stop_db.call_count)
+        self.assertEqual(0, self.instance.guest.unmount_volume.call_count)
+        detach_count = (
+            self.instance.nova_client.volumes.delete_server_volume.call_count)
+        self.assertEqual(0, detach_count)
+        self.instance.volume_client.volumes.extend.assert_called_once_with(
+            self.instance.volume_id, self.new_vol_size)
+        self.instance.guest.resize_fs.assert_called_once_with(
+            device_path=self.instance.device_path,
+            mount_point='var/lib/mysql', online=True)
+        self.instance.update_db.assert_called_once_with(
+            volume_size=self.new_vol_size)
+        self.assertEqual(0, self.instance.restart.call_count)
+        self.instance.reset_mock()
+
+    @patch('trove.taskmanager.models.LOG')
+    @patch.object(TroveInstanceModifyVolume, 'notify')
+    def test_resize_volume_online_extend_refused(self, *args):
+        self.mock_conf.volume_online_resize = True
+        server = Mock(status=InstanceStatus.ACTIVE)
+        self.instance.attach_mock(server, 'server')
+        self.instance.volume_client.volumes.extend.side_effect = [
+            cinder_exceptions.BadRequest(400), None]
+        self.action.execute()
+        self.assertEqual(1, self.instance.guest.stop_db.call_count)
+        detach_count = (
+            self.instance.nova_client.volumes.delete_server_volume.call_count)
+        self.assertEqual(1, detach_count)
+        self.assertEqual(2, self.instance.volume_client.volumes.extend.
+                         call_count)
+        self.instance.guest.resize_fs.assert_called_once_with(
+            device_path=self.instance.device_path,
+            mount_point='var/lib/mysql',
+            online=False)
+        self.assertEqual(1, self.instance.restart.call_count)
+        self.instance.reset_mock()
+
+    @patch('trove.taskmanager.models.LOG')
+    @patch.object(TroveInstanceModifyVolume, 'notify')
+    def test_resize_volume_online_fs_fallback(self, *args):
+        self.mock_conf.volume_online_resize = True
+        server = Mock(status=InstanceStatus.ACTIVE)
+        self.instance.attach_mock(server, 'server')
+        self.instance.guest.resize_fs.side_effect = [GuestError(), None]
+        self.action.execute()
+        self.assertEqual(1, self.instance.volume_client.volumes.extend.
+                         call_count)
+        detach_count = (
+            self.instance.nova_client.volumes.delete_server_volume.call_count)
+        self.assertEqual(0, detach_count)
+        self.assertEqual(1, self.instance.guest.stop_db.call_count)
+        self.assertEqual(1, self.instance.guest.unmount_volume.call_count)
+        self.assertEqual(2, self.instance.guest.resize_fs.call_count)
+        self.assertEqual(1, self.instance.guest.mount_volume.call_count)
+        self.assertEqual(1, self.instance.restart.call_count)
+        self.instance.reset_mock()
+
     def test_resize_volume_server_error_fails(self):
         server = Mock(status=InstanceStatus.ERROR)
         self.instance.attach_mock(server, 'server')
@@ -1052,6 +1117,22 @@ class BackupTasksTest(trove_testtools.TestCase):
                 self.backup.state,
                 "backup should be in DELETE_FAILED status")
 
+    def test_delete_backup_large_object(self):
+        self.swift_client.head_object = MagicMock(
+            return_value={'x-static-large-object': 'True'})
+        self.swift_client.get_object = MagicMock(return_value=(
+            {}, '[{"name": "/database_backups/seg_0"},'
+                ' {"name": "/database_backups/seg_1"}]'))
+        self.swift_client.get_capabilities = MagicMock(return_value={})
+        self.swift_client.url = 'http://swift/v1/AUTH_test'
+        taskmanager_models.BackupTasks.delete_files_from_swift(
+            'dummy context', 'backup.xbstream.gz')
+        self.swift_client.delete_object.assert_has_calls(
+            [call('database_backups', 'backup.xbstream.gz')])
+        deleted = sorted(args[0][1] for args in
+                         self.swift_client.delete_object.call_args_list)
+        self.assertEqual(['backup.xbstream.gz', 'seg_0', 'seg_1'], deleted)
+
     def test_parse_manifest(self):
         manifest = 'container/prefix'
         cont, prefix = taskmanager_models.BackupTasks._parse_manifest(manifest)
@@ -1143,3 +1224,109 @@ class ClusterRootTest(trove_testtools.TestCase):
             call(context, cluster_instances[1], user)
         ]
         root_history_create.assert_has_calls(calls)
+
+
+class ModuleTasksTest(trove_testtools.TestCase):
+
+    def setUp(self):
+        super(ModuleTasksTest, self).setUp()
+        util.init_db()
+        self.context = Mock(is_admin=True)
+        self.module = Mock(id='mod-id', md5='new-md5', datastore_id=None,
+                           datastore_version_id=None)
+        self.module_list = [{'module': {'id': 'mod-id', 'md5': 'new-md5',
+                                        'contents': 'contents'}}]
+        self.instance_ids = ['inst-%d' % index for index in range(5)]
+        self.instance_modules = MagicMock()
+        self.instance_modules.count.return_value = len(self.instance_ids)
+        self.instance_modules.__iter__.return_value = [
+            Mock(instance_id=instance_id, md5='old-md5')
+            for instance_id in self.instance_ids]
+        self.db_infos = [Mock(id=instance_id, datastore_version_id='dsv-id')
+                         for instance_id in self.instance_ids]
+        self.client = Mock()
+        self.client.module_apply.return_value = [{'status': 'OK'}]
+
+        patches = [
+            patch.object(taskmanager_models.module_models.Modules,
+                         'load_by_ids', return_value=[self.module]),
+            patch.object(taskmanager_models.module_models.InstanceModules,
+                         'load_all', return_value=self.instance_modules),
+            patch.object(taskmanager_models.module_views, 'get_module_list',
+                         return_value=self.module_list),
+            patch.object(taskmanager_models.DBInstance, 'find_by_filter',
+                         return_value=self.db_infos),
+            patch.object(datastore_models.DatastoreVersion, 'load_by_uuid',
+                         return_value=Mock(id='dsv-id', datastore_id='ds-id')),
+            patch.object(taskmanager_models, 'create_guest_client',
+                         return_value=self.client),
+            patch.object(taskmanager_models.Instance, 'add_instance_modules'),
+            patch.object(taskmanager_models, 'time'),
+        ]
+        self.mocks = []
+        for mock_patch in patches:
+            self.mocks.append(mock_patch.start())
+            self.addCleanup(mock_patch.stop)
+
+    def test_reapply_module_in_batches(self):
+        mock_find, mock_ds_load = self.mocks[3], self.mocks[4]
+        mock_add, mock_sleep = self.mocks[6], self.mocks[7].sleep
+        taskmanager_models.ModuleTasks.reapply_module(
+            self.context, 'mod-id', None, True, 2, 1, False)
+        self.assertEqual(1, mock_find.call_count)
+        self.assertEqual(1, mock_ds_load.call_count)
+        self.assertEqual(5, mock_add.call_count)
+        # Three batches, with a delay between each
+        self.assertEqual(2, mock_sleep.call_count)
+        # The guests had older contents, so the contents were sent with
+        # a single call each.
+        self.assertEqual([call(self.module_list)] * 5,
+                         self.client.module_apply.call_args_list)
+
+    def test_reapply_module_negative_batch_size(self):
+        taskmanager_models.ModuleTasks.reapply_module(
+            self.context, 'mod-id', None, True, -1, 1, False)
+        self.assertEqual(5, self.mocks[6].call_count)
+        self.assertEqual(4, self.mocks[7].sleep.call_count)
+
+    def _force_current(self):
+        self.instance_modules.__iter__.return_value = [
+            Mock(instance_id='inst-0', md5='new-md5')]
+        self.db_infos[1:] = []
+
+    def test_reapply_module_forced(self):
+        self._force_current()
+        taskmanager_models.ModuleTasks.reapply_module(
+            self.context, 'mod-id', None, True, 2, 1, True)
+        # The guest already had the contents, so they were not sent
+        self.assertEqual(1, self.client.module_apply.call_count)
+        self.assertNotIn('contents', self.client.module_apply.call_args[0][
+            0][0]['module'])
+        self.assertEqual(1, self.mocks[6].call_count)
+
+    def test_reapply_module_sends_required_contents(self):
+        self._force_current()
+        self.client.module_apply.side_effect = [
+            [{'status': MODULE_CONTENTS_REQUIRED}],
+            [{'status': 'OK'}]]
+        taskmanager_models.ModuleTasks.reapply_module(
+            self.context, 'mod-id', None, True, 2, 1, True)
+        self.assertEqual(2, self.client.module_apply.call_count)
+        self.client.module_apply.assert_called_with(self.module_list)
+
+    @patch.object(taskmanager_models, 'LOG')
+    def test_reapply_module_old_guest(self, mock_logging):
+        self._force_current()
+        self.client.module_apply.side_effect = [GuestError(), None]
+        taskmanager_models.ModuleTasks.reapply_module(
+            self.context, 'mod-id', None, True, 2, 1, True)
+        self.client.module_apply.assert_called_with(self.module_list)
+        self.assertEqual(1, self.mocks[6].call_count)
+
+    def test_reapply_module_skips_current(self):
+        self.instance_modules.__iter__.return_value = [
+            Mock(instance_id='inst-0', md5='new-md5')]
+        taskmanager_models.ModuleTasks.reapply_module(
+            self.context, 'mod-id', None, True, 2, 1, False)
+        self.assertEqual(0, self.mocks[3].call_count)
+        self.assertEqual(0, self.client.module_apply.call_count)
@@ -24,6 +24,7 @@ from trove.common import cfg
 from trove.common.context import TroveContext
 from trove.common.notification import DBaaSAPINotification
 from trove.common import policy
+from trove.common import remote
 from trove.tests import root_logger
 
 
@@ -107,6 +108,9 @@ class TestCase(testtools.TestCase):
         self.addCleanup(policy_patcher.stop)
         policy_patcher.start()
 
+        # Do not share the (possibly mocked) remote clients across tests.
+        self.addCleanup(remote._clients.clear)
+
     def tearDown(self):
         # yes, this is gross and not thread aware.
         # but the only way to make it thread aware would require that